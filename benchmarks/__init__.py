@@ -0,0 +1 @@
+"""Benchmarks for the setup command and the built-in scripts."""
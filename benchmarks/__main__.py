@@ -0,0 +1,87 @@
+"""
+Run the benchmark suite.
+
+Usage::
+
+    python -m benchmarks                 # compare against stored baselines
+    python -m benchmarks --save          # store the results as new baselines
+    python -m benchmarks -k scripts/     # only run matching benchmarks
+
+Exits with status 1 when a benchmark is slower than its baseline by more
+than the tolerance factor.
+"""
+import argparse
+import os
+import sys
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument(
+        "-k",
+        dest="pattern",
+        default="",
+        help="Only run benchmarks whose name contains this",
+    )
+    parser.add_argument(
+        "--save", action="store_true", help="Store the results as the new baselines"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=1.5,
+        help="Allowed slowdown factor over the baseline (default: 1.5)",
+    )
+    options = parser.parse_args(argv)
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings")
+    import django
+
+    django.setup()
+
+    from django.core.management import call_command
+
+    from . import bench_command, bench_scripts  # noqa: F401
+    from .harness import REGISTRY, load_baselines, save_baselines
+
+    call_command("migrate", verbosity=0)
+
+    baselines = load_baselines()
+    results: dict[str, float] = {}
+    regressions = []
+
+    print(f"{'benchmark':<40} {'median':>10} {'baseline':>10} {'ratio':>7}")
+    for bench in REGISTRY:
+        if options.pattern not in bench.name:
+            continue
+        median = bench.run()
+        results[bench.name] = median
+        baseline = baselines.get(bench.name)
+        if baseline:
+            ratio = median / baseline
+            flag = "  SLOWER" if ratio > options.tolerance else ""
+            print(
+                f"{bench.name:<40} {median * 1000:>8.2f}ms {baseline * 1000:>8.2f}ms {ratio:>6.2f}x{flag}"
+            )
+            if flag:
+                regressions.append(bench.name)
+        else:
+            print(f"{bench.name:<40} {median * 1000:>8.2f}ms {'-':>10} {'-':>7}")
+
+    if options.save:
+        save_baselines(results)
+        print(f"Saved {len(results)} baselines.")
+        return 0
+
+    if regressions:
+        print(
+            f"{len(regressions)} benchmark(s) slower than {options.tolerance}x their baseline."
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Benchmarks for the overhead of the setup command itself."""
+from io import StringIO
+from typing import Any
+
+from django.core.management import call_command
+from django.test import override_settings
+
+from django_setup_tools.management.commands.setup import Command
+from django_setup_tools.models import ScriptRun
+
+from .harness import benchmark
+
+
+def noop(handler: Any, *args: Any) -> None:
+    """A script that does nothing."""
+
+
+def _clear_ledger() -> None:
+    ScriptRun.objects.all().delete()
+
+
+def _register_handle(count: int) -> None:
+    config = {
+        "": {
+            "always_run": [
+                ("benchmarks.bench_command.noop", str(i)) for i in range(count)
+            ]
+        }
+    }
+
+    @benchmark(
+        f"handle/{count} specs", repeat=3 if count >= 1000 else 5, setup=_clear_ledger
+    )
+    def handle() -> None:
+        with override_settings(DJANGO_SETUP_TOOLS=config):
+            call_command("setup", stdout=StringIO())
+
+
+for count in (0, 10, 100, 1000):
+    _register_handle(count)
+
+
+_command = Command(stdout=StringIO())
+
+
+@benchmark("run_script/import_string x100")
+def run_script_function() -> None:
+    for _ in range(100):
+        _command.run_script("benchmarks.bench_command.noop")
+
+
+@benchmark("run_script/call_command x100")
+def run_script_management_command() -> None:
+    for _ in range(100):
+        _command.run_script("noop")
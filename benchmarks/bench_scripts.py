@@ -0,0 +1,137 @@
+"""Benchmarks for the built-in scripts in ``django_setup_tools.scripts``."""
+import atexit
+import functools
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.test import override_settings
+
+from django_setup_tools import scripts
+from django_setup_tools.management.commands.setup import Command
+
+from .harness import benchmark
+
+#: Number of files in the synthetic static tree
+STATIC_FILES = 20_000
+
+_handler = Command(stdout=StringIO())
+
+
+@functools.cache
+def static_tree() -> Path:
+    """Create a synthetic static files tree once per benchmark run."""
+    root = Path(tempfile.mkdtemp(prefix="django_setup_tools_bench_static_"))
+    atexit.register(shutil.rmtree, root, ignore_errors=True)
+    source = root / "src"
+    for i in range(STATIC_FILES):
+        directory = source / f"app{i % 50}" / f"dir{i % 20}"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / f"file{i}.css").write_text(
+            f".c{i} {{ color: #{i % 0xFFFFFF:06x}; }}\n"
+        )
+    (root / "collected").mkdir()
+    return root
+
+
+@functools.cache
+def log_settings() -> dict:
+    root = Path(tempfile.mkdtemp(prefix="django_setup_tools_bench_logs_"))
+    atexit.register(shutil.rmtree, root, ignore_errors=True)
+    return {
+        "version": 1,
+        "handlers": {
+            f"file{i}": {
+                "class": "logging.FileHandler",
+                "filename": str(root / f"dir{i}" / "app.log"),
+            }
+            for i in range(20)
+        },
+    }
+
+
+@benchmark("scripts/sync_site_id")
+def sync_site_id() -> None:
+    scripts.sync_site_id(_handler)
+
+
+@benchmark("scripts/clear_cache")
+def clear_cache() -> None:
+    scripts.clear_cache(_handler)
+
+
+@benchmark("scripts/invalidate_caches")
+def invalidate_caches() -> None:
+    scripts.invalidate_caches(_handler)
+
+
+@benchmark("scripts/check_database_connection")
+def check_database_connection() -> None:
+    scripts.check_database_connection(_handler)
+
+
+@benchmark("scripts/probe_databases")
+def probe_databases() -> None:
+    scripts.probe_databases(_handler)
+
+
+@benchmark("scripts/setup_log_directories")
+def setup_log_directories() -> None:
+    with override_settings(LOGGING=log_settings()):
+        scripts.setup_log_directories(_handler)
+
+
+@benchmark("scripts/verify_environment_config")
+def verify_environment_config() -> None:
+    scripts.verify_environment_config(_handler)
+
+
+@benchmark("scripts/check_static_files_config")
+def check_static_files_config() -> None:
+    root = static_tree()
+    with override_settings(
+        STATIC_ROOT=str(root / "collected"), STATICFILES_DIRS=[str(root / "src")]
+    ):
+        scripts.check_static_files_config(_handler)
+
+
+@benchmark("scripts/check_static_files_config --verify")
+def check_static_files_config_verify() -> None:
+    root = static_tree()
+    with override_settings(
+        STATIC_ROOT=str(root / "collected"), STATICFILES_DIRS=[str(root / "src")]
+    ):
+        scripts.check_static_files_config(_handler, "--verify")
+
+
+@benchmark("scripts/compress_static_files")
+def compress_static_files() -> None:
+    # Compress a copy, so the other benchmarks do not see the compressed files
+    root = static_tree()
+    if not (root / "compressed").exists():
+        shutil.copytree(root / "src", root / "compressed")
+    with override_settings(
+        STATIC_ROOT=str(root / "compressed"),
+        DJANGO_SETUP_TOOLS_COMPRESSION={"min_size": 0},
+    ):
+        scripts.compress_static_files(_handler)
+
+
+@benchmark("scripts/collect_static_files")
+def collect_static_files() -> None:
+    # After the first round, this measures a deploy where no file changed
+    root = static_tree()
+    with override_settings(
+        STATIC_ROOT=str(root / "incremental"),
+        STATICFILES_DIRS=[str(root / "src")],
+        DJANGO_SETUP_TOOLS_COLLECT_MANIFEST_DIR=str(root / "cache"),
+    ):
+        scripts.collect_static_files(_handler)
+
+
+@benchmark("scripts/compile_bytecode")
+def compile_bytecode() -> None:
+    # After the first round, this measures a deploy where no source changed
+    with override_settings(BASE_DIR=str(Path(scripts.__file__).parent.parent)):
+        scripts.compile_bytecode(_handler)
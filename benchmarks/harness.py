@@ -0,0 +1,70 @@
+"""A small benchmark harness with stored baselines."""
+import json
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+#: Registered benchmarks, in registration order.
+REGISTRY: list["Benchmark"] = []
+
+
+@dataclass
+class Benchmark:
+    """
+    A registered benchmark.
+
+    Attributes:
+        name: Unique name, used as the key in the baselines file
+        func: Callable being timed
+        repeat: Number of timed calls
+        setup: Called before every timed call, outside the timing
+    """
+
+    name: str
+    func: Callable[[], object]
+    repeat: int = 5
+    setup: Callable[[], object] | None = None
+    times: list[float] = field(default_factory=list)
+
+    def run(self) -> float:
+        """Run the benchmark and return the median time in seconds."""
+        self.times = []
+        # Warm-up call so imports and caches do not skew the first sample
+        if self.setup:
+            self.setup()
+        self.func()
+        for _ in range(self.repeat):
+            if self.setup:
+                self.setup()
+            start = time.perf_counter()
+            self.func()
+            self.times.append(time.perf_counter() - start)
+        return statistics.median(self.times)
+
+
+def benchmark(
+    name: str, repeat: int = 5, setup: Callable[[], object] | None = None
+) -> Callable[[Callable[[], object]], Callable[[], object]]:
+    """Register the decorated zero-argument function as a benchmark."""
+
+    def decorator(func: Callable[[], object]) -> Callable[[], object]:
+        REGISTRY.append(Benchmark(name=name, func=func, repeat=repeat, setup=setup))
+        return func
+
+    return decorator
+
+
+def load_baselines(path: Path = BASELINES) -> dict[str, float]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+
+def save_baselines(results: dict[str, float], path: Path = BASELINES) -> None:
+    baselines = load_baselines(path)
+    baselines.update(results)
+    path.write_text(json.dumps(dict(sorted(baselines.items())), indent=2) + "\n")
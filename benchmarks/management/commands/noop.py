@@ -0,0 +1,11 @@
+"""A management command that does nothing, used to time call_command overhead."""
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Do nothing"
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        pass
@@ -0,0 +1,39 @@
+"""Django settings used when running the benchmarks."""
+import os
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve(strict=True).parent.parent
+
+SECRET_KEY = "benchmark-secret-key"  # noqa: S105
+
+DEBUG = False
+
+ALLOWED_HOSTS = ["localhost"]
+
+USE_TZ = True
+
+INSTALLED_APPS = [
+    "django.contrib.sites",
+    "django.contrib.staticfiles",
+    "django_setup_tools",
+    "benchmarks",
+]
+
+# A throwaway on-disk database, so timings include real SQLite I/O
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(tempfile.gettempdir(), "django_setup_tools_bench.sqlite3"),
+    }
+}
+
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+STATIC_URL = "/static/"
+
+SITE_ID = 1
+SITE_DOMAIN = "bench.example.com"
+SITE_NAME = "Benchmark Site"
+
+DJANGO_SETUP_TOOLS: dict = {}
@@ -9,4 +9,17 @@ both one-time initialization and always-run scripts.
 __version__ = "0.1.0"
 __author__ = "Sam Jennings"
 
+from typing import Any
+
 default_app_config = "django_setup_tools.apps.DjangoSetupToolsConfig"
+
+
+def __getattr__(name: str) -> Any:
+    # Imported lazily, so that importing the package while Django loads its
+    # apps does not also import the database layer
+    if name == "run_setup":
+        from .api import run_setup
+
+        return run_setup
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
@@ -0,0 +1,129 @@
+"""
+Run the setup scripts in-process, without the ``setup`` management command.
+
+This lets an application server run the setup in the interpreter it has
+already warmed up, for example from a gunicorn ``on_starting`` hook::
+
+    # gunicorn.conf.py
+    def on_starting(server):
+        from django_setup_tools import run_setup
+
+        run_setup(logger=server.log.error_log)
+"""
+import logging
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, Protocol, TextIO, cast
+
+import django
+from django.apps import apps
+from django.db import connections
+
+if TYPE_CHECKING:
+    from .instrumentation import RunReport
+
+
+class TextStream(Protocol):
+    """The part of a text file the command writes its output to."""
+
+    def write(self, text: str, /) -> int:
+        ...
+
+    def flush(self) -> None:
+        ...
+
+    def isatty(self) -> bool:
+        ...
+
+
+class LogStream:
+    """File-like object logging every line written to it."""
+
+    def __init__(self, logger: logging.Logger, level: int = logging.INFO) -> None:
+        self.logger = logger
+        self.level = level
+
+    def write(self, text: str) -> int:
+        for line in text.splitlines():
+            if line.strip():
+                self.logger.log(self.level, line)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def isatty(self) -> bool:
+        return False
+
+
+def run_setup(
+    env: str | None = None,
+    phases: Iterable[str] | None = None,
+    *,
+    stream: TextStream | None = None,
+    logger: logging.Logger | None = None,
+    **options: Any,
+) -> "RunReport | None":
+    """
+    Run the setup scripts in the current process.
+
+    Django is set up first if it is not already. Database connections opened
+    by the scripts are closed afterwards, so a process that forks workers
+    next, like the gunicorn master, does not share them.
+
+    Args:
+        env: Environment whose scripts to run; defaults to ``DJANGO_SETUP_TOOLS_ENV``
+        phases: Phases to run, ``"on_initial"`` and/or ``"always_run"``; defaults to both
+        stream: Where to write the output
+        logger: Logger receiving the output, one record per line, when no
+            ``stream`` is given; defaults to the ``django_setup_tools`` logger
+        **options: Options of the ``setup`` command by their Python name,
+            such as ``jobs``, ``force``, ``lock`` or ``wait_for_db``
+
+    Returns:
+        The :class:`~django_setup_tools.instrumentation.RunReport` measuring
+        every script run, or None if nothing was run
+
+    Raises:
+        CommandError: If a script fails or the configuration is invalid
+        TypeError: If an option is not one of the ``setup`` command
+    """
+    if not apps.ready:
+        django.setup()
+    # The command imports models, so it can only be imported once Django is set up
+    from .management.commands.setup import Command
+    from .plan import PHASES
+
+    phases = list(phases) if phases is not None else list(PHASES)
+    unknown = [phase for phase in phases if phase not in PHASES]
+    if unknown:
+        msg = f"Unknown phase(s): {', '.join(unknown)}; expected {' or '.join(PHASES)}"
+        raise ValueError(msg)
+
+    # Reject unknown options like call_command, instead of silently ignoring them
+    parser = Command().create_parser("", "setup")
+    valid = {action.dest for action in parser._actions if action.dest != "help"}
+    unknown = sorted(set(options) - valid)
+    if unknown:
+        msg = (
+            f"Unknown option(s) for setup command: {', '.join(unknown)}. "
+            f"Valid options are: {', '.join(sorted(valid))}."
+        )
+        raise TypeError(msg)
+
+    stdout: TextStream
+    stderr: TextStream
+    if stream is not None:
+        stdout = stderr = stream
+    else:
+        logger = logger or logging.getLogger("django_setup_tools")
+        stdout, stderr = LogStream(logger), LogStream(logger, logging.ERROR)
+
+    # The command's output wrappers only use the methods of TextStream
+    command = Command(
+        stdout=cast(TextIO, stdout), stderr=cast(TextIO, stderr), no_color=True
+    )
+    try:
+        command.handle(env=env, phases=phases, **options)
+    finally:
+        connections.close_all()
+    return command.report
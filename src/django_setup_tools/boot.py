@@ -0,0 +1,195 @@
+"""
+Measure how long Django takes to boot, per installed app.
+
+:func:`profile_boot` runs ``python -X importtime -m django_setup_tools.boot``,
+which calls ``django.setup()`` in a clean interpreter while timing every
+``AppConfig.ready()``. The import log on its stderr is then attributed to
+apps: a module counts for the app it belongs to or, failing that, for the
+nearest app whose import pulled it in.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+\d+ \| ( *)(\S+)$")
+
+# (depth, module, self time in microseconds, modules it imported)
+_ImportNode = tuple[int, str, int, list["_ImportNode"]]
+
+#: Line written to stderr by the subprocess when it starts measuring
+MARKER = "django_setup_tools.boot: start"
+
+#: Name under which imports that belong to no installed app are reported
+OTHER = "(other)"
+
+
+@dataclass
+class AppBoot:
+    """Time one installed app adds to Django's boot, in seconds."""
+
+    label: str
+    imports: float = 0.0
+    ready: float = 0.0
+
+    @property
+    def total(self) -> float:
+        return self.imports + self.ready
+
+
+@dataclass
+class BootProfile:
+    """Boot time of a Django process and what it was spent on."""
+
+    boot: float
+    apps: list[AppBoot] = field(default_factory=list)
+
+    def top(self, count: int) -> list[AppBoot]:
+        """Return the ``count`` apps adding the most time, slowest first."""
+        return sorted(self.apps, key=lambda app: app.total, reverse=True)[:count]
+
+
+def profile_boot(timeout: float = 120) -> BootProfile:
+    """
+    Boot Django in a subprocess and return where the time went.
+
+    Raises:
+        ImproperlyConfigured: If settings were not loaded from a settings module
+        RuntimeError: If the subprocess fails or times out
+    """
+    # Imported here so that the profiled interpreter, which imports this
+    # module, does not load Django before it starts measuring
+    from django.conf import settings
+    from django.core.exceptions import ImproperlyConfigured
+
+    settings_module = getattr(settings, "SETTINGS_MODULE", None)
+    if not settings_module:
+        msg = "Profiling the boot needs settings loaded from DJANGO_SETTINGS_MODULE"
+        raise ImproperlyConfigured(msg)
+
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": settings_module,
+        "PYTHONPATH": os.pathsep.join(path for path in sys.path if path),
+    }
+    try:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-m", "django_setup_tools.boot"],
+            capture_output=True,
+            text=True,
+            env=env,
+            timeout=timeout,
+            check=False,
+        )
+    except subprocess.TimeoutExpired as e:
+        msg = f"Django did not boot within {timeout}s"
+        raise RuntimeError(msg) from e
+    if result.returncode:
+        errors = [
+            line
+            for line in result.stderr.splitlines()
+            if not line.startswith("import time:")
+        ]
+        msg = f"Django failed to boot: {errors[-1] if errors else f'exit status {result.returncode}'}"
+        raise RuntimeError(msg)
+
+    # Settings or apps may print, so the measurements are on the last line
+    measured = json.loads(result.stdout.splitlines()[-1])
+    imports = attribute_imports(result.stderr, measured["apps"])
+    profile = BootProfile(boot=measured["boot"])
+    for label in [*measured["apps"], OTHER]:
+        app = AppBoot(label, imports.get(label, 0.0), measured["ready"].get(label, 0.0))
+        if label != OTHER or app.total:
+            profile.apps.append(app)
+    return profile
+
+
+def attribute_imports(log: str, apps: dict[str, str]) -> dict[str, float]:
+    """
+    Sum the self time of the modules in a ``-X importtime`` log per app label.
+
+    Only the modules imported after :data:`MARKER`, if the log contains it,
+    are counted.
+
+    Args:
+        log: The stderr of a process run with ``-X importtime``
+        apps: App labels mapped to their module names
+    """
+    # The log lists modules after the modules they import, indented one level
+    # deeper; rebuild that tree so imports can be attributed to their importer
+    lines = log.splitlines()
+    if MARKER in lines:
+        lines = lines[lines.index(MARKER) + 1 :]
+    roots: list[_ImportNode] = []
+    for line in lines:
+        match = _IMPORT_LINE.match(line)
+        if not match:
+            continue
+        depth = len(match.group(2)) // 2
+        children: list[_ImportNode] = []
+        while roots and roots[-1][0] > depth:
+            children.insert(0, roots.pop())
+        roots.append((depth, match.group(3), int(match.group(1)), children))
+
+    by_length = sorted(apps.items(), key=lambda item: len(item[1]), reverse=True)
+
+    def owner(module: str) -> str | None:
+        for label, name in by_length:
+            if module == name or module.startswith(f"{name}."):
+                return label
+        return None
+
+    totals: dict[str, float] = {}
+    stack: list[tuple[_ImportNode, str | None]] = [(node, None) for node in roots]
+    while stack:
+        (_, module, self_time, children), inherited = stack.pop()
+        label = owner(module) or inherited
+        totals[label or OTHER] = totals.get(label or OTHER, 0.0) + self_time / 1_000_000
+        stack.extend((child, label) for child in children)
+    return totals
+
+
+def main() -> None:
+    """Boot Django, timing every ``AppConfig.ready()``, and print the measurements as JSON."""
+    print(MARKER, file=sys.stderr, flush=True)
+    start = time.perf_counter()
+    import django
+    from django.apps import AppConfig, apps
+
+    ready_times: dict[str, float] = {}
+    create = AppConfig.create.__func__  # type: ignore[attr-defined]
+
+    def timed_create(cls: type[AppConfig], entry: str) -> AppConfig:
+        app_config: AppConfig = create(cls, entry)
+        ready = app_config.ready
+
+        def timed_ready() -> None:
+            ready_start = time.perf_counter()
+            try:
+                ready()
+            finally:
+                ready_times[app_config.label] = time.perf_counter() - ready_start
+
+        app_config.ready = timed_ready  # type: ignore[method-assign]
+        return app_config
+
+    AppConfig.create = classmethod(timed_create)  # type: ignore[method-assign, assignment]
+    django.setup()
+    boot = time.perf_counter() - start
+
+    json.dump(
+        {
+            "boot": boot,
+            "ready": ready_times,
+            "apps": {config.label: config.name for config in apps.get_app_configs()},
+        },
+        sys.stdout,
+    )
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Precompile Python sources to bytecode, so that workers do not compile them on first import."""
+import compileall
+import importlib.util
+import os
+import struct
+import sysconfig
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+
+from .staticfiles import walk
+
+#: Directories never searched for sources
+IGNORE_PATTERNS = [".*", "__pycache__", "node_modules"]
+
+#: Below this many files, compiling in-process is faster than starting a process pool
+COMPILE_POOL_THRESHOLD = 64
+
+
+def source_roots(site_packages: bool = False) -> list[str]:
+    """
+    Return the directories to compile: the project, every installed app and optionally site-packages.
+
+    The project directory is ``settings.BASE_DIR``, or the working directory
+    without it. Directories inside another returned directory are left out.
+    """
+    candidates = [Path(getattr(settings, "BASE_DIR", None) or os.getcwd())]
+    candidates += [Path(app_config.path) for app_config in apps.get_app_configs()]
+    if site_packages:
+        candidates += [
+            Path(sysconfig.get_paths()[key]) for key in ("purelib", "platlib")
+        ]
+
+    roots: list[Path] = []
+    for candidate in sorted({path.resolve() for path in candidates}):
+        if candidate.is_dir() and not any(
+            candidate.is_relative_to(root) for root in roots
+        ):
+            roots.append(candidate)
+    return [str(root) for root in roots]
+
+
+def stale_sources(roots: list[str], workers: int = 8) -> tuple[list[str], int]:
+    """
+    Return the sources under ``roots`` whose bytecode is missing or out of date, and the number of sources.
+
+    Sources are found with the same concurrent ``os.scandir`` walk as static
+    files, and only the header of their cached bytecode is read, so
+    directories that are already compiled cost little.
+    """
+    stale = []
+    total = 0
+    for root in roots:
+        for relative, stat in walk(root, IGNORE_PATTERNS, workers).items():
+            if not relative.endswith(".py"):
+                continue
+            total += 1
+            path = os.path.join(root, relative)
+            if not _is_current(path, stat):
+                stale.append(path)
+    return stale, total
+
+
+def _is_current(path: str, stat: os.stat_result) -> bool:
+    """
+    Return whether the cached bytecode of ``path`` was compiled from its current version.
+
+    Like the import system, this compares the source modification time and
+    size recorded in the bytecode header, so a source replaced by an older
+    file, as when a deploy preserves modification times, still counts as
+    stale.
+    """
+    expected = struct.pack(
+        "<4sLLL",
+        importlib.util.MAGIC_NUMBER,
+        0,
+        int(stat.st_mtime) & 0xFFFFFFFF,
+        stat.st_size & 0xFFFFFFFF,
+    )
+    try:
+        # os.open skips the buffered file object, which costs more than the read
+        fd = os.open(importlib.util.cache_from_source(path), os.O_RDONLY)
+    except OSError:
+        return False
+    try:
+        return os.read(fd, 16) == expected
+    finally:
+        os.close(fd)
+
+
+def compile_sources(paths: list[str], workers: int | None = None) -> list[str]:
+    """
+    Compile ``paths`` across a process pool.
+
+    Returns:
+        The paths that could not be compiled, such as sources with syntax
+        errors or in read-only directories
+    """
+    if len(paths) < COMPILE_POOL_THRESHOLD:
+        results = [_compile(path) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            results = list(pool.map(_compile, paths, chunksize=64))
+    return [path for path, compiled in zip(paths, results) if not compiled]
+
+
+def _compile(path: str) -> bool:
+    # stale_sources already checked the header, which compileall only
+    # compares by modification time
+    return bool(compileall.compile_file(path, quiet=2, force=True))
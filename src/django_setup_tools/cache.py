@@ -0,0 +1,162 @@
+"""
+Generational cache keys, so that a deploy can invalidate a cache without flushing it.
+
+Use :func:`generational_key` as the ``KEY_FUNCTION`` of a cache alias::
+
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": "redis://127.0.0.1:6379",
+            "KEY_FUNCTION": "django_setup_tools.cache.generational_key",
+        },
+    }
+
+Every key then includes a generation number stored in the cache itself.
+:func:`bump_generation` (run by the ``invalidate_caches`` script) moves all
+processes to fresh keys, while the old entries simply expire.
+"""
+import sys
+import threading
+import time
+import weakref
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache, default_key_func
+from django.core.cache.backends.locmem import LocMemCache
+
+#: Cache key holding the current generation; it is not itself generational
+GENERATION_KEY = "django_setup_tools:generation"
+
+#: Seconds a process trusts its cached generation before reading it again
+GENERATION_TTL = 30.0
+
+# Generation of each alias and until when it is trusted
+_generations: dict[str, tuple[int, float]] = {}
+_lock = threading.Lock()
+
+# Alias of each cache instance calling generational_key
+_aliases: weakref.WeakKeyDictionary[BaseCache, str] = weakref.WeakKeyDictionary()
+
+
+def generational_key(key: str, key_prefix: str, version: Any) -> str:
+    """Build a cache key that includes the current generation of its cache."""
+    if key == GENERATION_KEY:
+        return default_key_func(key, key_prefix, version)
+    alias = _calling_alias(key_prefix)
+    generation = current_generation(alias) if alias is not None else 0
+    return f"{key_prefix}:{version}:g{generation}:{key}"
+
+
+def is_generational(cache: BaseCache) -> bool:
+    """Return whether ``cache`` uses :func:`generational_key`."""
+    return cache.key_func is generational_key
+
+
+def current_generation(alias: str) -> int:
+    """
+    Return the generation of the generational cache ``alias``.
+
+    The value is kept in memory for :data:`GENERATION_TTL` seconds, so
+    processes that are already running move to the new generation within
+    that time.
+    """
+    now = time.monotonic()
+    with _lock:
+        cached = _generations.get(alias)
+    if cached and cached[1] > now:
+        return cached[0]
+    generation: int = caches[alias].get(GENERATION_KEY, 0)
+    with _lock:
+        _generations[alias] = (generation, now + GENERATION_TTL)
+    return generation
+
+
+def bump_generation(cache: BaseCache) -> int:
+    """Move ``cache`` to a new generation and return it."""
+    cache.add(GENERATION_KEY, 0, timeout=None)
+    generation: int = cache.incr(GENERATION_KEY)
+    alias = alias_of(cache)
+    if alias is not None:
+        with _lock:
+            _generations.pop(alias, None)
+    return generation
+
+
+def alias_of(cache: BaseCache) -> str | None:
+    """Return the alias ``cache`` was created for in this thread, if any."""
+    aliases: list[str] = list(settings.CACHES)
+    return next((alias for alias in aliases if caches[alias] is cache), None)
+
+
+def _calling_alias(key_prefix: str) -> str | None:
+    """
+    Return the alias of the cache making a key.
+
+    Key functions are not told which cache calls them, so the cache is
+    taken from the ``make_key`` frame calling :func:`generational_key`;
+    django-redis calls it from a client referring to the cache as
+    ``_backend``. Failing that, the first generational cache using
+    ``key_prefix`` is assumed.
+    """
+    caller = sys._getframe(2).f_locals.get("self")
+    caller = getattr(caller, "_backend", caller)
+    if isinstance(caller, BaseCache):
+        alias = _aliases.get(caller) or alias_of(caller)
+        if alias is not None:
+            _aliases[caller] = alias
+            return alias
+    aliases: list[str] = list(settings.CACHES)
+    for alias in aliases:
+        cache = caches[alias]
+        if is_generational(cache) and cache.key_prefix == key_prefix:
+            return alias
+    return None
+
+
+def delete_prefix(cache: BaseCache, prefix: str) -> int:
+    """
+    Delete the keys of ``cache`` that start with ``prefix`` and return how many.
+
+    Supports backends providing ``delete_pattern`` (such as django-redis),
+    Django's Redis backend and the local-memory backend.
+
+    Raises:
+        NotImplementedError: If the backend cannot enumerate its keys
+    """
+    if hasattr(cache, "delete_pattern"):
+        return cache.delete_pattern(f"{prefix}*") or 0
+
+    made_prefix = cache.make_key(prefix)
+    if isinstance(cache, LocMemCache):
+        return _delete_locmem_prefix(cache, made_prefix)
+    if _is_redis_cache(cache):
+        return _delete_redis_prefix(cache, made_prefix)
+
+    msg = f"{type(cache).__name__} cannot delete keys by prefix"
+    raise NotImplementedError(msg)
+
+
+def _is_redis_cache(cache: BaseCache) -> bool:
+    try:
+        from django.core.cache.backends.redis import RedisCache
+    except ImportError:  # Django < 4.0 has no Redis backend
+        return False
+    return isinstance(cache, RedisCache)
+
+
+def _delete_locmem_prefix(cache: Any, made_prefix: str) -> int:
+    """Delete by prefix through the private state of the local-memory backend."""
+    with cache._lock:
+        keys = [key for key in cache._cache if key.startswith(made_prefix)]
+        for key in keys:
+            cache._delete(key)
+    return len(keys)
+
+
+def _delete_redis_prefix(cache: Any, made_prefix: str) -> int:
+    """Delete by prefix through the client of Django's Redis backend."""
+    client = cache._cache.get_client(write=True)
+    keys = list(client.scan_iter(match=f"{made_prefix}*"))
+    return client.delete(*keys) if keys else 0
@@ -0,0 +1,126 @@
+"""Dependency-aware execution of setup scripts."""
+import contextlib
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, ContextManager, TypeVar
+
+from django.db import connections
+
+from .specs import topological_order
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+#: Factory of the context manager entered around every script on a worker thread
+ThreadContext = Callable[[], ContextManager[Any]]
+
+
+def _run_in_thread(
+    run: Callable[[U], T], item: U, context: ThreadContext | None = None
+) -> T:
+    """Run one item in a worker thread and release its database connections."""
+    try:
+        with context() if context else contextlib.nullcontext():
+            return run(item)
+    finally:
+        connections.close_all()
+
+
+def execute(
+    dependencies: list[set[int]],
+    run: Callable[[int], T],
+    jobs: int = 1,
+    on_start: Callable[[int], None] | None = None,
+    on_done: Callable[[int, T], None] | None = None,
+    context: ThreadContext | None = None,
+) -> None:
+    """
+    Execute scripts respecting their dependencies.
+
+    With ``jobs`` set to 1 scripts run one at a time in the calling thread.
+    Otherwise up to ``jobs`` scripts whose dependencies have completed run
+    concurrently on a thread pool. Execution is fail-fast: after the first
+    failure no further scripts are started, the running ones are allowed to
+    finish and the exception is re-raised.
+
+    Args:
+        dependencies: For each script, the indices of the scripts it waits for
+        run: Callable executing the script with the given index
+        jobs: Maximum number of scripts running at the same time
+        on_start: Called in the calling thread before a script is started
+        on_done: Called in the calling thread with the result of each script
+        context: Returns a context manager entered around every script run on
+            a worker thread, so that thread-local state of the calling thread,
+            such as an active tenant, applies to the workers too
+    """
+    if jobs <= 1:
+        _execute_sequentially(dependencies, run, on_start, on_done)
+    else:
+        _execute_concurrently(dependencies, run, jobs, on_start, on_done, context)
+
+
+def _execute_sequentially(
+    dependencies: list[set[int]],
+    run: Callable[[int], T],
+    on_start: Callable[[int], None] | None,
+    on_done: Callable[[int, T], None] | None,
+) -> None:
+    """Run the scripts one at a time in the calling thread."""
+    for index in topological_order(dependencies):
+        if on_start:
+            on_start(index)
+        result = run(index)
+        if on_done:
+            on_done(index, result)
+
+
+def _execute_concurrently(
+    dependencies: list[set[int]],
+    run: Callable[[int], T],
+    jobs: int,
+    on_start: Callable[[int], None] | None,
+    on_done: Callable[[int, T], None] | None,
+    context: ThreadContext | None,
+) -> None:
+    """Run the scripts on a pool of ``jobs`` threads as their dependencies complete."""
+    remaining = {index: set(deps) for index, deps in enumerate(dependencies)}
+    running: dict[Future[T], int] = {}
+    error: BaseException | None = None
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        while remaining or running:
+            if error is None:
+                ready = sorted(index for index, deps in remaining.items() if not deps)
+                for index in ready[: jobs - len(running)]:
+                    del remaining[index]
+                    if on_start:
+                        on_start(index)
+                    running[pool.submit(_run_in_thread, run, index, context)] = index
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                exc = _finish(future, running.pop(future), remaining, on_done)
+                error = error or exc
+
+    if error is not None:
+        raise error
+
+
+def _finish(
+    future: Future[T],
+    index: int,
+    remaining: dict[int, set[int]],
+    on_done: Callable[[int, T], None] | None,
+) -> BaseException | None:
+    """Handle a finished script, returning its exception if it failed."""
+    exc = future.exception()
+    if exc is not None:
+        return exc
+    if on_done:
+        on_done(index, future.result())
+    for deps in remaining.values():
+        deps.discard(index)
+    return None
@@ -0,0 +1,116 @@
+"""Fingerprinting of the inputs a setup script depends on."""
+import glob
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.migrations.loader import MigrationLoader
+
+from .migration_plan import MigrationPlanCache
+
+#: Keys accepted in the ``inputs`` option of a command specification.
+INPUT_KEYS = frozenset({"files", "settings", "migrations"})
+
+
+def validate_inputs(inputs: Any) -> dict[str, Any]:
+    """
+    Validate the ``inputs`` option of a command specification.
+
+    Raises:
+        ImproperlyConfigured: If the option is malformed
+    """
+    if not isinstance(inputs, dict):
+        msg = f"'inputs' must be a dictionary, got {inputs!r}"
+        raise ImproperlyConfigured(msg)
+    unknown = set(inputs) - INPUT_KEYS
+    if unknown:
+        msg = f"Unknown keys {sorted(unknown)} in 'inputs' {inputs!r}"
+        raise ImproperlyConfigured(msg)
+    validated: dict[str, Any] = dict(inputs)
+    for key in ("files", "settings"):
+        if isinstance(validated.get(key), str):
+            validated[key] = [validated[key]]
+    return validated
+
+
+def _base_dir() -> Path:
+    return Path(getattr(settings, "BASE_DIR", None) or os.getcwd())
+
+
+def _hash_files(digest: Any, patterns: list[str]) -> None:
+    """Hash the path, size and modification time of every matching file."""
+    base = _base_dir()
+    paths: set[str] = set()
+    for pattern in patterns:
+        for match in glob.glob(pattern, root_dir=base, recursive=True):
+            path = base / match
+            if path.is_dir():
+                for root, _dirs, files in os.walk(path):
+                    paths.update(os.path.join(root, name) for name in files)
+            else:
+                paths.add(str(path))
+
+    for name in sorted(paths):
+        try:
+            stat = os.stat(name)
+        except OSError:
+            continue
+        digest.update(f"{name}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+
+
+def _hash_settings(digest: Any, names: list[str]) -> None:
+    for name in names:
+        value = getattr(settings, name, None)
+        digest.update(
+            f"{name}={json.dumps(value, sort_keys=True, default=repr)}\n".encode()
+        )
+
+
+def _hash_migrations(
+    digest: Any, using: str, migration_plans: MigrationPlanCache | None
+) -> None:
+    """Hash the migrations on disk and those applied to the database."""
+    loader = (
+        migration_plans.loader(using)
+        if migration_plans is not None
+        else MigrationLoader(connections[using], ignore_no_migrations=True)
+    )
+    digest.update(json.dumps(sorted(loader.graph.nodes)).encode())
+    digest.update(json.dumps(sorted(loader.applied_migrations or ())).encode())
+
+
+def compute_fingerprint(
+    inputs: dict[str, Any],
+    using: str = "default",
+    migration_plans: MigrationPlanCache | None = None,
+) -> str:
+    """
+    Compute a fingerprint of a script's declared inputs.
+
+    Args:
+        inputs: Mapping with any of ``files`` (glob patterns relative to
+            ``settings.BASE_DIR``), ``settings`` (setting names) and
+            ``migrations`` (``True`` to include the migration graph)
+        using: Database alias whose migration state is fingerprinted
+        migration_plans: Cache to load the migration graph from, so that
+            the graph is only loaded once per alias
+
+    Returns:
+        Hex digest that changes whenever any of the inputs change
+    """
+    digest = hashlib.sha256()
+    if inputs.get("files"):
+        digest.update(b"files\n")
+        _hash_files(digest, inputs["files"])
+    if inputs.get("settings"):
+        digest.update(b"settings\n")
+        _hash_settings(digest, inputs["settings"])
+    if inputs.get("migrations"):
+        digest.update(b"migrations\n")
+        _hash_migrations(digest, using, migration_plans)
+    return digest.hexdigest()
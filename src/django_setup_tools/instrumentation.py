@@ -0,0 +1,209 @@
+"""Per-script timing, query and memory instrumentation."""
+import json
+import threading
+import time
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any
+
+from django.db import connections
+from django.utils import timezone
+
+from .tenancy import TenantResult
+
+
+@dataclass
+class ScriptMetrics:
+    """
+    Measurements taken while running one setup script.
+
+    Attributes:
+        name: Name of the script
+        command: Dotted path or management command name
+        args: Arguments passed to the command
+        phase: Either "on_initial" or "always_run"
+        status: "succeeded", "failed" or "skipped"
+        wall_time: Elapsed time in seconds
+        cpu_time: CPU time in seconds spent by the thread running the script
+        queries: Number of database queries executed, across all aliases
+        query_time: Time in seconds spent executing those queries
+        peak_memory: Peak traced Python allocation in bytes while the script
+            ran, or ``None`` when memory is not being traced. The peak is
+            process wide, so it includes concurrently running scripts.
+        peak_rss: Peak resident set size in bytes of the worker process an
+            isolated script ran in, or ``None`` for scripts run in-process
+        error: Error message for failed scripts
+        tenant: Tenant the script ran for when fanning out over tenants
+    """
+
+    name: str
+    command: str
+    args: list[str] = field(default_factory=list)
+    phase: str = ""
+    status: str = "succeeded"
+    wall_time: float = 0.0
+    cpu_time: float = 0.0
+    queries: int = 0
+    query_time: float = 0.0
+    peak_memory: int | None = None
+    peak_rss: int | None = None
+    error: str = ""
+    tenant: str = ""
+
+
+class QueryCounter:
+    """Database execute wrapper counting queries and the time spent on them."""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.time = 0.0
+
+    def __call__(
+        self,
+        execute: Callable[..., Any],
+        sql: str,
+        params: Any,
+        many: bool,
+        context: Any,
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.time += time.perf_counter() - start
+            self.count += 1
+
+
+# Counter of the script being measured in the current context. Async
+# scripts set it in their own task, and sync_to_async copies it to the
+# thread their ORM calls run on.
+_active_counter: ContextVar[QueryCounter | None] = ContextVar(
+    "django_setup_tools_query_counter", default=None
+)
+
+
+def _count_query(
+    execute: Callable[..., Any],
+    sql: str,
+    params: Any,
+    many: bool,
+    context: Any,
+) -> Any:
+    counter = _active_counter.get()
+    if counter is None:
+        return execute(sql, params, many, context)
+    return counter(execute, sql, params, many, context)
+
+
+@contextmanager
+def count_queries() -> Iterator[None]:
+    """
+    Count the queries made on this thread's connections in the enclosed block.
+
+    Each query is attributed to the :func:`measure` block active in the
+    context that made it, so scripts awaited together on another thread
+    count their own ``sync_to_async`` queries.
+    """
+    with ExitStack() as stack:
+        for alias in connections:
+            if _count_query not in connections[alias].execute_wrappers:
+                stack.enter_context(connections[alias].execute_wrapper(_count_query))
+        yield
+
+
+@contextmanager
+def measure(
+    metrics: ScriptMetrics, trace_memory: bool = False, wrap_connections: bool = True
+) -> Iterator[ScriptMetrics]:
+    """
+    Fill ``metrics`` with measurements of the enclosed block.
+
+    Queries are counted on every database alias for the current thread.
+    Async scripts pass ``wrap_connections=False``, because their queries run
+    on the thread that awaits them, which is wrapped with
+    :func:`count_queries` instead. When ``trace_memory`` is true and
+    :mod:`tracemalloc` is tracing, the peak allocation is reset at the start
+    of the block and read at the end.
+    """
+    counter = QueryCounter()
+    token = _active_counter.set(counter)
+    trace_memory = trace_memory and tracemalloc.is_tracing()
+    if trace_memory:
+        tracemalloc.reset_peak()
+
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    try:
+        with ExitStack() as stack:
+            if wrap_connections:
+                stack.enter_context(count_queries())
+            yield metrics
+    except BaseException as e:
+        metrics.status = "failed"
+        metrics.error = str(e)
+        raise
+    finally:
+        _active_counter.reset(token)
+        metrics.wall_time = time.perf_counter() - wall_start
+        metrics.cpu_time = time.thread_time() - cpu_start
+        metrics.queries = counter.count
+        metrics.query_time = counter.time
+        if trace_memory:
+            metrics.peak_memory = tracemalloc.get_traced_memory()[1]
+
+
+def format_metrics(metrics: ScriptMetrics) -> str:
+    """Summarize the measurements of a script on one line."""
+    text = (
+        f"finished in {metrics.wall_time:.2f}s "
+        f"(cpu {metrics.cpu_time:.2f}s, {metrics.queries} queries in {metrics.query_time:.2f}s"
+    )
+    if metrics.peak_memory is not None:
+        text += f", peak memory {metrics.peak_memory / 1024 / 1024:.1f} MiB"
+    if metrics.peak_rss is not None:
+        text += f", peak RSS {metrics.peak_rss / 1024 / 1024:.1f} MiB"
+    return text + ")"
+
+
+class RunReport:
+    """Collects the metrics of every script in a setup run and writes them as JSON."""
+
+    def __init__(self, environment: str = "") -> None:
+        self.environment = environment
+        self.started_at = timezone.now()
+        self._start = time.perf_counter()
+        self.scripts: list[ScriptMetrics] = []
+        self.tenants: list[TenantResult] = []
+        self._lock = threading.Lock()
+
+    def add(self, metrics: ScriptMetrics) -> None:
+        with self._lock:
+            self.scripts.append(metrics)
+
+    def add_tenant(self, result: TenantResult) -> None:
+        """Record the outcome of running the plan for one tenant."""
+        with self._lock:
+            self.tenants.append(result)
+
+    def as_dict(self, status: str = "succeeded") -> dict[str, Any]:
+        report = {
+            "environment": self.environment,
+            "started_at": self.started_at.isoformat(),
+            "duration": time.perf_counter() - self._start,
+            "status": status,
+            "scripts": [asdict(metrics) for metrics in self.scripts],
+        }
+        if self.tenants:
+            report["tenants"] = [
+                {key: value for key, value in asdict(result).items() if key != "output"}
+                for result in self.tenants
+            ]
+        return report
+
+    def write(self, path: str | Path, status: str = "succeeded") -> None:
+        """Write the report to ``path`` as JSON."""
+        Path(path).write_text(json.dumps(self.as_dict(status), indent=2))
@@ -0,0 +1,215 @@
+"""
+Run a setup script in a fresh Python process.
+
+A specification declaring ``"isolate": True`` is run by
+``python -m django_setup_tools.isolation``, which sets Django up and runs the
+script like the ``setup`` command would. Memory the script allocates, and any
+state it leaks, is returned to the system when the process exits, instead of
+staying around for the rest of the run.
+
+The worker limits its own address space to ``memory_limit`` bytes before
+importing Django, so a script exceeding it fails with a ``MemoryError``. Its
+output is streamed back line by line, and its peak resident set size is read
+from the resource usage reported when it is reaped.
+"""
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import types
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import IO, Any, cast
+
+from django.core.exceptions import ImproperlyConfigured
+
+resource: types.ModuleType | None
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+#: Keys accepted by the ``isolate`` key of a specification and by
+#: ``DJANGO_SETUP_TOOLS_ISOLATION``
+ISOLATE_KEYS = frozenset({"memory_limit", "timeout"})
+
+
+@dataclass
+class IsolatedRun:
+    """
+    Outcome of a script run in a worker process.
+
+    Attributes:
+        returncode: Exit status of the worker; negative when killed by a signal
+        peak_rss: Peak resident set size of the worker in bytes, or ``None``
+            when the platform does not report it
+        timed_out: Whether the worker was killed for exceeding its timeout
+        error: Last line the worker wrote, which describes a failure
+    """
+
+    returncode: int
+    peak_rss: int | None = None
+    timed_out: bool = False
+    error: str = ""
+
+
+def validate_isolate(isolate: Any) -> dict[str, Any] | None:
+    """
+    Normalize the ``isolate`` key of a specification.
+
+    ``False`` means the script runs in-process, ``True`` that it runs in a
+    worker with the default options and a dictionary overrides some of them.
+
+    Raises:
+        ImproperlyConfigured: If the value or one of its keys is invalid
+    """
+    if isinstance(isolate, bool):
+        return {} if isolate else None
+    if not isinstance(isolate, dict):
+        msg = f"'isolate' must be a boolean or a dictionary, got {isolate!r}"
+        raise ImproperlyConfigured(msg)
+    unknown = set(isolate) - ISOLATE_KEYS
+    if unknown:
+        msg = f"Unknown isolate keys {sorted(unknown)}; expected {sorted(ISOLATE_KEYS)}"
+        raise ImproperlyConfigured(msg)
+    for key, value in isolate.items():
+        if value is not None and (
+            isinstance(value, bool) or not isinstance(value, int | float) or value <= 0
+        ):
+            msg = f"'isolate' option '{key}' must be a positive number or None, got {value!r}"
+            raise ImproperlyConfigured(msg)
+    return dict(isolate)
+
+
+def run_isolated(
+    command: str,
+    args: tuple[str, ...] | list[str],
+    write: Callable[[str], Any],
+    *,
+    database: str | None = None,
+    memory_limit: int | None = None,
+    timeout: float | None = None,
+) -> IsolatedRun:
+    """
+    Run a script or management command in a worker process.
+
+    Args:
+        command: Dotted path to a function or management command name
+        args: Arguments passed to the command
+        write: Called with every line of output as soon as the worker writes it
+        database: Database alias the script targets
+        memory_limit: Maximum address space of the worker in bytes
+        timeout: Seconds after which the worker is killed
+
+    Raises:
+        ImproperlyConfigured: If settings were not loaded from a settings module
+    """
+    from django.conf import ENVIRONMENT_VARIABLE, settings
+
+    # Overridden settings, as in tests, hide the module they override
+    settings_module = getattr(settings, "SETTINGS_MODULE", None) or os.environ.get(
+        ENVIRONMENT_VARIABLE
+    )
+    if not settings_module:
+        msg = "Isolated scripts need settings loaded from DJANGO_SETTINGS_MODULE"
+        raise ImproperlyConfigured(msg)
+
+    payload = {
+        "command": command,
+        "args": list(args),
+        "database": database,
+        "memory_limit": memory_limit,
+    }
+    env = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": settings_module,
+        "PYTHONPATH": os.pathsep.join(path for path in sys.path if path),
+        "PYTHONUNBUFFERED": "1",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "django_setup_tools.isolation", json.dumps(payload)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        stdin=subprocess.DEVNULL,
+        text=True,
+        env=env,
+        # Own process group, so a timeout also kills whatever the script started
+        start_new_session=hasattr(os, "killpg"),
+    )
+
+    killed = threading.Event()
+
+    def kill() -> None:
+        killed.set()
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:  # pragma: no cover
+            process.kill()
+
+    timer = threading.Timer(timeout, kill) if timeout else None
+    if timer is not None:
+        timer.daemon = True
+        timer.start()
+
+    # Never None, since stdout is a pipe
+    stdout = cast(IO[str], process.stdout)
+    last = ""
+    try:
+        for line in stdout:
+            line = line.rstrip("\n")
+            write(line)
+            if line.strip():
+                last = line.strip()
+    finally:
+        stdout.close()
+        result = _reap(process)
+        if timer is not None:
+            timer.cancel()
+    result.timed_out = killed.is_set()
+    result.error = last
+    return result
+
+
+def _reap(process: subprocess.Popen[str]) -> IsolatedRun:
+    """Wait for the worker, collecting its own resource usage where possible."""
+    if not hasattr(os, "wait4"):  # pragma: no cover
+        return IsolatedRun(returncode=process.wait())
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is in kilobytes, except on macOS where it is in bytes
+    peak_rss = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return IsolatedRun(returncode=process.returncode, peak_rss=peak_rss)
+
+
+def main() -> None:
+    """Run the script described by the JSON payload in ``sys.argv[1]``."""
+    payload = json.loads(sys.argv[1])
+    if payload["memory_limit"] and resource is not None:
+        limit = int(payload["memory_limit"])
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    import django
+
+    try:
+        django.setup()
+        from django_setup_tools.management.commands.setup import Command
+
+        command = Command()
+        command.database = payload["database"]
+        command.run_script(payload["command"], *payload["args"])
+    except Exception as e:
+        if isinstance(e, MemoryError) or isinstance(e.__cause__, MemoryError):
+            # A MemoryError has no message of its own
+            print(
+                f"Out of memory (limit {payload['memory_limit']} bytes)",
+                file=sys.stderr,
+            )
+        else:
+            print(e, file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Persistent ledger of setup script runs."""
+import hashlib
+import json
+import statistics
+import threading
+from typing import Any
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .models import ScriptRun
+from .specs import ScriptSpec
+
+SUCCESSFUL = (ScriptRun.Status.SUCCEEDED, ScriptRun.Status.ADOPTED)
+
+
+def args_hash(args: tuple[Any, ...]) -> str:
+    """Return a stable hash of a script's arguments."""
+    return hashlib.sha256(json.dumps(list(args), default=str).encode()).hexdigest()
+
+
+class Ledger:
+    """
+    Records script runs in the :class:`~django_setup_tools.models.ScriptRun` table.
+
+    On a fresh database the ledger table only appears once ``migrate`` has run,
+    which is usually one of the ``on_initial`` scripts itself. Runs finished
+    before the table exists are kept in memory and written as soon as it does.
+
+    Only the last ``DJANGO_SETUP_TOOLS_LEDGER_RETENTION`` runs of each script
+    are kept, along with its last successful run, which decides whether an
+    ``on_initial`` script runs again.
+    """
+
+    def __init__(self, using: str = "default", environment: str = "") -> None:
+        self.using = using
+        self.environment = environment
+        self.retention: int | None = getattr(
+            settings, "DJANGO_SETUP_TOOLS_LEDGER_RETENTION", 20
+        )
+        self._available = False
+        self._pending: list[ScriptRun] = []
+        # Scripts written since the last prune, as (phase, command, args_hash, database)
+        self._unpruned: set[tuple[str, str, str, str]] = set()
+        self._lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        """Return whether the ledger table exists in the database."""
+        if not self._available:
+            try:
+                connection = connections[self.using]
+                self._available = (
+                    ScriptRun._meta.db_table in connection.introspection.table_names()
+                )
+            except DatabaseError:
+                return False
+        return self._available
+
+    def _queryset(self, phase: str, spec: ScriptSpec) -> QuerySet[ScriptRun]:
+        return self._runs(phase, spec.command, args_hash(spec.args), spec.database)
+
+    def _runs(
+        self, phase: str, command: str, hashed_args: str, database: str | None
+    ) -> QuerySet[ScriptRun]:
+        return ScriptRun.objects.using(self.using).filter(
+            phase=phase,
+            command=command,
+            args_hash=hashed_args,
+            database=database or "",
+        )
+
+    def has_history(self, phase: str, database: str | None = None) -> bool:
+        """
+        Return whether any script has been recorded for ``phase``.
+
+        When ``database`` is given, only scripts targeting that alias count;
+        an empty string selects the scripts that declare no database.
+        """
+        if not self.is_available():
+            return False
+        runs = ScriptRun.objects.using(self.using).filter(phase=phase)
+        if database is not None:
+            runs = runs.filter(database=database)
+        return runs.exists()
+
+    def has_succeeded(self, phase: str, spec: ScriptSpec) -> bool:
+        """Return whether ``spec`` has completed successfully in ``phase`` before."""
+        if not self.is_available():
+            return False
+        return self._queryset(phase, spec).filter(status__in=SUCCESSFUL).exists()
+
+    def last_fingerprint(self, phase: str, spec: ScriptSpec) -> str | None:
+        """Return the input fingerprint of the last successful run of ``spec``."""
+        if not self.is_available():
+            return None
+        run = (
+            self._queryset(phase, spec)
+            .filter(status=ScriptRun.Status.SUCCEEDED)
+            .first()
+        )
+        return run.fingerprint if run and run.fingerprint else None
+
+    def estimated_duration(
+        self, phase: str, spec: ScriptSpec, samples: int = 5
+    ) -> float | None:
+        """
+        Estimate how long ``spec`` takes from its recent successful runs.
+
+        Returns the median duration of the last ``samples`` successful runs,
+        or ``None`` when the script has never completed.
+        """
+        if not self.is_available():
+            return None
+        durations: list[float] = sorted(
+            self._queryset(phase, spec)
+            .filter(status=ScriptRun.Status.SUCCEEDED, duration__isnull=False)
+            .values_list("duration", flat=True)[:samples]
+        )
+        if not durations:
+            return None
+        return statistics.median(durations)
+
+    def start(self, phase: str, spec: ScriptSpec) -> ScriptRun:
+        """Record that ``spec`` has started and return the run record."""
+        run = ScriptRun(
+            phase=phase,
+            command=spec.command,
+            arguments=list(spec.args),
+            args_hash=args_hash(spec.args),
+            database=spec.database or "",
+            environment=self.environment,
+            started_at=timezone.now(),
+        )
+        if self.is_available():
+            run.save(using=self.using)
+        return run
+
+    def finish(
+        self, run: ScriptRun, error: BaseException | None = None, fingerprint: str = ""
+    ) -> None:
+        """Record the outcome of a run started with :meth:`start`."""
+        run.fingerprint = fingerprint
+        run.finished_at = timezone.now()
+        run.duration = (run.finished_at - run.started_at).total_seconds()
+        run.status = ScriptRun.Status.FAILED if error else ScriptRun.Status.SUCCEEDED
+        run.error = str(error) if error else ""
+        with self._lock:
+            self._pending.append(run)
+        self.flush()
+
+    def adopt(self, phase: str, specs: list[ScriptSpec]) -> None:
+        """
+        Mark scripts as completed without running them.
+
+        Used for databases that were initialized before the ledger existed,
+        so that their ``on_initial`` scripts are not run a second time.
+        """
+        now = timezone.now()
+        for spec in specs:
+            if self.has_succeeded(phase, spec):
+                continue
+            run = ScriptRun(
+                phase=phase,
+                command=spec.command,
+                arguments=list(spec.args),
+                args_hash=args_hash(spec.args),
+                database=spec.database or "",
+                environment=self.environment,
+                status=ScriptRun.Status.ADOPTED,
+                started_at=now,
+                finished_at=now,
+            )
+            with self._lock:
+                self._pending.append(run)
+        self.flush()
+
+    def flush(self) -> None:
+        """Write pending run records if the ledger table exists."""
+        if not self.is_available():
+            return
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for run in pending:
+            run.save(using=self.using)
+        with self._lock:
+            self._unpruned.update(
+                (run.phase, run.command, run.args_hash, run.database) for run in pending
+            )
+
+    def prune(self) -> int:
+        """
+        Delete the runs beyond the retention of the scripts written since the last prune, and return how many.
+
+        The runs of all those scripts are read in one query, so the setup
+        command prunes once at the end of a phase rather than after every
+        script. The last successful run is kept whatever its age, so that
+        pruning never makes an ``on_initial`` script run again or forgets the
+        fingerprint of its inputs.
+        """
+        with self._lock:
+            keys, self._unpruned = self._unpruned, set()
+        if self.retention is None or not keys:
+            return 0
+        runs = ScriptRun.objects.using(self.using).filter(
+            phase__in={key[0] for key in keys},
+            command__in={key[1] for key in keys},
+            args_hash__in={key[2] for key in keys},
+        )
+        seen: dict[tuple[str, str, str, str], int] = {}
+        last_successful = set()
+        last_succeeded = set()
+        stale = []
+        for pk, phase, command, hashed_args, database, status in runs.values_list(
+            "pk", "phase", "command", "args_hash", "database", "status"
+        ):
+            key = (phase, command, hashed_args, database)
+            if key not in keys:
+                continue
+            seen[key] = seen.get(key, 0) + 1
+            keep = seen[key] <= self.retention
+            if status in SUCCESSFUL and key not in last_successful:
+                last_successful.add(key)
+                keep = True
+            if status == ScriptRun.Status.SUCCEEDED and key not in last_succeeded:
+                last_succeeded.add(key)
+                keep = True
+            if not keep:
+                stale.append(pk)
+        deleted = 0
+        # Stay below the number of parameters SQLite accepts in a query
+        for i in range(0, len(stale), 500):
+            count, _ = (
+                ScriptRun.objects.using(self.using)
+                .filter(pk__in=stale[i : i + 500])
+                .delete()
+            )
+            deleted += count
+        return deleted
@@ -0,0 +1,110 @@
+"""Cluster-wide lock ensuring only one replica runs the setup scripts."""
+import hashlib
+import os
+import socket
+import time
+import uuid
+from datetime import timedelta
+
+from django.db import IntegrityError, connections, transaction
+from django.utils import timezone
+
+from .models import SetupLock
+
+
+class DistributedLock:
+    """
+    A named lock shared by every process using the same database.
+
+    PostgreSQL and MySQL/MariaDB use session-level advisory locks, which are
+    released automatically if the holding process dies. Other backends use a
+    row in the :class:`~django_setup_tools.models.SetupLock` table, which
+    expires after ``ttl`` seconds so a crashed holder cannot block forever.
+    """
+
+    def __init__(
+        self,
+        name: str = "django_setup_tools",
+        using: str = "default",
+        ttl: float = 3600,
+    ) -> None:
+        self.name = name
+        self.using = using
+        self.ttl = ttl
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.held = False
+
+    @property
+    def key(self) -> int:
+        """Signed 64-bit advisory lock key derived from the lock name."""
+        return int.from_bytes(
+            hashlib.sha256(self.name.encode()).digest()[:8], "big", signed=True
+        )
+
+    @property
+    def vendor(self) -> str:
+        return connections[self.using].vendor
+
+    def acquire(self) -> bool:
+        """Try to acquire the lock without blocking and return whether it was acquired."""
+        if self.vendor == "postgresql":
+            self.held = bool(self._query("SELECT pg_try_advisory_lock(%s)", self.key))
+        elif self.vendor == "mysql":
+            self.held = self._query("SELECT GET_LOCK(%s, 0)", self.name) == 1
+        else:
+            self.held = self._acquire_row()
+        return self.held
+
+    def release(self) -> None:
+        """Release the lock if this instance holds it."""
+        if not self.held:
+            return
+        if self.vendor == "postgresql":
+            self._query("SELECT pg_advisory_unlock(%s)", self.key)
+        elif self.vendor == "mysql":
+            self._query("SELECT RELEASE_LOCK(%s)", self.name)
+        else:
+            SetupLock.objects.using(self.using).filter(
+                name=self.name, owner=self.owner
+            ).delete()
+        self.held = False
+
+    def wait_until_released(self, timeout: float, interval: float = 1.0) -> bool:
+        """
+        Poll until the lock is free, without keeping it.
+
+        Returns:
+            True once the lock was seen free, False if ``timeout`` expired first
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.acquire():
+                self.release()
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(interval, remaining))
+
+    def _query(self, sql: str, param: int | str) -> object:
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(sql, [param])
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    def _acquire_row(self) -> bool:
+        now = timezone.now()
+        locks = SetupLock.objects.using(self.using)
+        try:
+            # Take over locks left behind by a holder that died
+            locks.filter(name=self.name, expires_at__lt=now).delete()
+            with transaction.atomic(using=self.using):
+                locks.create(
+                    name=self.name,
+                    owner=self.owner,
+                    acquired_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl),
+                )
+        except IntegrityError:
+            return False
+        return True
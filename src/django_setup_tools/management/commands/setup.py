@@ -1,14 +1,64 @@
 """Django management command for running setup scripts."""
-from typing import Any, Union
+import asyncio
+import copy
+import functools
+import inspect
+import time
+import tracemalloc
+from io import StringIO
+from typing import Any
 
+from asgiref.sync import async_to_sync, sync_to_async
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.core.management import call_command
-from django.core.management.base import BaseCommand, CommandError
-from django.db import connection
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+    OutputWrapper,
+)
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connection, connections
 from django.db.migrations.recorder import MigrationRecorder
 from django.utils.module_loading import import_string
 
-CommandSpec = Union[str, list[str], tuple[str, ...]]
+from django_setup_tools.executor import ThreadContext, execute
+from django_setup_tools.fingerprint import compute_fingerprint
+from django_setup_tools.instrumentation import (
+    RunReport,
+    ScriptMetrics,
+    count_queries,
+    format_metrics,
+    measure,
+)
+from django_setup_tools.isolation import run_isolated, validate_isolate
+from django_setup_tools.ledger import Ledger
+from django_setup_tools.locking import DistributedLock
+from django_setup_tools.migration_plan import MigrationPlanCache, plain_migrate_alias
+from django_setup_tools.models import ScriptRun
+from django_setup_tools.plan import (
+    PHASES,
+    PhasePlan,
+    SetupPlan,
+    accepts_database,
+    compile_phase,
+    get_commands_for,
+    get_plan,
+)
+from django_setup_tools.readiness import wait_for_database
+from django_setup_tools.specs import (
+    CommandSpec,
+    ScriptSpec,
+    critical_path,
+    merge_groups,
+)
+from django_setup_tools.tenancy import (
+    TenantResult,
+    activate,
+    fan_out,
+    load_tenants,
+    tenant_context,
+)
 
 
 class Command(BaseCommand):
@@ -24,10 +74,125 @@ class Command(BaseCommand):
 
     help = "Run declarative setup scripts for Django deployment"
 
+    # Set on per-script copies of the command when output is being captured
+    _output_buffer: StringIO | None = None
+
+    # Records script runs; set up by handle()
+    ledger: Ledger | None = None
+
+    # Ignore input fingerprints and run every always_run script
+    force = False
+
+    # Collects per-script metrics; set up by handle()
+    report: RunReport | None = None
+    trace_memory = False
+
+    # Maximum number of concurrent async scripts awaited at the same time
+    async_limit = 10
+
+    # Database alias targeted by the running script; set on per-script copies
+    database: str | None = None
+
+    # Databases (by spec "database" key) whose on_initial scripts are not run
+    initialized_databases: frozenset[str] = frozenset()
+
+    # Dotted path of the tenant enumerator when fanning out over tenants
+    tenants_path = ""
+    tenant_workers = 4
+
+    # Tenant being set up and what activates it in another thread; set on
+    # per-tenant copies of the command
+    tenant = ""
+    activate_tenant: ThreadContext | None = None
+
+    # Phases to run; set up by handle()
+    phases: tuple[str, ...] = PHASES
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.migration_plans = MigrationPlanCache()
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        """Add command line options."""
+        parser.add_argument(
+            "--jobs",
+            "-j",
+            type=int,
+            default=1,
+            help="Number of independent scripts to run concurrently (default: 1).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Run always_run scripts even when their declared inputs are unchanged, "
+            "and run migrate even when no migrations are pending.",
+        )
+        parser.add_argument(
+            "--lock",
+            action="store_true",
+            help="Acquire a cluster-wide lock so that only one replica runs the setup scripts.",
+        )
+        parser.add_argument(
+            "--lock-timeout",
+            type=float,
+            default=600,
+            help="Seconds a replica waits for the lock holder to finish (default: 600).",
+        )
+        parser.add_argument(
+            "--async-limit",
+            type=int,
+            default=10,
+            help="Maximum number of concurrent async scripts awaited at the same time (default: 10).",
+        )
+        parser.add_argument(
+            "--report",
+            metavar="PATH",
+            help="Write per-script timing, query and memory measurements to PATH as JSON.",
+        )
+        parser.add_argument(
+            "--tenants",
+            metavar="PATH",
+            help="Dotted path to a callable returning the tenants to run the setup scripts for "
+            "(default: the DJANGO_SETUP_TOOLS_TENANTS setting).",
+        )
+        parser.add_argument(
+            "--tenant-workers",
+            type=int,
+            default=4,
+            help="Number of tenants set up concurrently (default: 4).",
+        )
+        parser.add_argument(
+            "--wait-for-db",
+            type=float,
+            metavar="SECONDS",
+            help="Seconds to wait for the databases to accept connections before running anything; "
+            "0 disables the wait (default: the DJANGO_SETUP_TOOLS_DB_WAIT setting, or 30).",
+        )
+        parser.add_argument(
+            "--env",
+            help="Environment whose scripts to run (default: the DJANGO_SETUP_TOOLS_ENV setting).",
+        )
+        parser.add_argument(
+            "--phase",
+            action="append",
+            dest="phases",
+            choices=PHASES,
+            help="Only run this phase; repeat to run several (default: every phase).",
+        )
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Validate the configuration, imports and command names without running anything.",
+        )
+        parser.add_argument(
+            "--plan",
+            action="store_true",
+            help="Show which scripts would run or be skipped, with estimated durations, without running them.",
+        )
+
     def handle(self, *args: Any, **options: Any) -> None:
         """Execute the setup command."""
-        # Get the environment, defaulting to "" if not set
-        env = getattr(settings, "DJANGO_SETUP_TOOLS_ENV", "")
+        env = self.apply_options(options)
 
         # Get the setup tools configuration
         setup_tools = getattr(settings, "DJANGO_SETUP_TOOLS", {})
@@ -40,14 +205,366 @@ class Command(BaseCommand):
             )
             return
 
+        plan = get_plan(setup_tools, env)
+        if options.get("check"):
+            self.check_plan(plan)
+            return
+        self.validate_plan(plan)
+
+        wait = self.db_wait_timeout(options)
+        if wait > 0:
+            self.wait_for_databases(plan, wait)
+
+        if options.get("plan"):
+            self.show_plan(plan)
+            return
+
+        self.run_with_report(plan, env, options)
+
+    def apply_options(self, options: dict[str, Any]) -> str:
+        """Set up the command from its options and return the environment to run."""
+        self.force = options.get("force", False)
+        self.async_limit = options.get("async_limit") or 10
+        self.tenants_path = (
+            options.get("tenants")
+            or getattr(settings, "DJANGO_SETUP_TOOLS_TENANTS", "")
+            or ""
+        )
+        self.tenant_workers = options.get("tenant_workers") or 4
+        self.phases = tuple(
+            phase for phase in PHASES if phase in (options.get("phases") or PHASES)
+        )
+
+        # Get the environment, defaulting to "" if not set
+        env: str | None = options.get("env")
+        if env is None:
+            env = getattr(settings, "DJANGO_SETUP_TOOLS_ENV", "")
+        return env or ""
+
+    def db_wait_timeout(self, options: dict[str, Any]) -> float:
+        """Return the seconds to wait for the databases; 0 disables the wait."""
+        wait = options.get("wait_for_db")
+        if wait is None:
+            wait = getattr(settings, "DJANGO_SETUP_TOOLS_DB_WAIT", 30)
+        # None disables the wait like 0 does
+        return float(wait or 0)
+
+    def run_with_report(
+        self, plan: SetupPlan, env: str, options: dict[str, Any]
+    ) -> None:
+        """Run the plan, measuring it and writing the report asked for with ``--report``."""
+        jobs = options.get("jobs") or 1
+        self.report = RunReport(environment=env)
+        report_path = options.get("report")
+        # Tracing allocations slows Python down, so only do it for reports
+        self.trace_memory = bool(report_path)
+        start_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if start_tracing:
+            tracemalloc.start()
+
+        status = "failed"
+        try:
+            if options.get("lock"):
+                self.run_with_lock(plan, jobs, options.get("lock_timeout", 600))
+            else:
+                self.run_plan(plan, jobs)
+            status = "succeeded"
+        finally:
+            if start_tracing:
+                tracemalloc.stop()
+            if report_path:
+                self.report.write(report_path, status)
+                self.stdout.write(f"Report written to {report_path}")
+
+    def check_plan(self, plan: SetupPlan) -> None:
+        """
+        Report every problem in the compiled plan without running anything.
+
+        Unknown management commands count as problems here even though a
+        normal run only warns about them.
+        """
+        problems = plan.errors + plan.warnings
+        for problem in problems:
+            self.stdout.write(self.style.ERROR(f"✗ {problem}"))
+        if problems:
+            msg = f"Setup plan has {len(problems)} problem(s)"
+            raise CommandError(msg)
+        counts = ", ".join(
+            f"{len(phase.specs)} {name}" for name, phase in plan.phases.items()
+        )
+        self.stdout.write(self.style.SUCCESS(f"✓ Setup plan is valid ({counts})"))
+
+    def validate_plan(self, plan: SetupPlan) -> None:
+        """Refuse to run a plan that would fail part way through."""
+        if plan.errors:
+            msg = "Invalid DJANGO_SETUP_TOOLS configuration:\n" + "\n".join(plan.errors)
+            raise CommandError(msg)
+        for warning in plan.warnings:
+            self.stdout.write(self.style.WARNING(f"⚠ {warning}"))
+
+    def show_plan(self, plan: SetupPlan) -> None:
+        """
+        Print what a run would do without running any script.
+
+        Each script is shown with whether it would run or be skipped and its
+        estimated duration: the median of its recent successful runs in the
+        ledger. The total is given both for sequential execution and for the
+        critical path, the longest chain of dependent scripts, which bounds
+        the duration with unlimited ``--jobs``.
+        """
+        self.ledger = Ledger(using=plan.database, environment=plan.environment)
         self.stdout.write(
-            self.style.NOTICE("Running initialization scripts (django_setup_tools):")
+            self.style.MIGRATE_HEADING(
+                f"Setup plan (environment: {plan.environment or 'default'}):"
+            )
+        )
+
+        sequential = critical = 0.0
+        unknown = 0
+        self.initialized_databases = self.find_initialized_databases(
+            plan.phases["on_initial"].specs
+        )
+        initialize = not self.initialized_databases.issuperset(
+            self.database_keys(plan.phases["on_initial"].specs)
+        )
+        for phase, phase_plan in plan.phases.items():
+            heading = phase
+            if phase == "on_initial" and not initialize:
+                heading += " (database already initialized)"
+            self.stdout.write(self.style.NOTICE(f"{heading}:"))
+            if not phase_plan.specs:
+                self.stdout.write("  (no scripts)")
+                continue
+
+            durations = []
+            for i, spec in enumerate(phase_plan.specs, 1):
+                reason = self.skip_reason(spec, phase)
+                estimate = (
+                    None if reason else self.ledger.estimated_duration(phase, spec)
+                )
+                if reason:
+                    action, detail = "skip", reason
+                elif estimate is None:
+                    action, detail = "run", "no history"
+                    unknown += 1
+                else:
+                    action, detail = "run", f"~{estimate:.2f}s"
+                durations.append(estimate or 0.0)
+                self.stdout.write(f"  {i:>3}. {spec.name:<40} {action:<5} {detail}")
+
+            sequential += sum(durations)
+            critical += critical_path(phase_plan.dependencies, durations)
+
+        summary = f"Estimated duration: {sequential:.2f}s sequential, {critical:.2f}s critical path"
+        if unknown:
+            summary += f" ({unknown} script(s) without history not included)"
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def wait_for_databases(self, plan: SetupPlan, timeout: float) -> None:
+        """
+        Wait until every database the plan uses accepts queries.
+
+        Otherwise a database that is still starting up would make
+        ``is_initialized`` assume it is initialized, skipping the
+        ``on_initial`` scripts, and the first real script would fail.
+
+        Raises:
+            CommandError: If a database is not ready within ``timeout`` seconds
+        """
+        aliases = {plan.database}
+        for phase in plan.phases.values():
+            aliases.update(spec.database for spec in phase.specs if spec.database)
+
+        deadline = time.monotonic() + timeout
+        for alias in sorted(aliases):
+            result = wait_for_database(alias, max(deadline - time.monotonic(), 0))
+            if not result.ready:
+                msg = f"Database '{alias}' was not ready after {timeout}s ({result.attempts} attempts): {result.error}"
+                raise CommandError(msg)
+            if result.attempts > 1:
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"✓ Database '{alias}' ready after {result.waited:.1f}s ({result.attempts} attempts)"
+                    )
+                )
+
+    def run_with_lock(self, plan: SetupPlan, jobs: int, timeout: float) -> None:
+        """
+        Run the setup scripts only if this process wins the cluster-wide lock.
+
+        Args:
+            plan: The compiled setup plan
+            jobs: Maximum number of scripts running at the same time
+            timeout: Seconds to wait for another lock holder to finish
+        """
+        lock = DistributedLock()
+        try:
+            acquired = lock.acquire()
+        except DatabaseError as e:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Could not acquire the setup lock ({e}); running without it."
+                )
+            )
+            self.run_plan(plan, jobs)
+            return
+
+        if not acquired:
+            self.run_as_follower(plan, lock, timeout)
+            return
+
+        try:
+            self.run_plan(plan, jobs)
+        finally:
+            lock.release()
+
+    def run_plan(self, plan: SetupPlan, jobs: int = 1) -> None:
+        """Run the plan once, or once per tenant when a tenant enumerator is set."""
+        if self.tenants_path:
+            self.run_tenants(plan, jobs)
+        else:
+            self.run_phases(plan, jobs)
+
+    def run_tenants(self, plan: SetupPlan, jobs: int = 1) -> None:
+        """
+        Run the plan for every tenant on a bounded pool of worker threads.
+
+        Tenants are database aliases unless ``DJANGO_SETUP_TOOLS_TENANT_CONTEXT``
+        provides a way to activate them. A failing tenant does not stop the
+        others; the failures are reported together once every tenant is done.
+
+        Args:
+            plan: The compiled setup plan
+            jobs: Maximum number of scripts running at the same time per tenant
+        """
+        try:
+            tenants = load_tenants(self.tenants_path)
+            context = tenant_context()
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e)) from e
+        if context is None:
+            unknown = [
+                str(tenant) for tenant in tenants if tenant not in settings.DATABASES
+            ]
+            if unknown:
+                msg = (
+                    f"Tenants {unknown} are not database aliases; "
+                    "set DJANGO_SETUP_TOOLS_TENANT_CONTEXT to activate other kinds of tenants"
+                )
+                raise CommandError(msg)
+
+        self.stdout.write(
+            self.style.NOTICE(
+                f"Running setup for {len(tenants)} tenant(s), {self.tenant_workers} at a time:"
+            )
+        )
+
+        def run(tenant: Any) -> TenantResult:
+            return self.run_tenant(
+                plan if context else plan.for_database(tenant), tenant, context, jobs
+            )
+
+        failed = []
+        for result in fan_out(tenants, run, self.tenant_workers):
+            if self.report:
+                self.report.add_tenant(result)
+            if result.status == "succeeded":
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"✓ {result.tenant} finished in {result.duration:.2f}s"
+                    )
+                )
+                continue
+            failed.append(result.tenant)
+            self.stdout.write(
+                self.style.ERROR(f"✗ {result.tenant} failed: {result.error}")
+            )
+            for line in result.output.splitlines():
+                self.stdout.write(f"[{result.tenant}] {line}")
+
+        self.stdout.write(
+            f"{len(tenants) - len(failed)} tenant(s) succeeded, {len(failed)} failed."
         )
+        if failed:
+            msg = f"Setup failed for {len(failed)} of {len(tenants)} tenant(s): {', '.join(failed)}"
+            raise CommandError(msg)
+
+    def run_tenant(
+        self, plan: SetupPlan, tenant: Any, context: Any, jobs: int = 1
+    ) -> TenantResult:
+        """Run the plan for one tenant on a private copy of the command, capturing its output."""
+        handler = self._capturing_copy()
+        handler.tenant = str(tenant)
+        # Scripts run on the executor's worker threads with --jobs activate it too
+        handler.activate_tenant = functools.partial(activate, tenant, context)
+        # Each tenant has its own schema or database, so its own pending migrations
+        handler.migration_plans = MigrationPlanCache()
+        result = TenantResult(tenant=handler.tenant)
+        start = time.perf_counter()
+        try:
+            with handler.activate_tenant():
+                handler.run_phases(plan, jobs)
+        except Exception as e:
+            result.status = "failed"
+            result.error = str(e)
+        result.duration = time.perf_counter() - start
+        if handler._output_buffer is not None:
+            result.output = handler._output_buffer.getvalue()
+        return result
 
-        if not self.is_initialized():
-            commands = self.get_commands(setup_tools, env, "on_initial")
-            if commands:
-                self.run_all(commands)
+    def run_phases(self, plan: SetupPlan, jobs: int = 1) -> None:
+        """
+        Run the on_initial scripts (when needed) followed by the always_run scripts.
+
+        Only the phases in ``self.phases`` are run.
+
+        Args:
+            plan: The compiled setup plan
+            jobs: Maximum number of scripts running at the same time
+        """
+        self.ledger = Ledger(using=plan.database, environment=plan.environment)
+        try:
+            if "on_initial" in self.phases:
+                self.run_initial_phase(plan, jobs)
+            if "always_run" in self.phases:
+                self.stdout.write(
+                    self.style.MIGRATE_HEADING(
+                        "Running setup scripts (django_setup_tools):"
+                    )
+                )
+                always_run = plan.phases["always_run"]
+                if always_run.specs:
+                    self.run_phase(always_run, jobs=jobs, phase="always_run")
+                else:
+                    self.stdout.write(
+                        self.style.HTTP_INFO("No always-run scripts configured.")
+                    )
+        finally:
+            # Once for all the scripts, rather than a query after each one
+            self.ledger.prune()
+
+    def run_initial_phase(self, plan: SetupPlan, jobs: int = 1) -> None:
+        """Run the on_initial scripts of the databases that are not initialized yet."""
+        self.stdout.write(
+            self.style.NOTICE("Running initialization scripts (django_setup_tools):")
+        )
+        on_initial = plan.phases["on_initial"]
+        self.initialized_databases = self.find_initialized_databases(on_initial.specs)
+        # Initialized before the ledger existed: never rerun these scripts
+        if self.ledger is not None:
+            self.ledger.adopt(
+                "on_initial",
+                [
+                    spec
+                    for spec in on_initial.specs
+                    if (spec.database or "") in self.initialized_databases
+                ],
+            )
+        if not self.initialized_databases.issuperset(
+            self.database_keys(on_initial.specs)
+        ):
+            if on_initial.specs:
+                self.run_phase(on_initial, jobs=jobs, phase="on_initial")
             else:
                 self.stdout.write(
                     self.style.HTTP_INFO("No initialization scripts configured.")
@@ -57,19 +574,75 @@ class Command(BaseCommand):
                 self.style.HTTP_INFO("Database already initialized... skipping.")
             )
 
+    def run_as_follower(
+        self, plan: SetupPlan, lock: DistributedLock, timeout: float
+    ) -> None:
+        """
+        Wait for the replica holding the lock to finish, then run follower scripts.
+
+        Only ``always_run`` scripts declared with ``"followers": True`` are run
+        by followers; everything else is left to the replica holding the lock.
+        """
         self.stdout.write(
-            self.style.MIGRATE_HEADING("Running setup scripts (django_setup_tools):")
+            self.style.NOTICE(
+                "Another replica is running the setup scripts; waiting for it to finish..."
+            )
         )
-        commands = self.get_commands(setup_tools, env, "always_run")
-        if commands:
-            self.run_all(commands)
-        else:
-            self.stdout.write(self.style.HTTP_INFO("No always-run scripts configured."))
+        if not lock.wait_until_released(timeout):
+            msg = f"Timed out after {timeout}s waiting for the setup lock"
+            raise CommandError(msg)
+
+        self.ledger = Ledger(using=plan.database, environment=plan.environment)
+        specs = []
+        if "always_run" in self.phases:
+            specs = [spec for spec in plan.phases["always_run"].specs if spec.followers]
+        if not specs:
+            self.stdout.write(
+                self.style.HTTP_INFO("Setup completed by another replica... skipping.")
+            )
+            return
+
+        self.stdout.write(
+            self.style.MIGRATE_HEADING("Running follower scripts (django_setup_tools):")
+        )
+        try:
+            for i, spec in enumerate(specs, 1):
+                self.stdout.write(f"Running script {i}/{len(specs)}...")
+                self.run_spec(spec, "always_run")
+        finally:
+            self.ledger.prune()
 
-    def is_initialized(self) -> bool:
+    @staticmethod
+    def database_keys(specs: list[ScriptSpec]) -> set[str]:
+        """
+        Return the databases ``specs`` target, by their ``database`` key.
+
+        Scripts without a database are keyed by ``""`` and belong to the
+        default database, which is also returned when there are no scripts.
+        """
+        return {spec.database or "" for spec in specs} or {""}
+
+    def find_initialized_databases(self, specs: list[ScriptSpec]) -> frozenset[str]:
+        """
+        Return the databases whose ``on_initial`` scripts must not run.
+
+        A database is initialized when its migrations table exists while the
+        ledger holds no ``on_initial`` run for it, meaning it was set up
+        before the ledger existed. Each alias is tracked separately.
+        """
+        initialized = set()
+        for key in self.database_keys(specs):
+            if self.ledger is not None and self.ledger.has_history("on_initial", key):
+                continue
+            if self.is_initialized(key or DEFAULT_DB_ALIAS):
+                initialized.add(key)
+        return frozenset(initialized)
+
+    def is_initialized(self, using: str = DEFAULT_DB_ALIAS) -> bool:
         """Check if the database has been initialized by looking for migration tables."""
         try:
-            return MigrationRecorder(connection).has_table()
+            db = connection if using == DEFAULT_DB_ALIAS else connections[using]
+            return MigrationRecorder(db).has_table()
         except Exception as e:
             self.stdout.write(
                 self.style.WARNING(
@@ -95,32 +668,343 @@ class Command(BaseCommand):
         Returns:
             List of command specifications to execute
         """
-        # Fetch the default scripts (under the "" key)
-        commands = defaults.get("", {}).get(command_type, [])
+        return get_commands_for(defaults, env, command_type)
 
-        if env and env in defaults:
-            # Append the environment-specific scripts
-            commands = commands + defaults.get(env, {}).get(command_type, [])
-
-        return commands
-
-    def run_all(self, commands: list[CommandSpec]) -> None:
+    def run_all(
+        self, commands: list[CommandSpec], jobs: int = 1, phase: str = ""
+    ) -> None:
         """
         Execute all commands in the list.
 
+        Commands run in declaration order unless they declare dependencies with
+        ``after``. When ``jobs`` is greater than 1, scripts whose dependencies
+        have completed run concurrently and their output is written, prefixed
+        with the script name, once each script finishes.
+
+        When a ``phase`` is given every run is recorded in the ledger and
+        scripts are skipped as decided by :meth:`should_skip`.
+
         Args:
             commands: List of command specifications to execute
+            jobs: Maximum number of scripts running at the same time
+            phase: Either "on_initial" or "always_run"
         """
-        for i, command in enumerate(commands, 1):
-            self.stdout.write(f"Running script {i}/{len(commands)}...")
+        # Import errors are left for run_script to report when reached
+        plan = compile_phase(commands, resolve=False)
+        if plan.errors:
+            raise CommandError(plan.errors[0])
+        self.run_phase(plan, jobs=jobs, phase=phase)
+
+    def run_phase(self, plan: PhasePlan, jobs: int = 1, phase: str = "") -> None:
+        """
+        Execute the scripts of a compiled phase.
+
+        Args:
+            plan: The compiled phase
+            jobs: Maximum number of scripts running at the same time
+            phase: Either "on_initial" or "always_run"
+        """
+        specs = plan.specs
+        # Consecutive concurrent-safe async scripts share one event loop
+        groups = self._async_groups(specs, plan.dependencies, plan.targets or None)
+        outputs: dict[int, str] = {}
+
+        def start(node: int) -> None:
+            for index in groups[node]:
+                self.stdout.write(f"Running script {index + 1}/{len(specs)}...")
+
+        def run(node: int) -> None:
+            handlers = {
+                index: self if jobs <= 1 else self._capturing_copy()
+                for index in groups[node]
+            }
             try:
-                if isinstance(command, list | tuple):
-                    self.run_script(*command)
+                if len(handlers) == 1:
+                    [(index, handler)] = handlers.items()
+                    handler.run_spec(specs[index], phase)
                 else:
-                    self.run_script(command)
-            except Exception as e:
-                msg = f"Failed to execute command {command}: {e}"
-                raise CommandError(msg) from e
+                    # The scripts' sync_to_async queries run on this thread
+                    with count_queries():
+                        async_to_sync(self._run_concurrently)(
+                            [
+                                (handler, specs[index])
+                                for index, handler in handlers.items()
+                            ],
+                            phase,
+                        )
+            finally:
+                for index, handler in handlers.items():
+                    if handler is not self and handler._output_buffer is not None:
+                        outputs[index] = handler._output_buffer.getvalue()
+
+        def done(node: int, result: None) -> None:
+            for index in groups[node]:
+                self._write_captured(specs[index], outputs.pop(index, ""))
+
+        try:
+            execute(
+                merge_groups(groups, plan.dependencies),
+                run,
+                jobs=jobs,
+                on_start=start,
+                on_done=done,
+                context=self.activate_tenant,
+            )
+        finally:
+            # Output of scripts that failed or were still running at the failure
+            for index in sorted(outputs):
+                self._write_captured(specs[index], outputs[index])
+
+    def _async_groups(
+        self,
+        specs: list[ScriptSpec],
+        dependencies: list[set[int]],
+        targets: list[Any] | None = None,
+    ) -> list[list[int]]:
+        """
+        Group consecutive concurrent-safe async scripts.
+
+        A script joins the group of the script before it when both are
+        ``async def`` functions declared with ``"concurrent": True`` and it
+        depends on nothing but that previous script. ``targets`` holds the
+        functions already resolved by the plan compiler, if any.
+        """
+        groups: list[list[int]] = []
+        previous_async = False
+        for index, spec in enumerate(specs):
+            if spec.isolate is not None:
+                is_async = False
+            elif targets is not None:
+                is_async = spec.concurrent and inspect.iscoroutinefunction(
+                    targets[index]
+                )
+            else:
+                is_async = spec.concurrent and self._is_async(spec)
+            if is_async and previous_async and dependencies[index] == {index - 1}:
+                groups[-1].append(index)
+            else:
+                groups.append([index])
+            previous_async = is_async
+        return groups
+
+    def _is_async(self, spec: ScriptSpec) -> bool:
+        """Return whether the script is an ``async def`` function."""
+        if "." not in spec.command:
+            return False
+        try:
+            return inspect.iscoroutinefunction(import_string(spec.command))
+        except ImportError:
+            # Reported when the script is run
+            return False
+
+    async def _run_concurrently(
+        self, items: list[tuple["Command", ScriptSpec]], phase: str
+    ) -> None:
+        """Await async scripts together, at most ``async_limit`` at a time."""
+        semaphore = asyncio.Semaphore(self.async_limit)
+
+        async def run_one(handler: "Command", spec: ScriptSpec) -> None:
+            async with semaphore:
+                await handler.arun_spec(spec, phase)
+
+        results = await asyncio.gather(
+            *(run_one(handler, spec) for handler, spec in items), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    def run_spec(self, spec: ScriptSpec, phase: str = "") -> None:
+        """
+        Execute a single normalized script, recording it in the ledger.
+
+        Args:
+            spec: The script to execute
+            phase: Either "on_initial" or "always_run"; when empty the ledger
+                is neither consulted nor updated
+        """
+        started = self._start_spec(spec, phase)
+        if started is None:
+            return
+        metrics, record = started
+        try:
+            with measure(metrics, trace_memory=self.trace_memory):
+                if spec.isolate is not None:
+                    self._handler_for(spec).run_isolated(spec, metrics)
+                else:
+                    self._handler_for(spec).run_script(spec.command, *spec.args)
+        except Exception as e:
+            self._finish_spec(spec, phase, metrics, record, e)
+            msg = f"Failed to execute command {spec.raw}: {e}"
+            raise CommandError(msg) from e
+        self._finish_spec(spec, phase, metrics, record)
+
+    async def arun_spec(self, spec: ScriptSpec, phase: str = "") -> None:
+        """
+        Await a single ``async def`` script, recording it in the ledger.
+
+        Ledger bookkeeping runs through ``sync_to_async`` so that no ORM call
+        is made from the event loop.
+        """
+        started = await sync_to_async(self._start_spec)(spec, phase)
+        if started is None:
+            return
+        metrics, record = started
+        try:
+            with measure(
+                metrics, trace_memory=self.trace_memory, wrap_connections=False
+            ):
+                await self._handler_for(spec).arun_script(spec.command, *spec.args)
+        except Exception as e:
+            await sync_to_async(self._finish_spec)(spec, phase, metrics, record, e)
+            msg = f"Failed to execute command {spec.raw}: {e}"
+            raise CommandError(msg) from e
+        await sync_to_async(self._finish_spec)(spec, phase, metrics, record)
+
+    def _start_spec(
+        self, spec: ScriptSpec, phase: str
+    ) -> tuple[ScriptMetrics, ScriptRun | None] | None:
+        """Skip the script or record its start; returns ``None`` when skipped."""
+        ledger = self.ledger if phase else None
+        metrics = ScriptMetrics(
+            name=spec.name,
+            command=spec.command,
+            args=list(spec.args),
+            phase=phase,
+            tenant=self.tenant,
+        )
+        if phase and self.should_skip(spec, phase):
+            metrics.status = "skipped"
+            if self.report:
+                self.report.add(metrics)
+            return None
+        return metrics, ledger.start(phase, spec) if ledger else None
+
+    def _finish_spec(
+        self,
+        spec: ScriptSpec,
+        phase: str,
+        metrics: ScriptMetrics,
+        record: ScriptRun | None,
+        error: BaseException | None = None,
+    ) -> None:
+        """Report the outcome of a script and record it in the ledger."""
+        if spec.command == "migrate":
+            self.migration_plans.invalidate()
+        if self.report:
+            self.report.add(metrics)
+        if error is None:
+            self.stdout.write(
+                self.style.SUCCESS(f"✓ {spec.name} {format_metrics(metrics)}")
+            )
+        if self.ledger is None or record is None:
+            return
+        if error is not None:
+            self.ledger.finish(record, error)
+            return
+        # Fingerprint after the run so scripts that change their own inputs
+        # (such as migrate and the migration graph) are not rerun needlessly
+        fingerprint = (
+            compute_fingerprint(
+                spec.inputs,
+                using=spec.database or DEFAULT_DB_ALIAS,
+                migration_plans=self.migration_plans,
+            )
+            if spec.inputs
+            else ""
+        )
+        self.ledger.finish(record, fingerprint=fingerprint)
+
+    def should_skip(self, spec: ScriptSpec, phase: str) -> bool:
+        """Decide whether a script can be skipped, reporting why it is."""
+        reason = self.skip_reason(spec, phase)
+        if reason is None:
+            return False
+        self.stdout.write(f"Skipping {spec.name} ({reason})")
+        return True
+
+    def skip_reason(self, spec: ScriptSpec, phase: str) -> str | None:
+        """
+        Return why a script would be skipped, or ``None`` if it would run.
+
+        Plain ``migrate`` invocations are skipped when there are no unapplied
+        migrations. ``on_initial`` scripts are skipped once they have
+        succeeded. ``always_run`` scripts declaring ``inputs`` are skipped
+        when the fingerprint of their inputs matches their last successful
+        run. Only the ``on_initial`` check applies when ``--force`` is given.
+        """
+        if (
+            phase == "on_initial"
+            and (spec.database or "") in self.initialized_databases
+        ):
+            return "database already initialized"
+
+        if (
+            spec.command == "migrate"
+            and not self.force
+            and self.migrations_up_to_date(spec)
+        ):
+            return "no unapplied migrations"
+
+        if self.ledger is None:
+            return None
+
+        if phase == "on_initial" and self.ledger.has_succeeded(phase, spec):
+            return "already completed"
+
+        if phase == "always_run" and spec.inputs and not self.force:
+            fingerprint = compute_fingerprint(
+                spec.inputs,
+                using=spec.database or DEFAULT_DB_ALIAS,
+                migration_plans=self.migration_plans,
+            )
+            if fingerprint == self.ledger.last_fingerprint(phase, spec):
+                return "inputs unchanged"
+
+        return None
+
+    def migration_plan(self, using: str = DEFAULT_DB_ALIAS) -> list[tuple[Any, bool]]:
+        """
+        Return the pending migration plan for a database alias.
+
+        The plan is computed once and shared between the ``migrate`` fast path
+        and any script that needs it; running ``migrate`` invalidates it.
+        """
+        return self.migration_plans.plan(using)
+
+    def migrations_up_to_date(self, spec: ScriptSpec) -> bool:
+        """Return whether a ``migrate`` script would apply no migrations."""
+        using = plain_migrate_alias(
+            spec.args, default=spec.database or DEFAULT_DB_ALIAS
+        )
+        if using is None:
+            return False
+        try:
+            return self.migration_plans.is_up_to_date(using)
+        except Exception:
+            # Let migrate itself report whatever is wrong
+            return False
+
+    def _handler_for(self, spec: ScriptSpec) -> "Command":
+        """Return the handler a script runs with, targeting its database if any."""
+        if spec.database is None:
+            return self
+        handler = copy.copy(self)
+        handler.database = spec.database
+        return handler
+
+    def _capturing_copy(self) -> "Command":
+        """Return a copy of this command whose output goes to a private buffer."""
+        handler = copy.copy(self)
+        handler._output_buffer = StringIO()
+        handler.stdout = OutputWrapper(handler._output_buffer)
+        handler.stderr = OutputWrapper(handler._output_buffer)
+        return handler
+
+    def _write_captured(self, spec: ScriptSpec, output: str) -> None:
+        """Write the captured output of a script, attributed to the script."""
+        for line in output.splitlines():
+            self.stdout.write(f"[{spec.name}] {line}")
 
     def run_script(self, command: str, *args: str) -> None:
         """
@@ -136,7 +1020,10 @@ class Command(BaseCommand):
             try:
                 func = import_string(command)
                 self.stdout.write(f"Executing function: {command}")
-                func(self, *args)
+                if inspect.iscoroutinefunction(func):
+                    async_to_sync(func)(self, *args)
+                else:
+                    func(self, *args)
             except ImportError as e:
                 msg = f"Could not import function '{command}': {e}"
                 raise CommandError(msg) from e
@@ -146,8 +1033,90 @@ class Command(BaseCommand):
         else:
             # This is a Django management command
             self.stdout.write(f"Executing management command: {command}")
+            options: dict[str, Any] = {}
+            if self._output_buffer is not None:
+                options = {"stdout": self._output_buffer, "stderr": self._output_buffer}
+            if self.database is not None and accepts_database(command):
+                options["database"] = self.database
             try:
-                call_command(command, *args)
+                call_command(command, *args, **options)
             except Exception as e:
                 msg = f"Error executing management command '{command}': {e}"
                 raise CommandError(msg) from e
+
+    def run_isolated(
+        self, spec: ScriptSpec, metrics: ScriptMetrics | None = None
+    ) -> None:
+        """
+        Execute a script in a worker process, streaming its output.
+
+        The options of ``DJANGO_SETUP_TOOLS_ISOLATION`` apply unless the
+        script's ``isolate`` overrides them.
+
+        Args:
+            spec: The script to execute
+            metrics: Receives the peak RSS of the worker
+        """
+        if self.tenant:
+            msg = f"Script '{spec.name}' cannot be isolated while setting up tenant '{self.tenant}'"
+            raise CommandError(msg)
+        try:
+            # False, like an empty dictionary, keeps the default options
+            options = {
+                **(
+                    validate_isolate(
+                        getattr(settings, "DJANGO_SETUP_TOOLS_ISOLATION", {})
+                    )
+                    or {}
+                ),
+                **(spec.isolate or {}),
+            }
+        except ImproperlyConfigured as e:
+            msg = f"Invalid DJANGO_SETUP_TOOLS_ISOLATION: {e}"
+            raise CommandError(msg) from e
+
+        self.stdout.write(f"Executing in a worker process: {spec.command}")
+        try:
+            result = run_isolated(
+                spec.command,
+                spec.args,
+                self.stdout.write,
+                database=self.database,
+                memory_limit=options.get("memory_limit"),
+                timeout=options.get("timeout"),
+            )
+        except (ImproperlyConfigured, OSError) as e:
+            msg = f"Could not start a worker process for '{spec.command}': {e}"
+            raise CommandError(msg) from e
+        if metrics is not None:
+            metrics.peak_rss = result.peak_rss
+
+        if result.timed_out:
+            msg = f"Isolated script '{spec.command}' did not finish within {options['timeout']}s"
+            raise CommandError(msg)
+        if result.returncode < 0:
+            msg = f"Isolated script '{spec.command}' was killed by signal {-result.returncode}"
+            raise CommandError(msg)
+        if result.returncode:
+            msg = f"Isolated script '{spec.command}' failed: {result.error or f'exit status {result.returncode}'}"
+            raise CommandError(msg)
+
+    async def arun_script(self, command: str, *args: str) -> None:
+        """
+        Await a single ``async def`` script.
+
+        Args:
+            command: Dotted path to an ``async def`` function
+            *args: Arguments to pass to the function
+        """
+        try:
+            func = import_string(command)
+        except ImportError as e:
+            msg = f"Could not import function '{command}': {e}"
+            raise CommandError(msg) from e
+        self.stdout.write(f"Executing function: {command}")
+        try:
+            await func(self, *args)
+        except Exception as e:
+            msg = f"Error executing function '{command}': {e}"
+            raise CommandError(msg) from e
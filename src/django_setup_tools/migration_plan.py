@@ -0,0 +1,109 @@
+"""Shared computation of the pending migration plan."""
+import re
+import threading
+from typing import Any
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+from django.db.migrations.loader import MigrationLoader
+
+# Arguments of ``migrate`` that do not change which migrations are applied
+PASSIVE_FLAGS = frozenset(
+    {
+        "--no-input",
+        "--noinput",
+        "--skip-checks",
+        "--no-color",
+        "--force-color",
+        "--traceback",
+    }
+)
+PASSIVE_OPTIONS = frozenset(
+    {"--database", "-v", "--verbosity", "--settings", "--pythonpath"}
+)
+
+
+def plain_migrate_alias(
+    args: tuple[str, ...], default: str = DEFAULT_DB_ALIAS
+) -> str | None:
+    """
+    Return the database alias a plain ``migrate`` invocation targets.
+
+    The alias is taken from ``--database`` and falls back to ``default``.
+
+    A plain invocation migrates every app to its latest migration. Returns
+    ``None`` when the arguments select specific apps or migrations, or ask
+    for anything other than a normal forward migration (``--fake``,
+    ``--plan``, ``--run-syncdb``, ...).
+    """
+    using = default
+    remaining = list(args)
+    while remaining:
+        arg = remaining.pop(0)
+        if arg in PASSIVE_FLAGS or re.fullmatch(r"-v\d", arg):
+            continue
+        name, has_value, value = arg.partition("=")
+        if name not in PASSIVE_OPTIONS:
+            return None
+        if not has_value:
+            if not remaining:
+                return None
+            value = remaining.pop(0)
+        if name == "--database":
+            using = value
+    return using
+
+
+class MigrationPlanCache:
+    """
+    Computes the pending migration plan once per database alias.
+
+    The plan, and the migration graph it is computed from, are shared by the
+    ``migrate`` fast path, input fingerprints and any script that needs them,
+    and must be invalidated whenever migrations are applied.
+    """
+
+    def __init__(self) -> None:
+        self._executors: dict[str, MigrationExecutor] = {}
+        self._plans: dict[str, list[tuple[Any, bool]]] = {}
+        self._conflicts: dict[str, bool] = {}
+        self._lock = threading.Lock()
+
+    def _executor(self, using: str) -> MigrationExecutor:
+        # Called with the lock held
+        if using not in self._executors:
+            self._executors[using] = MigrationExecutor(connections[using])
+        return self._executors[using]
+
+    def loader(self, using: str = DEFAULT_DB_ALIAS) -> MigrationLoader:
+        """Return the migration graph and applied migrations of ``using``."""
+        with self._lock:
+            return self._executor(using).loader
+
+    def plan(self, using: str = DEFAULT_DB_ALIAS) -> list[tuple[Any, bool]]:
+        """Return the ``(migration, backwards)`` pairs ``migrate`` would apply."""
+        with self._lock:
+            if using not in self._plans:
+                executor = self._executor(using)
+                targets = executor.loader.graph.leaf_nodes()
+                self._conflicts[using] = bool(executor.loader.detect_conflicts())
+                self._plans[using] = executor.migration_plan(targets)
+            return self._plans[using]
+
+    def is_up_to_date(self, using: str = DEFAULT_DB_ALIAS) -> bool:
+        """Return whether ``migrate`` would have nothing to do on ``using``."""
+        plan = self.plan(using)
+        # Leave conflicting migrations for migrate itself to report
+        return not plan and not self._conflicts[using]
+
+    def invalidate(self, using: str | None = None) -> None:
+        """Forget the cached plan for ``using``, or for every alias."""
+        with self._lock:
+            if using is None:
+                self._executors.clear()
+                self._plans.clear()
+                self._conflicts.clear()
+            else:
+                self._executors.pop(using, None)
+                self._plans.pop(using, None)
+                self._conflicts.pop(using, None)
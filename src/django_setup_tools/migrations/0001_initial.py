@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ScriptRun",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("phase", models.CharField(max_length=20)),
+                ("command", models.CharField(max_length=255)),
+                ("arguments", models.JSONField(default=list)),
+                ("args_hash", models.CharField(max_length=64)),
+                ("environment", models.CharField(blank=True, max_length=100)),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("running", "Running"),
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                            ("adopted", "Adopted"),
+                        ],
+                        default="running",
+                        max_length=20,
+                    ),
+                ),
+                ("started_at", models.DateTimeField()),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "duration",
+                    models.FloatField(
+                        blank=True, help_text="Duration in seconds", null=True
+                    ),
+                ),
+                ("error", models.TextField(blank=True)),
+            ],
+            options={
+                "ordering": ["-started_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["phase", "command", "args_hash"],
+                        name="django_setu_phase_098a0a_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_setup_tools", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scriptrun",
+            name="fingerprint",
+            field=models.CharField(
+                blank=True,
+                help_text="Hash of the script's declared inputs",
+                max_length=64,
+            ),
+        ),
+    ]
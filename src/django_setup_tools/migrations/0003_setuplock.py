@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_setup_tools", "0002_scriptrun_fingerprint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SetupLock",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=100, primary_key=True, serialize=False),
+                ),
+                ("owner", models.CharField(max_length=255)),
+                ("acquired_at", models.DateTimeField()),
+                ("expires_at", models.DateTimeField()),
+            ],
+        ),
+    ]
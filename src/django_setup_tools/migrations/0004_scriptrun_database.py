@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("django_setup_tools", "0003_setuplock"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scriptrun",
+            name="database",
+            field=models.CharField(
+                blank=True,
+                help_text="Database alias the script targets",
+                max_length=100,
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+"""Models for Django Setup Tools."""
+from __future__ import annotations
+
+from datetime import datetime
+
+from django.db import models
+
+
+class ScriptRun(models.Model):
+    """
+    A record of one execution of a setup script.
+
+    The ledger of script runs is used to run each ``on_initial`` script
+    exactly once, to resume a partially completed first run and to keep a
+    history of how long each script takes.
+    """
+
+    class Status(models.TextChoices):
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        FAILED = "failed", "Failed"
+        ADOPTED = "adopted", "Adopted"
+
+    phase: models.CharField[str, str] = models.CharField(max_length=20)
+    command: models.CharField[str, str] = models.CharField(max_length=255)
+    arguments = models.JSONField(default=list)
+    args_hash: models.CharField[str, str] = models.CharField(max_length=64)
+    environment: models.CharField[str, str] = models.CharField(
+        max_length=100, blank=True
+    )
+    database: models.CharField[str, str] = models.CharField(
+        max_length=100, blank=True, help_text="Database alias the script targets"
+    )
+    status: models.CharField[str, str] = models.CharField(
+        max_length=20, choices=Status.choices, default=Status.RUNNING
+    )
+    started_at: models.DateTimeField[datetime, datetime] = models.DateTimeField()
+    finished_at: models.DateTimeField[
+        datetime | None, datetime | None
+    ] = models.DateTimeField(null=True, blank=True)
+    duration: models.FloatField[float | None, float | None] = models.FloatField(
+        null=True, blank=True, help_text="Duration in seconds"
+    )
+    error: models.TextField[str, str] = models.TextField(blank=True)
+    fingerprint: models.CharField[str, str] = models.CharField(
+        max_length=64, blank=True, help_text="Hash of the script's declared inputs"
+    )
+
+    class Meta:
+        ordering = ["-started_at"]
+        indexes = [models.Index(fields=["phase", "command", "args_hash"])]
+
+    def __str__(self) -> str:
+        return f"{self.command} ({self.phase}, {self.status})"
+
+
+class SetupLock(models.Model):
+    """
+    A lock row used to elect a single replica to run setup.
+
+    Only used on database backends without advisory locks (such as SQLite).
+    """
+
+    name: models.CharField[str, str] = models.CharField(
+        max_length=100, primary_key=True
+    )
+    owner: models.CharField[str, str] = models.CharField(max_length=255)
+    acquired_at: models.DateTimeField[datetime, datetime] = models.DateTimeField()
+    expires_at: models.DateTimeField[datetime, datetime] = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.name} (held by {self.owner})"
@@ -0,0 +1,253 @@
+"""Compilation and validation of the setup configuration into a plan."""
+import functools
+import hashlib
+import json
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import get_commands, load_command_class
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.module_loading import import_string
+
+from .registry import lookup
+from .specs import CommandSpec, ScriptSpec, parse_spec, resolve_dependencies
+
+PHASES = ("on_initial", "always_run")
+
+
+@dataclass
+class PhasePlan:
+    """
+    The compiled scripts of one phase.
+
+    Attributes:
+        specs: Normalized scripts in declaration order
+        dependencies: For each script, the indices of the scripts it waits for
+        targets: For each script, the resolved function for dotted paths or
+            ``None`` for management commands and unresolvable paths; empty
+            when the phase was compiled without resolving
+        errors: Problems that make the phase impossible to run
+        warnings: Problems that only fail when the script is reached
+    """
+
+    specs: list[ScriptSpec] = field(default_factory=list)
+    dependencies: list[set[int]] = field(default_factory=list)
+    targets: list[Callable[..., Any] | None] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+
+
+@dataclass
+class SetupPlan:
+    """
+    The compiled ``on_initial`` and ``always_run`` phases for an environment.
+
+    ``database`` is the alias holding the ledger and used by scripts that do
+    not declare their own ``database``.
+    """
+
+    environment: str
+    phases: dict[str, PhasePlan]
+    database: str = DEFAULT_DB_ALIAS
+
+    @property
+    def errors(self) -> list[str]:
+        return [
+            f"{phase}: {error}"
+            for phase, plan in self.phases.items()
+            for error in plan.errors
+        ]
+
+    @property
+    def warnings(self) -> list[str]:
+        return [
+            f"{phase}: {warning}"
+            for phase, plan in self.phases.items()
+            for warning in plan.warnings
+        ]
+
+    def __len__(self) -> int:
+        return sum(len(plan.specs) for plan in self.phases.values())
+
+    def for_database(self, alias: str) -> "SetupPlan":
+        """Return a copy of the plan whose scripts default to the database ``alias``."""
+        phases = {
+            name: replace(
+                plan,
+                specs=[
+                    replace(spec, database=spec.database or alias)
+                    for spec in plan.specs
+                ],
+            )
+            for name, plan in self.phases.items()
+        }
+        return SetupPlan(environment=self.environment, phases=phases, database=alias)
+
+
+def get_commands_for(
+    config: dict[str, dict[str, list[CommandSpec]]], env: str, phase: str
+) -> list[CommandSpec]:
+    """Return the default scripts of ``phase`` followed by those of ``env``."""
+    commands = list(config.get("", {}).get(phase, []))
+    if env and env in config:
+        commands += config[env].get(phase, [])
+    return commands
+
+
+def compile_phase(commands: list[CommandSpec], resolve: bool = True) -> PhasePlan:
+    """
+    Normalize, order and resolve the scripts of one phase.
+
+    Every dotted path is imported and every management command name is looked
+    up now, so that mistakes are reported before anything runs. Problems are
+    collected on the returned plan rather than raised. Short names of scripts
+    registered with :func:`~django_setup_tools.registry.setup_script` are
+    replaced by their dotted path, whether or not the phase is resolved.
+
+    Args:
+        commands: The command specifications of the phase
+        resolve: Whether to import dotted paths and look up command names;
+            when false ``targets`` is left empty
+    """
+    plan = PhasePlan()
+    for command in commands:
+        try:
+            plan.specs.append(parse_spec(command))
+        except ImproperlyConfigured as e:
+            plan.errors.append(str(e))
+    if plan.errors:
+        return plan
+
+    plan.specs = resolve_short_names(plan.specs)
+    try:
+        plan.dependencies = resolve_dependencies(plan.specs)
+    except ImproperlyConfigured as e:
+        plan.errors.append(str(e))
+    if not resolve:
+        return plan
+
+    available_commands = get_commands()
+    for spec in plan.specs:
+        plan.targets.append(_resolve_target(spec, available_commands, plan))
+    return plan
+
+
+def _resolve_target(
+    spec: ScriptSpec, available_commands: dict[str, Any], plan: PhasePlan
+) -> Callable[..., Any] | None:
+    """
+    Return the function ``spec`` runs, or None for a management command.
+
+    Problems are recorded on ``plan``.
+    """
+    if spec.database is not None and spec.database not in settings.DATABASES:
+        plan.errors.append(
+            f"Script '{spec.name}' targets unknown database '{spec.database}'"
+        )
+    if "." not in spec.command:
+        if spec.command not in available_commands:
+            plan.warnings.append(f"Unknown management command '{spec.command}'")
+        return None
+    try:
+        return import_string(spec.command)  # type: ignore[no-any-return]
+    except ImportError as e:
+        plan.errors.append(f"Could not import function '{spec.command}': {e}")
+        return None
+
+
+def resolve_short_names(specs: list[ScriptSpec]) -> list[ScriptSpec]:
+    """
+    Replace short script names by the dotted path they are registered under.
+
+    Management commands take precedence over registered scripts of the same
+    name. The ``inputs`` and ``concurrent`` a script was registered with only
+    apply when the specification does not declare its own.
+    """
+    available_commands = get_commands()
+    resolved = []
+    for spec in specs:
+        script = (
+            None
+            if "." in spec.command or spec.command in available_commands
+            else lookup(spec.command)
+        )
+        if script is not None:
+            declared = spec.raw if isinstance(spec.raw, dict) else {}
+            spec = replace(
+                spec,
+                command=script.path,
+                inputs=spec.inputs if "inputs" in declared else script.inputs,
+                concurrent=spec.concurrent
+                if "concurrent" in declared
+                else script.concurrent,
+            )
+        resolved.append(spec)
+    return resolved
+
+
+@functools.cache
+def accepts_database(command: str) -> bool:
+    """Return whether the management command ``command`` has a ``--database`` option."""
+    app_name = get_commands()[command]
+    instance = (
+        app_name
+        if isinstance(app_name, BaseCommand)
+        else load_command_class(app_name, command)
+    )
+    parser = instance.create_parser("", command)
+    return any(action.dest == "database" for action in parser._actions)
+
+
+def compile_plan(
+    config: dict[str, dict[str, list[CommandSpec]]], env: str
+) -> SetupPlan:
+    """Compile every phase of ``config`` for the environment ``env``."""
+    return SetupPlan(
+        environment=env,
+        phases={
+            phase: compile_phase(get_commands_for(config, env, phase))
+            for phase in PHASES
+        },
+    )
+
+
+_cache: dict[str, SetupPlan] = {}
+_cache_lock = threading.Lock()
+
+
+def _settings_hash(config: Any, env: str) -> str:
+    """Hash everything that affects the compiled plan."""
+    # Scripts are validated against the database aliases
+    payload = json.dumps(
+        [config, env, list(settings.INSTALLED_APPS), sorted(settings.DATABASES)],
+        sort_keys=True,
+        default=repr,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def get_plan(
+    config: dict[str, dict[str, list[CommandSpec]]] | None = None,
+    env: str | None = None,
+) -> SetupPlan:
+    """
+    Return the compiled plan, reusing it while the settings are unchanged.
+
+    Args:
+        config: The setup configuration; defaults to ``settings.DJANGO_SETUP_TOOLS``
+        env: The environment name; defaults to ``settings.DJANGO_SETUP_TOOLS_ENV``
+    """
+    if config is None:
+        config = getattr(settings, "DJANGO_SETUP_TOOLS", {})
+    if env is None:
+        env = getattr(settings, "DJANGO_SETUP_TOOLS_ENV", "")
+    key = _settings_hash(config, env)
+    with _cache_lock:
+        if key not in _cache:
+            _cache[key] = compile_plan(config, env)
+        return _cache[key]
@@ -0,0 +1,52 @@
+"""Wait for databases to accept queries before the setup scripts run."""
+import time
+from dataclasses import dataclass
+
+from django.db import DatabaseError, connections
+
+
+@dataclass
+class Readiness:
+    """Outcome of waiting for one database alias."""
+
+    alias: str
+    ready: bool
+    attempts: int
+    waited: float
+    error: str = ""
+
+
+def wait_for_database(
+    using: str, timeout: float, initial: float = 0.05, maximum: float = 1.0
+) -> Readiness:
+    """
+    Poll ``using`` with ``SELECT 1`` until it answers or ``timeout`` expires.
+
+    The first retry comes after ``initial`` seconds and the interval doubles
+    up to ``maximum``, so a database that comes up is noticed quickly without
+    hammering one that is still starting. Only database errors are retried;
+    anything else, such as a missing driver, is raised straight away.
+    """
+    db = connections[using]
+    start = time.monotonic()
+    deadline = start + timeout
+    interval = initial
+    attempts = 0
+    while True:
+        attempts += 1
+        try:
+            with db.cursor() as cursor:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+        except DatabaseError as e:
+            # Drop the broken connection so that the next attempt reconnects
+            db.close()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return Readiness(
+                    using, False, attempts, time.monotonic() - start, str(e)
+                )
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, maximum)
+        else:
+            return Readiness(using, True, attempts, time.monotonic() - start)
@@ -0,0 +1,290 @@
+"""
+Registry of setup scripts that can be referred to by a short name.
+
+Scripts are registered with the :func:`setup_script` decorator and found in
+three places:
+
+- the ``setup_scripts`` module of every installed app,
+- the ``django_setup_tools.scripts`` entry point group of installed packages,
+  whose entry points name either a script or a module of decorated scripts,
+- the built-in scripts of :mod:`django_setup_tools.scripts`.
+
+Discovery imports all of these modules, so its result is cached on disk, by
+default in a directory private to the user. The cache is keyed by the
+installed package versions and by the modification times of the apps'
+``setup_scripts`` modules, so that later runs look names up without
+importing anything. A cached index is only trusted when its file is not
+writable by other users and every script in it belongs to one of the
+packages discovery imports.
+"""
+import functools
+import hashlib
+import importlib.util
+import json
+import os
+import stat
+import sys
+import types
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
+from importlib.metadata import entry_points
+from typing import Any
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import autodiscover_modules
+
+from .fingerprint import validate_inputs
+
+#: Entry point group through which packages provide setup scripts
+ENTRY_POINT_GROUP = "django_setup_tools.scripts"
+
+#: Module of an installed app holding its setup scripts
+APP_MODULE = "setup_scripts"
+
+# Bumped when the format of the cached index changes
+_INDEX_VERSION = 1
+
+
+@dataclass(frozen=True)
+class RegisteredScript:
+    """
+    A setup script known by a short name.
+
+    Attributes:
+        name: Short name used in ``DJANGO_SETUP_TOOLS`` instead of the dotted path
+        path: Dotted path of the script function
+        tags: Free-form labels, see :func:`tagged`
+        inputs: Default ``inputs`` of specifications using the script
+        concurrent: Default ``concurrent`` of specifications using the script
+    """
+
+    name: str
+    path: str
+    tags: tuple[str, ...] = ()
+    inputs: dict[str, Any] | None = None
+    concurrent: bool = False
+
+
+_registered: dict[str, RegisteredScript] = {}
+
+
+def setup_script(
+    func: Callable[..., Any] | None = None,
+    *,
+    name: str | None = None,
+    tags: Iterable[str] = (),
+    inputs: dict[str, Any] | None = None,
+    concurrent_safe: bool = False,
+) -> Any:
+    """
+    Register a setup script under a short name, by default the function name.
+
+    Can be used bare (``@setup_script``) or with options::
+
+        @setup_script(name="warm_search", tags=["warmup"], inputs={"settings": ["SEARCH_URL"]})
+        def warm_search_index(handler, *args):
+            ...
+
+    Args:
+        name: Short name of the script
+        tags: Labels to find related scripts with :func:`tagged`
+        inputs: Default ``inputs`` (see :mod:`django_setup_tools.fingerprint`)
+        concurrent_safe: Whether an ``async def`` script may be awaited
+            together with the concurrent async scripts next to it
+
+    Raises:
+        ImproperlyConfigured: If the name is already used by another script
+    """
+
+    def register(func: Callable[..., Any]) -> Callable[..., Any]:
+        script = RegisteredScript(
+            name=name or func.__name__,
+            path=f"{func.__module__}.{func.__qualname__}",
+            tags=tuple(tags),
+            inputs=validate_inputs(inputs) if inputs is not None else None,
+            concurrent=concurrent_safe,
+        )
+        existing = _registered.get(script.name)
+        if existing is not None and existing.path != script.path:
+            msg = f"Setup script name '{script.name}' is used by both {existing.path} and {script.path}"
+            raise ImproperlyConfigured(msg)
+        _registered[script.name] = script
+        return func
+
+    return register(func) if func is not None else register
+
+
+def discover() -> dict[str, RegisteredScript]:
+    """Import every source of setup scripts and return them by name."""
+    from .scripts import BUILTINS
+
+    scripts = {
+        name: RegisteredScript(name, f"django_setup_tools.scripts.{name}")
+        for name in BUILTINS
+    }
+    autodiscover_modules(APP_MODULE)
+    for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+        target = entry_point.load()
+        if isinstance(target, types.ModuleType):
+            continue
+        path = f"{target.__module__}.{target.__qualname__}"
+        if not any(script.path == path for script in _registered.values()):
+            scripts[entry_point.name] = RegisteredScript(entry_point.name, path)
+    scripts.update(_registered)
+    return scripts
+
+
+def index_key() -> str:
+    """
+    Return a key that changes whenever discovery could find different scripts.
+
+    Package versions are read from the names of the ``.dist-info`` and
+    ``.egg-info`` directories on ``sys.path``, which costs one directory
+    listing per entry instead of reading every package's metadata.
+    """
+    packages = []
+    for path in sys.path:
+        try:
+            with os.scandir(path or ".") as entries:
+                packages += [
+                    entry.name
+                    for entry in entries
+                    if entry.name.endswith((".dist-info", ".egg-info"))
+                ]
+        except OSError:
+            continue
+
+    modules = []
+    for app_config in apps.get_app_configs():
+        try:
+            spec = importlib.util.find_spec(f"{app_config.name}.{APP_MODULE}")
+        except ImportError:
+            continue
+        if spec is not None and spec.origin and os.path.exists(spec.origin):
+            modules.append([spec.origin, os.stat(spec.origin).st_mtime])
+
+    payload = json.dumps(
+        [
+            _INDEX_VERSION,
+            sys.version,
+            sorted(packages),
+            modules,
+            list(settings.INSTALLED_APPS),
+        ]
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def default_index_dir() -> str:
+    """Return the user's cache directory for the index, as in the XDG specification."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "django_setup_tools")
+
+
+def index_path(key: str) -> str | None:
+    """Return the file caching the index for ``key``, or None when the cache is disabled."""
+    directory = getattr(
+        settings, "DJANGO_SETUP_TOOLS_SCRIPT_INDEX_DIR", default_index_dir()
+    )
+    if directory is None:
+        return None
+    return os.path.join(directory, f"django_setup_tools-scripts-{key[:20]}.json")
+
+
+def _trusted_packages() -> set[str]:
+    """Return the packages whose scripts a cached index may refer to."""
+    return {"django_setup_tools"} | {
+        app_config.name for app_config in apps.get_app_configs()
+    }
+
+
+def _is_trusted(scripts: dict[str, RegisteredScript]) -> bool:
+    """
+    Return whether every script belongs to a package discovery imports.
+
+    These are this package, the installed apps and the top-level packages of
+    the entry points. Entry points are only read when a script belongs to
+    none of the others.
+    """
+    packages = _trusted_packages()
+    untrusted = [
+        script.path
+        for script in scripts.values()
+        if not _in_packages(script.path, packages)
+    ]
+    if untrusted:
+        packages = {
+            entry_point.module.partition(".")[0]
+            for entry_point in entry_points(group=ENTRY_POINT_GROUP)
+        }
+    return all(_in_packages(path, packages) for path in untrusted)
+
+
+def _in_packages(path: str, packages: set[str]) -> bool:
+    return any(path.startswith(f"{package}.") for package in packages)
+
+
+def _is_private(path: str) -> bool:
+    """Return whether the file at ``path`` is owned by this user and not writable by others."""
+    status = os.stat(path)
+    if hasattr(os, "getuid") and status.st_uid != os.getuid():
+        return False
+    return not status.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+@functools.cache
+def get_index() -> dict[str, RegisteredScript]:
+    """
+    Return every registered script by name, discovering them only when the cache is stale.
+
+    The index is computed once per process; call ``get_index.cache_clear()``
+    to discover again.
+    """
+    path = index_path(index_key())
+    if path is not None:
+        try:
+            if _is_private(path):
+                with open(path) as f:
+                    cached = {
+                        name: _from_json(data) for name, data in json.load(f).items()
+                    }
+                if _is_trusted(cached):
+                    return cached
+        except (OSError, ValueError, TypeError):
+            pass
+
+    scripts = discover()
+    if path is not None:
+        try:
+            os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(
+                os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w"
+            ) as f:
+                json.dump({name: asdict(script) for name, script in scripts.items()}, f)
+            os.replace(tmp, path)
+        except OSError:
+            # A read-only filesystem only costs discovering again next time
+            pass
+    return scripts
+
+
+def _from_json(data: dict[str, Any]) -> RegisteredScript:
+    return RegisteredScript(**{**data, "tags": tuple(data["tags"])})
+
+
+def lookup(name: str) -> RegisteredScript | None:
+    """Return the script registered as ``name``, if any."""
+    return get_index().get(name)
+
+
+def tagged(tag: str) -> list[RegisteredScript]:
+    """Return the scripts registered with ``tag``, sorted by name."""
+    return sorted(
+        (script for script in get_index().values() if tag in script.tags),
+        key=lambda script: script.name,
+    )
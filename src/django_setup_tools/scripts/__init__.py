@@ -0,0 +1,45 @@
+"""
+Built-in setup scripts for Django Setup Tools.
+
+Scripts are referenced as ``django_setup_tools.scripts.<name>``. Each one
+lives in a submodule of this package together with the imports it needs, and
+that submodule is only imported when the script is first looked up. So
+resolving ``check_database_connection`` does not import the sites framework,
+the caches or the static files machinery.
+"""
+import importlib
+from typing import Any
+
+#: Built-in scripts mapped to the submodule defining them
+BUILTINS = {
+    "sync_site_id": "sites",
+    "clear_cache": "caches",
+    "invalidate_caches": "caches",
+    "check_database_connection": "database",
+    "probe_databases": "database",
+    "setup_log_directories": "logs",
+    "verify_environment_config": "environment",
+    "check_static_files_config": "static",
+    "collect_static_files": "static",
+    "compress_static_files": "static",
+    "compile_bytecode": "startup",
+    "profile_app_boot": "startup",
+}
+
+__all__ = sorted(BUILTINS)
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module = BUILTINS[name]
+    except KeyError:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg) from None
+    script = getattr(importlib.import_module(f".{module}", __name__), name)
+    # Later lookups find the script without going through this function
+    globals()[name] = script
+    return script
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *BUILTINS})
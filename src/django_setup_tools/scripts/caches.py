@@ -0,0 +1,114 @@
+"""Clear or invalidate caches after a deploy."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import InvalidCacheBackendError, cache, caches
+from django.core.cache.backends.base import BaseCache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand
+
+from ..cache import bump_generation, delete_prefix, is_generational
+
+
+def clear_cache(handler: BaseCommand, *args: Any) -> None:
+    """
+    Clear all Django cache backends.
+
+    Clears the default cache and reports the action to the user.
+
+    Args:
+        handler: The management command handler for output
+        *args: Additional arguments (unused)
+    """
+    handler.stdout.write(handler.style.HTTP_INFO("Clearing Django cache..."))
+
+    try:
+        cache.clear()
+        handler.stdout.write(handler.style.SUCCESS("✓ Cache cleared successfully"))
+    except Exception as e:
+        handler.stdout.write(handler.style.ERROR(f"✗ Failed to clear cache: {e}"))
+
+
+def invalidate_caches(handler: BaseCommand, *args: Any) -> None:
+    """
+    Invalidate every cache alias without necessarily flushing it.
+
+    Each alias in ``CACHES``, or each alias given as an argument, is handled
+    according to ``settings.DJANGO_SETUP_TOOLS_CACHE_INVALIDATION``, a mapping
+    of aliases to a strategy:
+
+    - ``"version"``: move to a new key generation, leaving old entries to
+      expire (requires :func:`django_setup_tools.cache.generational_key`)
+    - ``{"prefix": "views:"}``: delete only the keys under one or more prefixes
+    - ``"clear"``: flush the whole cache
+    - ``"keep"``: leave the cache alone
+
+    Aliases without a strategy use ``"version"`` when their keys are
+    generational and ``"clear"`` otherwise. Aliases are handled
+    concurrently and the latency of each is reported.
+
+    Args:
+        handler: The management command handler for output
+        *args: Cache aliases to invalidate
+    """
+    handler.stdout.write(handler.style.HTTP_INFO("Invalidating caches..."))
+
+    strategies = getattr(settings, "DJANGO_SETUP_TOOLS_CACHE_INVALIDATION", {})
+    aliases = list(args) or list(settings.CACHES)
+    with ThreadPoolExecutor(max_workers=max(len(aliases), 1)) as pool:
+        results = list(
+            pool.map(
+                lambda alias: _invalidate_cache(alias, strategies.get(alias)), aliases
+            )
+        )
+
+    for alias, (ok, message, elapsed) in zip(aliases, results, strict=True):
+        if ok:
+            handler.stdout.write(
+                handler.style.SUCCESS(f"✓ {alias}: {message} ({elapsed * 1000:.1f}ms)")
+            )
+        else:
+            handler.stdout.write(
+                handler.style.ERROR(f"✗ {alias}: {message} ({elapsed * 1000:.1f}ms)")
+            )
+
+
+def _invalidate_cache(alias: str, strategy: Any) -> tuple[bool, str, float]:
+    """Invalidate one cache alias from a worker thread; returns (ok, message, seconds)."""
+    start = time.perf_counter()
+    try:
+        cache = caches[alias]
+    except InvalidCacheBackendError as e:
+        return False, str(e), time.perf_counter() - start
+    try:
+        ok, message = True, _apply_strategy(cache, strategy)
+    except Exception as e:
+        ok, message = False, str(e)
+    finally:
+        cache.close()
+    return ok, message, time.perf_counter() - start
+
+
+def _apply_strategy(cache: BaseCache, strategy: Any) -> str:
+    """Invalidate ``cache`` with ``strategy`` and describe what was done."""
+    if strategy is None:
+        strategy = "version" if is_generational(cache) else "clear"
+    if strategy == "keep":
+        return "kept"
+    if strategy == "clear":
+        cache.clear()
+        return "cleared"
+    if strategy == "version":
+        if not is_generational(cache):
+            msg = "version invalidation needs KEY_FUNCTION 'django_setup_tools.cache.generational_key'"
+            raise ImproperlyConfigured(msg)
+        return f"moved to generation {bump_generation(cache)}"
+    if isinstance(strategy, dict) and "prefix" in strategy:
+        prefixes = strategy["prefix"]
+        prefixes = [prefixes] if isinstance(prefixes, str) else list(prefixes)
+        deleted = sum(delete_prefix(cache, prefix) for prefix in prefixes)
+        return f"deleted {deleted} key(s) under {', '.join(prefixes)}"
+    msg = f"unknown invalidation strategy {strategy!r}"
+    raise ImproperlyConfigured(msg)
@@ -0,0 +1,210 @@
+"""Check that the databases are reachable and fast enough."""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.utils.connection import ConnectionDoesNotExist
+
+from ..stats import percentile
+from .handlers import handler_database
+
+
+def check_database_connection(handler: BaseCommand, *args: Any) -> None:
+    """
+    Verify database connectivity and basic health.
+
+    Tests the connection to every database alias given as an argument, or
+    to the database the script targets with the ``database`` key of its
+    specification, or to the default database. Several aliases are checked
+    concurrently, each in its own thread with its own connection.
+
+    Args:
+        handler: The management command handler for output
+        *args: Database aliases to check
+    """
+    handler.stdout.write(handler.style.HTTP_INFO("Checking database connection..."))
+
+    aliases = list(args)
+    database = handler_database(handler)
+    if not aliases and database is not None:
+        aliases = [database]
+
+    if not aliases:
+        _report_connection(handler, DEFAULT_DB_ALIAS, _ping(connection), label="")
+        return
+
+    if len(aliases) == 1:
+        results = [_ping_alias(aliases[0], close=False)]
+    else:
+        with ThreadPoolExecutor(max_workers=len(aliases)) as pool:
+            results = list(pool.map(_ping_alias, aliases))
+    for alias, result in zip(aliases, results, strict=True):
+        _report_connection(handler, alias, result, label=f" ({alias})")
+
+
+def _ping(db: Any) -> tuple[bool, Exception | None]:
+    """Run a trivial query, returning whether it succeeded and any error."""
+    try:
+        with db.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            result = cursor.fetchone()
+    except Exception as e:
+        return False, e
+    return bool(result and result[0] == 1), None
+
+
+def _ping_alias(alias: str, close: bool = True) -> tuple[bool, Exception | None]:
+    """
+    Ping ``alias``, closing the connection when run from a worker thread.
+
+    An alias missing from ``DATABASES`` is returned as the error.
+    """
+    try:
+        db = connections[alias]
+    except ConnectionDoesNotExist as e:
+        return False, e
+    try:
+        return _ping(db)
+    finally:
+        if close:
+            db.close()
+
+
+def _report_connection(
+    handler: BaseCommand,
+    alias: str,
+    result: tuple[bool, Exception | None],
+    label: str,
+) -> None:
+    """Write the outcome of a connection check."""
+    ok, error = result
+    if error is not None:
+        handler.stdout.write(
+            handler.style.ERROR(f"✗ Database connection error{label}: {error}")
+        )
+    elif ok:
+        handler.stdout.write(
+            handler.style.SUCCESS(f"✓ Database connection successful{label}")
+        )
+        handler.stdout.write(f"Database: {connections[alias].vendor}")
+        handler.stdout.write(f"Engine: {settings.DATABASES[alias]['ENGINE']}")
+    else:
+        handler.stdout.write(
+            handler.style.ERROR(f"✗ Database connection test failed{label}")
+        )
+
+
+@dataclass
+class DatabaseProbe:
+    """Latencies measured against one database alias, in seconds."""
+
+    alias: str
+    connect: float = 0.0
+    round_trips: list[float] = field(default_factory=list)
+    error: str = ""
+
+    def percentiles(self) -> dict[str, float]:
+        return {f"p{p}": percentile(self.round_trips, p) for p in (50, 95, 99)}
+
+
+def probe_databases(handler: BaseCommand, *args: Any) -> None:
+    """
+    Measure the latency of every database alias and fail when it is too slow.
+
+    Each alias in ``DATABASES``, or each alias given as an argument, is
+    probed concurrently in its own thread with a fresh connection. The
+    connection setup is timed, then a number of ``SELECT 1`` round trips.
+    The probe is configured by ``settings.DJANGO_SETUP_TOOLS_DB_PROBE``::
+
+        DJANGO_SETUP_TOOLS_DB_PROBE = {
+            "round_trips": 20,
+            "thresholds": {"connect": 0.5, "p95": 0.05, "p99": 0.2},
+            "aliases": {"replica": {"p95": 0.1}},
+        }
+
+    Thresholds are in seconds; those under ``aliases`` override the global
+    ones for a single alias.
+
+    Args:
+        handler: The management command handler for output
+        *args: Database aliases to probe
+
+    Raises:
+        CommandError: If an alias cannot be reached or exceeds a threshold
+    """
+    handler.stdout.write(handler.style.HTTP_INFO("Probing database latency..."))
+
+    config = getattr(settings, "DJANGO_SETUP_TOOLS_DB_PROBE", {})
+    round_trips = max(int(config.get("round_trips", 20)), 1)
+    aliases = list(args) or list(settings.DATABASES)
+    with ThreadPoolExecutor(max_workers=max(len(aliases), 1)) as pool:
+        probes = list(
+            pool.map(lambda alias: _probe_database(alias, round_trips), aliases)
+        )
+
+    failures = []
+    for probe in probes:
+        if probe.error:
+            failures.append(f"{probe.alias}: {probe.error}")
+            handler.stdout.write(handler.style.ERROR(f"✗ {probe.alias}: {probe.error}"))
+            continue
+
+        measured = {"connect": probe.connect, **probe.percentiles()}
+        summary = ", ".join(
+            f"{name} {value * 1000:.1f}ms" for name, value in measured.items()
+        )
+        thresholds = {
+            **config.get("thresholds", {}),
+            **config.get("aliases", {}).get(probe.alias, {}),
+        }
+        exceeded = [
+            f"{name} {value * 1000:.1f}ms exceeds {thresholds[name] * 1000:.1f}ms"
+            for name, value in measured.items()
+            if name in thresholds and value > thresholds[name]
+        ]
+        if exceeded:
+            failures.append(f"{probe.alias}: {'; '.join(exceeded)}")
+            handler.stdout.write(
+                handler.style.ERROR(
+                    f"✗ {probe.alias}: {summary} ({'; '.join(exceeded)})"
+                )
+            )
+        else:
+            handler.stdout.write(
+                handler.style.SUCCESS(
+                    f"✓ {probe.alias}: {summary} ({round_trips} round trips)"
+                )
+            )
+
+    if failures:
+        msg = "Database probe failed: " + ", ".join(failures)
+        raise CommandError(msg)
+
+
+def _probe_database(alias: str, round_trips: int) -> DatabaseProbe:
+    """Probe ``alias`` from a worker thread, which has a connection of its own."""
+    probe = DatabaseProbe(alias=alias)
+    try:
+        db = connections[alias]
+    except Exception as e:
+        probe.error = str(e)
+        return probe
+    try:
+        start = time.perf_counter()
+        db.ensure_connection()
+        probe.connect = time.perf_counter() - start
+        with db.cursor() as cursor:
+            for _ in range(round_trips):
+                start = time.perf_counter()
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+                probe.round_trips.append(time.perf_counter() - start)
+    except Exception as e:
+        probe.error = str(e) or type(e).__name__
+    finally:
+        db.close()
+    return probe
@@ -0,0 +1,93 @@
+"""Check the settings and environment variables a deployment needs."""
+import os
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+def _check_required_settings(
+    handler: BaseCommand, required_settings: list[tuple[str, str]]
+) -> list[str]:
+    """Check required Django settings and return any issues found."""
+    issues = []
+    for setting_name, description in required_settings:
+        try:
+            value = getattr(settings, setting_name, None)
+            if value is None or (isinstance(value, str) and not value.strip()):
+                issues.append(f"Missing or empty {setting_name} ({description})")
+            else:
+                handler.stdout.write(f"✓ {setting_name}: configured")
+        except Exception as e:
+            issues.append(f"Error checking {setting_name}: {e}")
+    return issues
+
+
+def _check_recommended_env_vars(
+    handler: BaseCommand, recommended_env_vars: list[tuple[str, str]]
+) -> list[str]:
+    """Check recommended environment variables and return any warnings."""
+    warnings = []
+    for env_var, description in recommended_env_vars:
+        if not os.getenv(env_var):
+            warnings.append(f"Missing {env_var} ({description})")
+        else:
+            handler.stdout.write(f"✓ {env_var}: set")
+    return warnings
+
+
+def _report_config_results(
+    handler: BaseCommand, issues: list[str], warnings: list[str]
+) -> None:
+    """Report configuration check results."""
+    if issues:
+        handler.stdout.write(handler.style.ERROR("✗ Configuration issues found:"))
+        for issue in issues:
+            handler.stdout.write(f"  - {issue}")
+
+    if warnings:
+        handler.stdout.write(handler.style.WARNING("⚠ Recommended configuration:"))
+        for warning in warnings:
+            handler.stdout.write(f"  - {warning}")
+
+    if not issues and not warnings:
+        handler.stdout.write(
+            handler.style.SUCCESS("✓ Environment configuration looks good")
+        )
+    elif not issues:
+        handler.stdout.write(
+            handler.style.SUCCESS("✓ Required configuration is present")
+        )
+
+
+def verify_environment_config(handler: BaseCommand, *args: Any) -> None:
+    """
+    Check for required environment variables and settings.
+
+    Verifies that essential configuration is present and reports any issues.
+
+    Args:
+        handler: The management command handler for output
+        *args: Additional arguments (unused)
+    """
+    handler.stdout.write(
+        handler.style.HTTP_INFO("Verifying environment configuration...")
+    )
+
+    # Common required settings
+    required_settings = [
+        ("SECRET_KEY", "Django secret key"),
+        ("DEBUG", "Debug mode setting"),
+        ("ALLOWED_HOSTS", "Allowed hosts configuration"),
+    ]
+
+    # Optional but recommended environment variables
+    recommended_env_vars = [
+        ("DATABASE_URL", "Database connection URL"),
+        ("REDIS_URL", "Redis connection URL"),
+        ("EMAIL_HOST", "Email host configuration"),
+    ]
+
+    issues = _check_required_settings(handler, required_settings)
+    warnings = _check_recommended_env_vars(handler, recommended_env_vars)
+    _report_config_results(handler, issues, warnings)
@@ -0,0 +1,8 @@
+"""Helpers shared by the built-in scripts, kept free of their heavier imports."""
+from django.core.management.base import BaseCommand
+
+
+def handler_database(handler: BaseCommand) -> str | None:
+    """Return the database alias the running script targets, if any."""
+    database = getattr(handler, "database", None)
+    return database if isinstance(database, str) else None
@@ -0,0 +1,53 @@
+"""Prepare the directories the logging configuration writes to."""
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+def setup_log_directories(handler: BaseCommand, *args: Any) -> None:
+    """
+    Create and verify log directories exist.
+
+    Creates log directories based on Django logging configuration and reports status.
+
+    Args:
+        handler: The management command handler for output
+        *args: Additional arguments (unused)
+    """
+    handler.stdout.write(handler.style.HTTP_INFO("Setting up log directories..."))
+
+    logging_config = getattr(settings, "LOGGING", {})
+    handlers_config = logging_config.get("handlers", {})
+
+    directories_created = []
+
+    for _handler_name, handler_config in handlers_config.items():
+        if "filename" in handler_config:
+            log_file_path = Path(handler_config["filename"])
+            log_dir = log_file_path.parent
+
+            try:
+                log_dir.mkdir(parents=True, exist_ok=True)
+                directories_created.append(str(log_dir))
+                handler.stdout.write(f"✓ Ensured directory exists: {log_dir}")
+            except Exception as e:
+                handler.stdout.write(
+                    handler.style.ERROR(
+                        f"✗ Failed to create log directory {log_dir}: {e}"
+                    )
+                )
+
+    if not directories_created:
+        handler.stdout.write(
+            handler.style.WARNING(
+                "⚠ No file-based logging handlers found in configuration"
+            )
+        )
+    else:
+        handler.stdout.write(
+            handler.style.SUCCESS(
+                f"✓ Log directory setup complete ({len(directories_created)} directories)"
+            )
+        )
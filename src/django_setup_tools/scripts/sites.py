@@ -0,0 +1,79 @@
+"""Keep the sites framework in sync with the settings."""
+from typing import Any
+
+from django.conf import settings
+from django.contrib.sites.models import SITE_CACHE, Site
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from .handlers import handler_database
+
+
+def sync_site_id(handler: BaseCommand, *args: Any) -> None:
+    """
+    Synchronize site objects with settings.
+
+    The sites are taken from ``settings.DJANGO_SETUP_TOOLS_SITES``, a mapping
+    of site IDs to ``{"domain": ..., "name": ...}``, or otherwise from
+    ``settings.SITE_ID``, ``settings.SITE_DOMAIN`` and ``settings.SITE_NAME``.
+    All sites are read in one query and only those that are missing or
+    differ are written, in a single transaction. The ``SITE_CACHE`` entries
+    of changed sites are invalidated.
+
+    Args:
+        handler: The management command handler for output
+        *args: Additional arguments (unused)
+    """
+    handler.stdout.write(handler.style.HTTP_INFO("Synchronizing site object..."))
+
+    sites = _configured_sites()
+    using = handler_database(handler) or DEFAULT_DB_ALIAS
+    existing = Site.objects.db_manager(using).in_bulk(list(sites))
+
+    created, updated = [], []
+    for site_id, fields in sites.items():
+        site = existing.get(site_id)
+        if site is None:
+            created.append(Site(id=site_id, **fields))
+        elif site.domain != fields["domain"] or site.name != fields["name"]:
+            # Evict the old domain as well as the new one
+            _evict_site(site)
+            site.domain, site.name = fields["domain"], fields["name"]
+            updated.append(site)
+
+    if created or updated:
+        with transaction.atomic(using=using):
+            Site.objects.db_manager(using).bulk_create(created)
+            Site.objects.db_manager(using).bulk_update(updated, ["domain", "name"])
+
+    for action, changed in (("Created", created), ("Updated", updated)):
+        for site in changed:
+            _evict_site(site)
+            handler.stdout.write(f"{action} site: {site.name}")
+            handler.stdout.write(f"Domain: {site.domain}")
+
+    unchanged = len(sites) - len(created) - len(updated)
+    if unchanged:
+        handler.stdout.write(f"{unchanged} site(s) already up to date")
+
+
+def _configured_sites() -> dict[int, dict[str, str]]:
+    """Return the desired domain and name of every site, keyed by site ID."""
+    sites = getattr(settings, "DJANGO_SETUP_TOOLS_SITES", None)
+    if sites is None:
+        sites = {
+            settings.SITE_ID: {
+                "domain": settings.SITE_DOMAIN,
+                "name": settings.SITE_NAME,
+            }
+        }
+    return {
+        int(site_id): {"domain": fields["domain"], "name": fields["name"]}
+        for site_id, fields in sites.items()
+    }
+
+
+def _evict_site(site: Site) -> None:
+    """Remove a site from ``SITE_CACHE``, which is keyed by both ID and domain."""
+    SITE_CACHE.pop(site.pk, None)
+    SITE_CACHE.pop(site.domain, None)
@@ -0,0 +1,253 @@
+"""Check, collect and precompress static files."""
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from ..staticfiles import (
+    COMPRESSIBLE_EXTENSIONS,
+    build_inventory,
+    can_collect,
+    collect,
+    compress_files,
+    compression_formats,
+    ignore_patterns,
+    missing_manifest_entries,
+    walk,
+)
+
+
+def check_static_files_config(handler: BaseCommand, *args: Any) -> None:
+    """
+    Verify static files configuration and accessibility.
+
+    Checks STATIC_URL, STATIC_ROOT, and staticfiles configuration. Pass
+    ``"--verify"`` to also inventory every file the staticfiles finders
+    provide, report paths shadowed between locations and, with a manifest
+    storage, check that every manifest entry exists in STATIC_ROOT.
+
+    Args:
+        handler: The management command handler for output
+        *args: ``"--verify"`` to inventory and verify the files themselves
+    """
+    handler.stdout.write(
+        handler.style.HTTP_INFO("Checking static files configuration...")
+    )
+
+    issues = []
+
+    # Check STATIC_URL
+    static_url = getattr(settings, "STATIC_URL", None)
+    if not static_url:
+        issues.append("STATIC_URL is not configured")
+    else:
+        handler.stdout.write(f"✓ STATIC_URL: {static_url}")
+
+    # Check STATIC_ROOT
+    static_root = getattr(settings, "STATIC_ROOT", None)
+    if not static_root:
+        issues.append("STATIC_ROOT is not configured")
+    else:
+        handler.stdout.write(f"✓ STATIC_ROOT: {static_root}")
+
+        # Check if STATIC_ROOT directory exists
+        static_path = Path(static_root)
+        if static_path.exists():
+            handler.stdout.write("✓ Static root directory exists")
+        else:
+            issues.append(f"Static root directory does not exist: {static_root}")
+
+    # Check STATICFILES_DIRS
+    staticfiles_dirs = getattr(settings, "STATICFILES_DIRS", [])
+    if staticfiles_dirs:
+        handler.stdout.write(
+            f"✓ STATICFILES_DIRS configured ({len(staticfiles_dirs)} directories)"
+        )
+        for i, static_dir in enumerate(staticfiles_dirs):
+            dir_path = (
+                Path(static_dir) if isinstance(static_dir, str) else Path(static_dir[1])
+            )
+            if dir_path.exists():
+                handler.stdout.write(f"  ✓ Directory {i+1}: {dir_path}")
+            else:
+                issues.append(f"Static files directory does not exist: {dir_path}")
+
+    if "--verify" in args:
+        issues.extend(_verify_static_files(handler))
+
+    # Report results
+    if issues:
+        handler.stdout.write(
+            handler.style.ERROR("✗ Static files configuration issues:")
+        )
+        for issue in issues:
+            handler.stdout.write(f"  - {issue}")
+    else:
+        handler.stdout.write(
+            handler.style.SUCCESS("✓ Static files configuration looks good")
+        )
+
+
+def collect_static_files(handler: BaseCommand, *args: Any) -> None:
+    """
+    Collect static files into STATIC_ROOT, copying only the files that changed.
+
+    A drop-in replacement for ``("collectstatic", "--no-input")``: the size,
+    modification time and content hash of every collected file are kept in a
+    manifest in STATIC_ROOT. Unchanged files are skipped, changed files are
+    copied across a thread pool and files no finder provides any more are
+    deleted. Storages that post-process files, such as
+    ``ManifestStaticFilesStorage``, and non-local storages or finders fall
+    back to ``collectstatic``.
+
+    Args:
+        handler: The management command handler for output
+        *args: Arguments passed on to ``collectstatic`` when falling back to it
+
+    Raises:
+        ImproperlyConfigured: If STATIC_ROOT is not configured
+    """
+    handler.stdout.write(handler.style.HTTP_INFO("Collecting static files..."))
+
+    static_root = getattr(settings, "STATIC_ROOT", None)
+    if not static_root:
+        msg = (
+            "collect_static_files needs the STATIC_ROOT setting to be a filesystem path"
+        )
+        raise ImproperlyConfigured(msg)
+
+    reason = can_collect()
+    if reason:
+        handler.stdout.write(
+            handler.style.WARNING(f"⚠ Running collectstatic instead, because {reason}")
+        )
+        call_command(
+            "collectstatic",
+            "--no-input",
+            *args,
+            stdout=handler.stdout,
+            stderr=handler.stderr,
+        )
+        return
+
+    start = time.perf_counter()
+    result = collect(static_root)
+    for path in result.deleted:
+        handler.stdout.write(f"  Deleted {path}")
+    handler.stdout.write(
+        handler.style.SUCCESS(
+            f"✓ {len(result.copied)} static file(s) copied to '{static_root}', {result.unchanged} unmodified, "
+            f"{len(result.deleted)} deleted ({time.perf_counter() - start:.2f}s)"
+        )
+    )
+
+
+def compress_static_files(handler: BaseCommand, *args: Any) -> None:
+    """
+    Precompress the files in STATIC_ROOT so the web server can serve them directly.
+
+    Eligible files get a gzip sibling (``app.css.gz``) and, when the
+    ``brotli`` package is installed, a brotli one (``app.css.br``). Files are
+    compressed across a process pool; those whose compressed siblings are
+    newer than the file itself are skipped. Run it after ``collectstatic``.
+    Eligibility is configured by ``settings.DJANGO_SETUP_TOOLS_COMPRESSION``::
+
+        DJANGO_SETUP_TOOLS_COMPRESSION = {
+            "extensions": [".css", ".js", ".svg"],
+            "min_size": 256,
+            "max_size": 10 * 1024 * 1024,
+            "workers": 4,
+        }
+
+    Args:
+        handler: The management command handler for output
+        *args: Formats to write (``"gz"``, ``"br"``); defaults to every available one
+    """
+    handler.stdout.write(handler.style.HTTP_INFO("Compressing static files..."))
+
+    static_root = getattr(settings, "STATIC_ROOT", None)
+    if not static_root:
+        handler.stdout.write(handler.style.ERROR("✗ STATIC_ROOT is not configured"))
+        return
+
+    available = compression_formats()
+    formats = list(args) or available
+    unavailable = [suffix for suffix in formats if suffix not in available]
+    if unavailable:
+        handler.stdout.write(
+            handler.style.ERROR(
+                f"✗ Unavailable compression format(s): {', '.join(unavailable)}"
+            )
+        )
+        return
+    if not args and "br" not in available:
+        handler.stdout.write(
+            handler.style.WARNING("⚠ brotli is not installed; writing gzip files only")
+        )
+
+    config = getattr(settings, "DJANGO_SETUP_TOOLS_COMPRESSION", {})
+    extensions = tuple(
+        extension.lower()
+        for extension in config.get("extensions", COMPRESSIBLE_EXTENSIONS)
+    )
+    min_size = config.get("min_size", 256)
+    max_size = config.get("max_size")
+
+    start = time.perf_counter()
+    paths = [
+        os.path.join(static_root, relative)
+        for relative, stat in walk(static_root, ignore_patterns()).items()
+        if relative.lower().endswith(extensions)
+        and stat.st_size >= min_size
+        and (max_size is None or stat.st_size <= max_size)
+    ]
+    compressed = compress_files(paths, formats, workers=config.get("workers"))
+    handler.stdout.write(
+        handler.style.SUCCESS(
+            f"✓ Compressed {compressed} file(s) to {', '.join(formats)} in {time.perf_counter() - start:.2f}s "
+            f"({len(paths) - compressed} already up to date)"
+        )
+    )
+
+
+def _verify_static_files(handler: BaseCommand) -> list[str]:
+    """Inventory the static files and return the problems found."""
+    start = time.perf_counter()
+    inventory = build_inventory()
+    handler.stdout.write(
+        f"✓ {len(inventory.files)} static file(s), {inventory.size / 1024 / 1024:.1f} MiB "
+        f"in {inventory.locations} location(s) ({time.perf_counter() - start:.2f}s)"
+    )
+    if inventory.shadowed:
+        handler.stdout.write(
+            handler.style.WARNING(
+                f"⚠ {len(inventory.shadowed)} path(s) shadowed by an earlier location:"
+            )
+        )
+        for winner, hidden in inventory.shadowed[:10]:
+            handler.stdout.write(
+                f"  - {winner.path}: {winner.source} shadows {hidden.source}"
+            )
+        if len(inventory.shadowed) > 10:
+            handler.stdout.write(f"  ... and {len(inventory.shadowed) - 10} more")
+
+    try:
+        missing = missing_manifest_entries()
+    except ValueError as e:
+        return [f"Could not read the staticfiles manifest: {e}"]
+    if missing is None:
+        return []
+    if not missing:
+        handler.stdout.write("✓ Every manifest entry exists in STATIC_ROOT")
+        return []
+    issues = [
+        f"Manifest entry missing from STATIC_ROOT: {name}" for name in missing[:10]
+    ]
+    if len(missing) > 10:
+        issues.append(f"... and {len(missing) - 10} more missing manifest entries")
+    return issues
@@ -0,0 +1,224 @@
+"""Normalization of command specifications declared in ``DJANGO_SETUP_TOOLS``."""
+from dataclasses import dataclass
+from typing import Any, Union
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .fingerprint import validate_inputs
+from .isolation import validate_isolate
+
+CommandSpec = Union[str, list[str], tuple[str, ...], dict[str, Any]]
+
+#: Keys accepted by the dictionary form of a command specification.
+SPEC_KEYS = frozenset(
+    {
+        "command",
+        "args",
+        "name",
+        "after",
+        "inputs",
+        "followers",
+        "concurrent",
+        "database",
+        "isolate",
+    }
+)
+
+
+@dataclass(frozen=True)
+class ScriptSpec:
+    """
+    A single normalized setup script.
+
+    Attributes:
+        command: Dotted path to a function or a management command name
+        args: Positional arguments passed to the command
+        name: Name other scripts use to refer to this one in ``after``
+        after: Names of the scripts this one waits for. ``None`` means the
+            script simply runs after the one declared before it.
+        inputs: Inputs whose fingerprint decides whether an ``always_run``
+            script can be skipped (see :mod:`django_setup_tools.fingerprint`)
+        followers: Whether replicas that lost the setup lock still run the script
+        concurrent: Whether an ``async def`` script may be awaited together
+            with the concurrent async scripts declared next to it
+        database: Alias of the database the script targets, or ``None``
+        isolate: Options of the worker process the script runs in (see
+            :mod:`django_setup_tools.isolation`), or ``None`` to run it in-process
+        raw: The specification exactly as declared in settings
+    """
+
+    command: str
+    args: tuple[str, ...] = ()
+    name: str = ""
+    after: tuple[str, ...] | None = None
+    inputs: dict[str, Any] | None = None
+    followers: bool = False
+    concurrent: bool = False
+    database: str | None = None
+    isolate: dict[str, Any] | None = None
+    raw: Any = None
+
+
+def parse_spec(spec: CommandSpec) -> ScriptSpec:
+    """
+    Normalize one command specification.
+
+    Accepts a plain command string, a list/tuple of command and arguments, or
+    a dictionary with a ``command`` key and any of ``args``, ``name``,
+    ``after``, ``inputs``, ``followers``, ``concurrent``, ``database`` and
+    ``isolate``.
+
+    Raises:
+        ImproperlyConfigured: If the specification is malformed
+    """
+    if isinstance(spec, str):
+        return ScriptSpec(command=spec, name=spec, raw=spec)
+
+    if isinstance(spec, list | tuple):
+        if not spec:
+            msg = "Empty command specification in DJANGO_SETUP_TOOLS"
+            raise ImproperlyConfigured(msg)
+        command, *args = spec
+        return ScriptSpec(command=command, args=tuple(args), name=command, raw=spec)
+
+    if isinstance(spec, dict):
+        unknown = set(spec) - SPEC_KEYS
+        if unknown:
+            msg = f"Unknown keys {sorted(unknown)} in command specification {spec!r}"
+            raise ImproperlyConfigured(msg)
+        if "command" not in spec:
+            msg = f"Command specification {spec!r} is missing the 'command' key"
+            raise ImproperlyConfigured(msg)
+        after = spec.get("after")
+        if isinstance(after, str):
+            after = (after,)
+        return ScriptSpec(
+            command=spec["command"],
+            args=tuple(spec.get("args", ())),
+            name=spec["name"] if "name" in spec else spec["command"],
+            after=None if after is None else tuple(after),
+            inputs=validate_inputs(spec["inputs"]) if "inputs" in spec else None,
+            followers=bool(spec.get("followers", False)),
+            concurrent=bool(spec.get("concurrent", False)),
+            database=spec.get("database"),
+            isolate=validate_isolate(spec.get("isolate", False)),
+            raw=spec,
+        )
+
+    # Reachable from settings, which are not type checked
+    msg = f"Invalid command specification {spec!r} in DJANGO_SETUP_TOOLS"  # type: ignore[unreachable]
+    raise ImproperlyConfigured(msg)
+
+
+def resolve_dependencies(specs: list[ScriptSpec]) -> list[set[int]]:
+    """
+    Compute the dependencies of each script as indices into ``specs``.
+
+    A script without ``after`` depends on the script declared before it, so
+    plain lists keep running in declaration order. A script with ``after``
+    depends only on the scripts it names (an empty list means it may start
+    straight away).
+
+    Scripts targeting a ``database`` form one lane per alias: without
+    ``after`` they wait for the previous script on the same alias rather
+    than the previous script overall, so independent aliases can run
+    concurrently. The next script without a ``database`` waits for every
+    lane.
+
+    Raises:
+        ImproperlyConfigured: If a name is unknown or the graph has a cycle
+    """
+    by_name: dict[str, list[int]] = {}
+    for index, spec in enumerate(specs):
+        by_name.setdefault(spec.name, []).append(index)
+
+    dependencies: list[set[int]] = []
+    # Last script without a database, and last script of each database lane
+    last_shared: int | None = None
+    lanes: dict[str, int] = {}
+    for index, spec in enumerate(specs):
+        if spec.database is None:
+            previous = {*lanes.values(), last_shared} if lanes else {index - 1}
+            lanes.clear()
+            last_shared = index
+        else:
+            previous = {lanes.get(spec.database, last_shared)}
+            lanes[spec.database] = index
+        if spec.after is None:
+            dependencies.append(
+                {dep for dep in previous if dep is not None and dep >= 0}
+            )
+            continue
+        deps: set[int] = set()
+        for name in spec.after:
+            if name not in by_name:
+                msg = f"Script '{spec.name}' depends on unknown script '{name}'"
+                raise ImproperlyConfigured(msg)
+            deps.update(by_name[name])
+        deps.discard(index)
+        dependencies.append(deps)
+
+    # Reject cycles up front rather than deadlocking at run time
+    topological_order(dependencies)
+    return dependencies
+
+
+def topological_order(dependencies: list[set[int]]) -> list[int]:
+    """
+    Order script indices so that every script follows its dependencies.
+
+    Ties are broken by declaration order.
+
+    Raises:
+        ImproperlyConfigured: If the dependencies contain a cycle
+    """
+    remaining = {index: set(deps) for index, deps in enumerate(dependencies)}
+    order: list[int] = []
+    while remaining:
+        ready = sorted(index for index, deps in remaining.items() if not deps)
+        if not ready:
+            msg = f"Circular dependency between setup scripts {sorted(remaining)}"
+            raise ImproperlyConfigured(msg)
+        index = ready[0]
+        order.append(index)
+        del remaining[index]
+        for deps in remaining.values():
+            deps.discard(index)
+    return order
+
+
+def critical_path(dependencies: list[set[int]], durations: list[float]) -> float:
+    """
+    Return the length of the longest chain of dependent scripts.
+
+    This is how long the scripts take when run with unlimited ``--jobs``.
+
+    Args:
+        dependencies: For each script, the indices of the scripts it waits for
+        durations: For each script, how long it takes
+    """
+    finish: dict[int, float] = {}
+    for index in topological_order(dependencies):
+        start = max((finish[dep] for dep in dependencies[index]), default=0.0)
+        finish[index] = start + durations[index]
+    return max(finish.values(), default=0.0)
+
+
+def merge_groups(
+    groups: list[list[int]], dependencies: list[set[int]]
+) -> list[set[int]]:
+    """
+    Compute the dependencies between groups of scripts that run as one unit.
+
+    Args:
+        groups: Script indices making up each group
+        dependencies: Dependencies of each script, as from :func:`resolve_dependencies`
+
+    Returns:
+        For each group, the indices of the groups it waits for
+    """
+    group_of = {index: node for node, members in enumerate(groups) for index in members}
+    return [
+        {group_of[dep] for index in members for dep in dependencies[index]} - {node}
+        for node, members in enumerate(groups)
+    ]
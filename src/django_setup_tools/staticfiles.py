@@ -0,0 +1,426 @@
+"""Fast inventory and precompression of static files."""
+import contextlib
+import fnmatch
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
+from django.core.files.storage import FileSystemStorage, Storage
+
+from .registry import default_index_dir
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+#: Patterns collectstatic ignores when the staticfiles app does not override them
+DEFAULT_IGNORE_PATTERNS = ["CVS", ".*", "*~"]
+
+#: Name of the file earlier versions kept in STATIC_ROOT, where it was served publicly
+LEGACY_COLLECT_MANIFEST = ".django_setup_tools_collected.json"
+
+#: Below this many files, compressing in-process is faster than starting a process pool
+COMPRESSION_POOL_THRESHOLD = 64
+
+#: Extensions precompressed by default; images and fonts like woff2 are already compressed
+COMPRESSIBLE_EXTENSIONS = [
+    ".css",
+    ".js",
+    ".mjs",
+    ".map",
+    ".json",
+    ".svg",
+    ".html",
+    ".txt",
+    ".xml",
+    ".ico",
+    ".ttf",
+    ".otf",
+    ".eot",
+    ".wasm",
+]
+
+
+@dataclass
+class StaticFile:
+    """A file found by a staticfiles finder."""
+
+    path: str
+    source: str
+    size: int
+    # Absolute path of the file and its modification time
+    location: str = ""
+    mtime: float = 0.0
+
+
+@dataclass
+class Inventory:
+    """Every static file the finders provide, keyed by the path it is collected to."""
+
+    files: dict[str, StaticFile] = field(default_factory=dict)
+    # Files hidden by a file with the same path in an earlier location
+    shadowed: list[tuple[StaticFile, StaticFile]] = field(default_factory=list)
+    locations: int = 0
+
+    @property
+    def size(self) -> int:
+        return sum(file.size for file in self.files.values())
+
+
+def walk(
+    root: str, ignore_patterns: list[str] | None = None, workers: int = 8
+) -> dict[str, os.stat_result]:
+    """
+    Return the stat of every file under ``root``, keyed by its ``/``-separated relative path.
+
+    Directories are scanned with :func:`os.scandir` one level at a time, each
+    level spread over ``workers`` threads; ``scandir`` releases the GIL while
+    it waits on the filesystem. Names matching ``ignore_patterns`` are skipped.
+    """
+    files: dict[str, os.stat_result] = {}
+    if not os.path.isdir(root):
+        return files
+    level = [""]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while level:
+            subdirectories = []
+            for found, children in pool.map(
+                lambda prefix: _scan(root, prefix, ignore_patterns or []), level
+            ):
+                files.update(found)
+                subdirectories.extend(children)
+            level = subdirectories
+    return files
+
+
+def _scan(
+    root: str, prefix: str, ignore_patterns: list[str]
+) -> tuple[dict[str, os.stat_result], list[str]]:
+    files = {}
+    children = []
+    with os.scandir(os.path.join(root, prefix)) as entries:
+        for entry in entries:
+            if any(
+                fnmatch.fnmatchcase(entry.name, pattern) for pattern in ignore_patterns
+            ):
+                continue
+            path = f"{prefix}{entry.name}"
+            if entry.is_dir():
+                children.append(f"{path}/")
+            elif entry.is_file():
+                files[path] = entry.stat()
+    return files, children
+
+
+def ignore_patterns() -> list[str]:
+    """Return the patterns collectstatic ignores by default."""
+    try:
+        config = apps.get_app_config("staticfiles")
+    except LookupError:
+        return list(DEFAULT_IGNORE_PATTERNS)
+    return list(getattr(config, "ignore_patterns", DEFAULT_IGNORE_PATTERNS))
+
+
+def unsupported_finders() -> list[str]:
+    """Return the finders whose files cannot be walked because they are not in local storages."""
+    unsupported = []
+    for finder in finders.get_finders():
+        storages = getattr(finder, "storages", None)
+        if storages is None or any(
+            _local_directory(storage) is None for storage in storages.values()
+        ):
+            unsupported.append(f"{type(finder).__module__}.{type(finder).__qualname__}")
+    return unsupported
+
+
+def finder_locations() -> list[tuple[str, str, str]]:
+    """
+    Return ``(label, prefix, directory)`` for every location of every finder, in lookup order.
+
+    Only finders that keep their files in local storages (such as the
+    built-in filesystem and app directories finders) are included.
+    """
+    locations = []
+    for finder in finders.get_finders():
+        for label, storage in getattr(finder, "storages", {}).items():
+            directory = _local_directory(storage)
+            if directory is not None:
+                prefix = getattr(storage, "prefix", None) or ""
+                locations.append(
+                    (str(label), f"{prefix}/" if prefix else "", directory)
+                )
+    return locations
+
+
+def _local_directory(storage: Storage) -> str | None:
+    try:
+        return storage.path("")
+    except NotImplementedError:
+        return None
+
+
+def build_inventory(workers: int = 8) -> Inventory:
+    """
+    Inventory the files of every finder location, walking the locations concurrently.
+
+    As in ``collectstatic``, the first location providing a path wins and
+    later files with the same path are recorded as shadowed.
+    """
+    locations = finder_locations()
+    patterns = ignore_patterns()
+    inventory = Inventory(locations=len(locations))
+    with ThreadPoolExecutor(max_workers=max(min(workers, len(locations)), 1)) as pool:
+        walked = pool.map(
+            lambda location: walk(location[2], patterns, workers), locations
+        )
+        for (label, prefix, directory), files in zip(locations, walked):
+            for relative, stat in files.items():
+                location = os.path.join(directory, relative)
+                file = StaticFile(
+                    f"{prefix}{relative}", label, stat.st_size, location, stat.st_mtime
+                )
+                winner = inventory.files.setdefault(file.path, file)
+                if winner is not file:
+                    inventory.shadowed.append((winner, file))
+    return inventory
+
+
+def missing_manifest_entries(workers: int = 8) -> list[str] | None:
+    """
+    Return the hashed files listed in the staticfiles manifest but absent from ``STATIC_ROOT``.
+
+    Returns:
+        The missing paths, or None when the storage does not use a manifest
+
+    Raises:
+        ValueError: If the manifest cannot be read
+    """
+    # The stubs deem a Storage using the mixin impossible, so the check must
+    # not narrow the type of the storage
+    storage: Any = staticfiles_storage
+    uses_manifest = isinstance(storage, ManifestFilesMixin)
+    if not uses_manifest:
+        return None
+    on_disk = walk(storage.location, workers=workers)
+    # Loaded from the manifest by the storage, whatever the Django version
+    return sorted(
+        name for name in set(storage.hashed_files.values()) if name not in on_disk
+    )
+
+
+def compression_formats() -> list[str]:
+    """Return the suffixes of the compressed files that can be written: ``gz``, and ``br`` with brotli."""
+    return ["gz", "br"] if brotli is not None else ["gz"]
+
+
+def compress_file(path: str, formats: list[str]) -> list[str]:
+    """
+    Write ``path.gz``/``path.br`` next to ``path`` unless they are newer than it.
+
+    Compressed files are written to a temporary name and then renamed, so a
+    web server never serves a partial file.
+
+    Returns:
+        The formats that were written
+    """
+    mtime = os.stat(path).st_mtime
+    stale = []
+    for suffix in formats:
+        try:
+            if os.stat(f"{path}.{suffix}").st_mtime >= mtime:
+                continue
+        except FileNotFoundError:
+            pass
+        stale.append(suffix)
+    if not stale:
+        return []
+
+    with open(path, "rb") as source:
+        data = source.read()
+    for suffix in stale:
+        compressed = (
+            gzip.compress(data, compresslevel=9, mtime=0)
+            if suffix == "gz"
+            else brotli.compress(data)
+        )
+        temporary = f"{path}.{suffix}.tmp"
+        with open(temporary, "wb") as target:
+            target.write(compressed)
+        os.replace(temporary, f"{path}.{suffix}")
+    return stale
+
+
+def compress_files(
+    paths: list[str], formats: list[str], workers: int | None = None
+) -> int:
+    """
+    Compress ``paths`` with :func:`compress_file` across a process pool.
+
+    Returns:
+        The number of files for which compressed files were written
+    """
+    if len(paths) < COMPRESSION_POOL_THRESHOLD:
+        written = [compress_file(path, formats) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            written = list(
+                pool.map(compress_file, paths, [formats] * len(paths), chunksize=32)
+            )
+    return sum(1 for suffixes in written if suffixes)
+
+
+@dataclass
+class CollectResult:
+    """What :func:`collect` did, by path relative to STATIC_ROOT."""
+
+    copied: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    deleted: list[str] = field(default_factory=list)
+
+
+def can_collect() -> str:
+    """
+    Return why :func:`collect` cannot replace ``collectstatic`` here, or ``""`` if it can.
+
+    The collector only copies between local directories and does not
+    post-process files, as ``ManifestStaticFilesStorage`` does.
+    """
+    if not isinstance(staticfiles_storage, FileSystemStorage):
+        return "the staticfiles storage is not a local file system storage"
+    if hasattr(staticfiles_storage, "post_process"):
+        return "the staticfiles storage post-processes files"
+    unsupported = unsupported_finders()
+    if unsupported:
+        return f"finders without local storages: {', '.join(unsupported)}"
+    return ""
+
+
+def collect(static_root: str, workers: int = 8) -> CollectResult:
+    """
+    Copy the files the finders provide to ``static_root``, skipping those that did not change.
+
+    The size, modification time and SHA-256 of every collected file are kept
+    in :func:`collect_manifest_path`. A file whose size and modification time are
+    unchanged is not read at all; one whose content hash is unchanged is not
+    copied. Files collected by an earlier run that no finder provides any
+    more are deleted, together with their compressed siblings.
+    """
+    manifest_path = collect_manifest_path(static_root)
+    previous = _load_collected(manifest_path)
+
+    inventory = build_inventory(workers)
+    result = CollectResult()
+    entries = {}
+    candidates = []
+    for path, file in inventory.files.items():
+        entry = previous.get(path)
+        if (
+            entry
+            and (entry["source"], entry["size"], entry["mtime"])
+            == (file.location, file.size, file.mtime)
+            and os.path.exists(os.path.join(static_root, path))
+        ):
+            entries[path] = entry
+            result.unchanged += 1
+        else:
+            candidates.append(file)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for file, entry, copied in pool.map(
+            lambda file: _sync(file, previous.get(file.path), static_root), candidates
+        ):
+            entries[file.path] = entry
+            if copied:
+                result.copied.append(file.path)
+            else:
+                result.unchanged += 1
+
+    for path in sorted(set(previous) - set(entries)):
+        for name in (path, f"{path}.gz", f"{path}.br"):
+            try:
+                os.remove(os.path.join(static_root, name))
+            except FileNotFoundError:
+                continue
+        result.deleted.append(path)
+
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(os.path.join(static_root, LEGACY_COLLECT_MANIFEST))
+    _save_collected(manifest_path, entries)
+    result.copied.sort()
+    return result
+
+
+def collect_manifest_path(static_root: str) -> str | None:
+    """
+    Return the file recording what :func:`collect` copied to ``static_root``.
+
+    It is kept outside ``static_root``, which the web server exposes, in
+    ``DJANGO_SETUP_TOOLS_COLLECT_MANIFEST_DIR``. None disables it.
+    """
+    directory = getattr(
+        settings, "DJANGO_SETUP_TOOLS_COLLECT_MANIFEST_DIR", default_index_dir()
+    )
+    if directory is None:
+        return None
+    key = hashlib.sha256(os.path.abspath(static_root).encode()).hexdigest()
+    return os.path.join(directory, f"django_setup_tools-collected-{key[:20]}.json")
+
+
+def _load_collected(manifest_path: str | None) -> dict[str, Any]:
+    """Return the entries an earlier :func:`collect` recorded in ``manifest_path``."""
+    if manifest_path is None:
+        return {}
+    try:
+        with open(manifest_path) as f:
+            files: dict[str, Any] = json.load(f)["files"]
+    except (FileNotFoundError, ValueError, KeyError):
+        return {}
+    return files
+
+
+def _save_collected(manifest_path: str | None, entries: dict[str, Any]) -> None:
+    if manifest_path is None:
+        return
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    with open(f"{manifest_path}.tmp", "w") as f:
+        json.dump({"version": 1, "files": entries}, f)
+    os.replace(f"{manifest_path}.tmp", manifest_path)
+
+
+def _sync(
+    file: StaticFile, previous: dict[str, Any] | None, static_root: str
+) -> tuple[StaticFile, dict[str, Any], bool]:
+    """Copy ``file`` to ``static_root`` unless an identical copy is there, and return its manifest entry."""
+    entry = {
+        "source": file.location,
+        "size": file.size,
+        "mtime": file.mtime,
+        "hash": _hash(file.location),
+    }
+    destination = os.path.join(static_root, file.path)
+    if previous and previous["hash"] == entry["hash"] and os.path.exists(destination):
+        return file, entry, False
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    # Like collectstatic, give the copy a fresh modification time, so that
+    # compressed siblings of the previous version count as stale
+    shutil.copyfile(file.location, f"{destination}.tmp")
+    os.replace(f"{destination}.tmp", destination)
+    return file, entry, True
+
+
+def _hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,17 @@
+"""
+Statistics shared by the instrumentation and the scripts.
+
+This module imports nothing else from the package, so scripts can use it
+without pulling in the executor and the instrumentation.
+"""
+import math
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Return the ``percent`` percentile of ``values`` using the nearest-rank method."""
+    if not values:
+        msg = "percentile of an empty list"
+        raise ValueError(msg)
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
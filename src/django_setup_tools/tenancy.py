@@ -0,0 +1,88 @@
+"""Running the setup plan for many tenants from a single process."""
+import contextlib
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, ContextManager, TypeVar
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+from .executor import _run_in_thread
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class TenantResult:
+    """The outcome of running the setup plan for one tenant."""
+
+    tenant: str
+    status: str = "succeeded"
+    duration: float = 0.0
+    error: str = ""
+    output: str = ""
+
+
+def load_tenants(path: str) -> list[Any]:
+    """
+    Call the tenant enumerator at the dotted ``path`` and return its tenants.
+
+    Raises:
+        ImproperlyConfigured: If the enumerator cannot be imported or called
+    """
+    try:
+        enumerator = import_string(path)
+    except ImportError as e:
+        msg = f"Could not import tenant enumerator '{path}': {e}"
+        raise ImproperlyConfigured(msg) from e
+    try:
+        return list(enumerator())
+    except Exception as e:
+        msg = f"Tenant enumerator '{path}' failed: {e}"
+        raise ImproperlyConfigured(msg) from e
+
+
+def tenant_context() -> Callable[[Any], ContextManager[Any]] | None:
+    """
+    Return the callable activating a tenant, if one is configured.
+
+    ``DJANGO_SETUP_TOOLS_TENANT_CONTEXT`` is the dotted path of a callable
+    taking a tenant and returning a context manager, such as a schema
+    switcher. Without it every tenant must be a database alias.
+    """
+    path = getattr(settings, "DJANGO_SETUP_TOOLS_TENANT_CONTEXT", None)
+    if not path:
+        return None
+    try:
+        context: Callable[[Any], ContextManager[Any]] = import_string(path)
+    except ImportError as e:
+        msg = f"Could not import tenant context '{path}': {e}"
+        raise ImproperlyConfigured(msg) from e
+    return context
+
+
+def activate(
+    tenant: Any, context: Callable[[Any], ContextManager[Any]] | None
+) -> ContextManager[Any]:
+    """Return the context manager that activates ``tenant`` in the current thread."""
+    if context is None:
+        return contextlib.nullcontext()
+    return context(tenant)
+
+
+def fan_out(items: Iterable[T], run: Callable[[T], R], workers: int) -> Iterator[R]:
+    """
+    Run ``run`` for every item on a pool of at most ``workers`` threads.
+
+    Results are yielded as they complete. Unlike the script executor, one
+    item failing does not stop the others, so ``run`` is expected to catch
+    and report its own errors. Each thread releases its database
+    connections when an item is done.
+    """
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        futures = [pool.submit(_run_in_thread, run, item) for item in items]
+        for future in as_completed(futures):
+            yield future.result()
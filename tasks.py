@@ -14,6 +14,18 @@ def test(c, tox=False):
         c.run("poetry run pytest --cov --cov-config=pyproject.toml --cov-report=html")
 
 
+@task
+def bench(c, save=False, k=""):
+    """
+    Run the benchmark suite and compare the results with the stored baselines
+    """
+    print("🚀 Benchmarking: Running the benchmark suite")
+    args = " --save" if save else ""
+    if k:
+        args += f" -k {k}"
+    c.run(f"poetry run python -m benchmarks{args}")
+
+
 @task
 def prerelease(c):
     """
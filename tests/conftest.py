@@ -1,4 +1,6 @@
 """Test configuration for django_setup_tools tests."""
+import contextlib
+
 import pytest
 from django.conf import settings
 
@@ -25,6 +27,8 @@ def pytest_configure():
             SITE_DOMAIN='test.example.com',
             SITE_NAME='Test Site',
             USE_TZ=True,
+            DJANGO_SETUP_TOOLS_SCRIPT_INDEX_DIR=None,
+            DJANGO_SETUP_TOOLS_COLLECT_MANIFEST_DIR=None,
         )
 
     # Initialize Django
@@ -42,3 +46,45 @@ def django_db_setup():
 def enable_db_access_for_all_tests(db):
     """Allow database access for all tests."""
     pass
+
+
+@contextlib.contextmanager
+def create_tables(django_db_blocker, *models):
+    """Create the tables of ``models``, which the test database does not migrate."""
+    from django.db import connection
+
+    with django_db_blocker.unblock():
+        with connection.schema_editor() as editor:
+            for model in models:
+                editor.create_model(model)
+        yield
+        with connection.schema_editor() as editor:
+            for model in reversed(models):
+                editor.delete_model(model)
+
+
+@pytest.fixture(scope="session")
+def ledger_table(django_db_blocker):
+    """Create the script run ledger table."""
+    from django_setup_tools.models import ScriptRun
+
+    with create_tables(django_db_blocker, ScriptRun):
+        yield
+
+
+@pytest.fixture(scope="session")
+def site_table(django_db_blocker):
+    """Create the sites table."""
+    from django.contrib.sites.models import Site
+
+    with create_tables(django_db_blocker, Site):
+        yield
+
+
+@pytest.fixture(scope="session")
+def lock_table(django_db_blocker):
+    """Create the setup lock table."""
+    from django_setup_tools.models import SetupLock
+
+    with create_tables(django_db_blocker, SetupLock):
+        yield
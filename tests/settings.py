@@ -56,3 +56,7 @@ DATABASES = {
         "NAME": os.path.join(BASE_DIR, "db.sqlite3"),
     }
 }
+
+# Keep the caches out of the home directory of whoever runs the tests
+DJANGO_SETUP_TOOLS_SCRIPT_INDEX_DIR = None
+DJANGO_SETUP_TOOLS_COLLECT_MANIFEST_DIR = None
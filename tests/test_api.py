@@ -0,0 +1,85 @@
+"""Tests for running the setup scripts through the run_setup API."""
+import logging
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+import django_setup_tools
+from django_setup_tools.api import run_setup
+from django_setup_tools.ledger import Ledger
+
+CALLS = []
+
+
+def record(handler, name):
+    handler.stdout.write(f"recording {name}")
+    CALLS.append(name)
+
+
+@pytest.fixture(autouse=True)
+def config(settings, mocker):
+    CALLS.clear()
+    settings.DJANGO_SETUP_TOOLS = {
+        "": {"on_initial": [("tests.test_api.record", "initial")], "always_run": [("tests.test_api.record", "always")]},
+        "staging": {"always_run": [("tests.test_api.record", "staging")]},
+    }
+    mocker.patch("django_setup_tools.management.commands.setup.Command.is_initialized", return_value=False)
+    mocker.patch.object(Ledger, "is_available", return_value=False)
+
+
+def test_package_exports_run_setup():
+    assert django_setup_tools.run_setup is run_setup
+    with pytest.raises(AttributeError):
+        django_setup_tools.missing  # noqa: B018
+
+
+def test_run_setup_to_stream():
+    stream = StringIO()
+    report = run_setup(stream=stream)
+
+    assert CALLS == ["initial", "always"]
+    assert "recording always" in stream.getvalue()
+    # No terminal colors in streams
+    assert "\x1b[" not in stream.getvalue()
+    assert [metrics.name for metrics in report.scripts] == ["tests.test_api.record", "tests.test_api.record"]
+
+
+def test_run_setup_env_and_phases():
+    run_setup(env="staging", phases=["always_run"], stream=StringIO())
+
+    assert CALLS == ["always", "staging"]
+
+
+def test_run_setup_logs(caplog):
+    with caplog.at_level(logging.INFO, logger="django_setup_tools"):
+        run_setup(phases=["on_initial"])
+
+    assert CALLS == ["initial"]
+    messages = [record.getMessage() for record in caplog.records]
+    assert "Running initialization scripts (django_setup_tools):" in messages
+    assert "recording initial" in messages
+    assert "Running setup scripts (django_setup_tools):" not in messages
+
+
+def test_run_setup_options_and_errors(settings):
+    settings.DJANGO_SETUP_TOOLS = {"": {"always_run": ["tests.test_api.missing"]}}
+
+    with pytest.raises(CommandError, match="Invalid DJANGO_SETUP_TOOLS configuration"):
+        run_setup(stream=StringIO(), jobs=2)
+    with pytest.raises(ValueError, match="Unknown phase\\(s\\): later"):
+        run_setup(phases=["later"])
+
+
+def test_run_setup_rejects_unknown_options():
+    with pytest.raises(TypeError, match="Unknown option\\(s\\) for setup command: job, wait. Valid options are: .*jobs"):
+        run_setup(stream=StringIO(), job=2, wait=True)
+
+    assert CALLS == []
+
+
+def test_command_env_and_phase_options():
+    call_command("setup", "--env", "staging", "--phase", "always_run", stdout=StringIO())
+
+    assert CALLS == ["always", "staging"]
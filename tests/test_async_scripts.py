@@ -0,0 +1,140 @@
+"""Tests for native asyncio setup scripts."""
+import asyncio
+import json
+from io import StringIO
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+
+from django_setup_tools.management.commands.setup import Command
+from django_setup_tools.models import ScriptRun
+from django_setup_tools.specs import merge_groups, parse_spec
+
+STATE = {"running": 0, "peak": 0, "calls": []}
+
+
+async def fetch(handler, name):
+    STATE["running"] += 1
+    STATE["peak"] = max(STATE["peak"], STATE["running"])
+    await asyncio.sleep(0.02)
+    STATE["running"] -= 1
+    STATE["calls"].append(name)
+    handler.stdout.write(f"fetched {name}")
+
+
+async def broken(handler):
+    await asyncio.sleep(0)
+    raise RuntimeError("unreachable")
+
+
+def _select(count):
+    with connection.cursor() as cursor:
+        for _ in range(count):
+            cursor.execute("SELECT 1")
+
+
+async def query(handler, count):
+    for _ in range(int(count)):
+        await sync_to_async(_select)(1)
+        # Let the other scripts of the group interleave with this one
+        await asyncio.sleep(0.01)
+
+
+def sync_query(handler, count):
+    _select(int(count))
+
+
+def sync_step(handler, name):
+    STATE["calls"].append(name)
+
+
+@pytest.fixture(autouse=True)
+def reset_state(ledger_table):
+    STATE.update(running=0, peak=0, calls=[])
+
+
+def concurrent(name):
+    return {"command": "tests.test_async_scripts.fetch", "args": [name], "concurrent": True}
+
+
+def test_merge_groups():
+    assert merge_groups([[0], [1, 2], [3]], [set(), {0}, {1}, {2}]) == [set(), {0}, {1}]
+
+
+def test_single_async_script_is_awaited():
+    command = Command(stdout=StringIO())
+    command.run_script("tests.test_async_scripts.fetch", "one")
+
+    assert STATE["calls"] == ["one"]
+    assert "fetched one" in command.stdout._out.getvalue()
+
+
+def test_async_scripts_without_concurrent_run_one_by_one():
+    Command(stdout=StringIO()).run_all([("tests.test_async_scripts.fetch", "a"), ("tests.test_async_scripts.fetch", "b")])
+
+    assert STATE["peak"] == 1
+    assert STATE["calls"] == ["a", "b"]
+
+
+def test_consecutive_concurrent_scripts_are_gathered():
+    command = Command(stdout=StringIO())
+    command.run_all([concurrent("a"), concurrent("b"), concurrent("c"), ("tests.test_async_scripts.sync_step", "after")])
+
+    assert STATE["peak"] == 3
+    # The synchronous script waits for the whole group
+    assert STATE["calls"][-1] == "after"
+
+
+def test_concurrency_limit():
+    command = Command(stdout=StringIO())
+    command.async_limit = 2
+    command.run_all([concurrent(str(i)) for i in range(5)])
+
+    assert STATE["peak"] == 2
+    assert sorted(STATE["calls"]) == ["0", "1", "2", "3", "4"]
+
+
+def test_group_failure_raises_command_error():
+    command = Command(stdout=StringIO())
+    commands = [concurrent("a"), {"command": "tests.test_async_scripts.broken", "concurrent": True}]
+    with pytest.raises(CommandError, match="Failed to execute command"):
+        command.run_all(commands)
+
+    # The other member of the group still completes
+    assert STATE["calls"] == ["a"]
+
+
+def test_concurrent_flag_requires_async_function():
+    command = Command(stdout=StringIO())
+    specs = [parse_spec({"command": "tests.test_async_scripts.sync_step", "concurrent": True}), parse_spec(concurrent("a"))]
+    assert command._async_groups(specs, [set(), {0}]) == [[0], [1]]
+
+
+def test_async_scripts_are_recorded_in_ledger(settings):
+    settings.DJANGO_SETUP_TOOLS = {"": {"always_run": [concurrent("a"), concurrent("b")]}}
+    call_command("setup", "--async-limit", "5", stdout=StringIO())
+
+    assert STATE["peak"] == 2
+    assert ScriptRun.objects.filter(status=ScriptRun.Status.SUCCEEDED).count() == 2
+
+
+def test_concurrent_scripts_count_their_own_queries(settings, tmp_path):
+    settings.DJANGO_SETUP_TOOLS = {
+        "": {
+            "always_run": [
+                {"command": "tests.test_async_scripts.query", "args": ["1"], "concurrent": True},
+                {"command": "tests.test_async_scripts.query", "args": ["3"], "concurrent": True},
+                ("tests.test_async_scripts.sync_query", "2"),
+            ]
+        }
+    }
+    report = tmp_path / "report.json"
+
+    call_command("setup", "--report", str(report), stdout=StringIO())
+
+    scripts = json.loads(report.read_text())["scripts"]
+    assert [(script["args"], script["queries"]) for script in scripts] == [(["1"], 1), (["3"], 3), (["2"], 2)]
+    assert all(not connections[alias].execute_wrappers for alias in connections)
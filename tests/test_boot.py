@@ -0,0 +1,76 @@
+"""Tests for profiling Django's boot per installed app."""
+from unittest.mock import Mock
+
+import pytest
+from django.conf import settings as django_settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import CommandError
+
+from django_setup_tools.boot import MARKER, OTHER, AppBoot, BootProfile, attribute_imports, profile_boot
+from django_setup_tools.scripts import profile_app_boot
+
+LOG = f"""\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 | encodings
+{MARKER}
+import time:      1000 |       1000 |     requests.utils
+import time:      2000 |       3000 |   requests
+import time:       500 |       3500 | shop
+import time:       300 |        300 |   shop.models
+import time:       200 |        200 |   shop.payments.gateway
+import time:       400 |        900 | shop.payments
+import time:       700 |        700 | django.db
+"""
+
+
+@pytest.fixture
+def handler():
+    handler = Mock()
+    handler.style.SUCCESS = lambda message: message
+    handler.style.ERROR = lambda message: message
+    return handler
+
+
+def output(handler):
+    return [call.args[0] for call in handler.stdout.write.call_args_list]
+
+
+def test_attribute_imports():
+    totals = attribute_imports(LOG, {"shop": "shop", "payments": "shop.payments"})
+
+    # Libraries count for the app importing them, app modules for their own app,
+    # and modules imported before the marker are not counted
+    assert totals == pytest.approx({"shop": 0.0038, "payments": 0.0006, OTHER: 0.0007})
+
+
+def test_profile_boot():
+    profile = profile_boot()
+
+    assert profile.boot > 0
+    labels = [app.label for app in profile.apps]
+    assert labels[:2] == ["sites", "django_setup_tools"]
+    assert all(app.imports >= 0 and app.ready >= 0 for app in profile.apps)
+
+
+def test_profile_boot_needs_settings_module(mocker):
+    mocker.patch.object(django_settings, "SETTINGS_MODULE", None)
+    with pytest.raises(ImproperlyConfigured, match="DJANGO_SETTINGS_MODULE"):
+        profile_boot()
+
+
+def test_profile_app_boot(handler, settings, mocker):
+    profile = BootProfile(boot=1.5, apps=[AppBoot("fast", 0.01), AppBoot("slow", 0.5, 0.25), AppBoot("mid", 0.1)])
+    mocker.patch("django_setup_tools.scripts.startup.profile_boot", return_value=profile)
+    settings.DJANGO_SETUP_TOOLS_BOOT_PROFILE = {"top": 2, "budget": 2}
+
+    profile_app_boot(handler)
+
+    lines = output(handler)
+    assert lines[1] == "✓ Django booted in 1.50s (budget 2.00s)"
+    assert [line.split()[0] for line in lines[2:]] == ["slow", "mid"]
+    assert lines[2] == f"  {'slow':<30}     500.0ms imports     250.0ms ready()"
+
+    settings.DJANGO_SETUP_TOOLS_BOOT_PROFILE = {"budget": 1}
+    with pytest.raises(CommandError, match="Django boot took 1.50s, over the budget of 1.00s"):
+        profile_app_boot(handler)
+    assert "✗ Django booted in 1.50s (budget 1.00s)" in output(handler)
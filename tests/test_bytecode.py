@@ -0,0 +1,107 @@
+"""Tests for precompiling Python sources to bytecode."""
+import importlib.util
+import os
+from pathlib import Path
+from unittest.mock import Mock
+
+import django
+import pytest
+
+from django_setup_tools import bytecode
+from django_setup_tools.bytecode import compile_sources, source_roots, stale_sources
+from django_setup_tools.scripts import compile_bytecode
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "a.py").write_text("A = 1\n")
+    (tmp_path / "pkg" / "b.py").write_text("B = 2\n")
+    (tmp_path / "node_modules" / "c.py").write_text("C = 3\n")
+    (tmp_path / "broken.py").write_text("def (:\n")
+    return tmp_path
+
+
+@pytest.fixture
+def handler():
+    handler = Mock()
+    handler.style.SUCCESS = lambda message: message
+    handler.style.WARNING = lambda message: message
+    return handler
+
+
+def output(handler):
+    return [call.args[0] for call in handler.stdout.write.call_args_list]
+
+
+def test_source_roots(settings):
+    repository = Path(__file__).resolve().parent.parent
+    settings.BASE_DIR = repository
+
+    roots = source_roots()
+
+    # django_setup_tools lives inside the project, so it is not listed again
+    assert str(repository) in roots
+    assert not any(root.startswith(f"{repository}{os.sep}") for root in roots)
+    assert str(Path(django.__file__).parent / "contrib" / "sites") in roots
+
+
+def test_stale_sources_and_compile(project):
+    stale, total = stale_sources([str(project)])
+
+    assert total == 3
+    assert sorted(stale) == [str(project / "a.py"), str(project / "broken.py"), str(project / "pkg" / "b.py")]
+
+    assert compile_sources(stale) == [str(project / "broken.py")]
+    assert os.path.exists(importlib.util.cache_from_source(str(project / "pkg" / "b.py")))
+    assert stale_sources([str(project)])[0] == [str(project / "broken.py")]
+
+    # Editing a source makes it stale again
+    source = project / "a.py"
+    stat = os.stat(importlib.util.cache_from_source(str(source)))
+    os.utime(source, (stat.st_atime, stat.st_mtime + 10))
+    assert sorted(stale_sources([str(project)])[0]) == [str(project / "a.py"), str(project / "broken.py")]
+
+
+def test_replaced_source_with_older_mtime_is_stale(project):
+    source = project / "a.py"
+    compile_sources([str(source)])
+    stat = os.stat(source)
+
+    # A deploy that preserves modification times may replace a source with an older file
+    source.write_text("A = 'replaced'\n")
+    os.utime(source, (stat.st_atime, stat.st_mtime - 60))
+    assert str(source) in stale_sources([str(project)])[0]
+
+    # The same modification time with another size is stale as well
+    os.utime(source, (stat.st_atime, stat.st_mtime))
+    assert str(source) in stale_sources([str(project)])[0]
+
+    assert compile_sources([str(source)]) == []
+    assert str(source) not in stale_sources([str(project)])[0]
+
+
+def test_compile_sources_in_process_pool(project, monkeypatch):
+    monkeypatch.setattr(bytecode, "COMPILE_POOL_THRESHOLD", 0)
+
+    assert compile_sources([str(project / "a.py"), str(project / "broken.py")], workers=2) == [
+        str(project / "broken.py")
+    ]
+    assert os.path.exists(importlib.util.cache_from_source(str(project / "a.py")))
+
+
+def test_compile_bytecode(project, handler, mocker):
+    roots = mocker.patch("django_setup_tools.scripts.startup.source_roots", return_value=[str(project)])
+
+    compile_bytecode(handler)
+
+    roots.assert_called_once_with(site_packages=False)
+    lines = output(handler)
+    assert lines[1:3] == ["⚠ 1 file(s) could not be compiled:", f"  - {project / 'broken.py'}"]
+    assert lines[-1].startswith("✓ Compiled 2 file(s) in 1 directory tree(s), 0 already up to date (")
+
+    compile_bytecode(handler, "--site-packages")
+
+    roots.assert_called_with(site_packages=True)
+    assert output(handler)[-1].startswith("✓ Compiled 0 file(s) in 1 directory tree(s), 2 already up to date (")
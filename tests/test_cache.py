@@ -0,0 +1,135 @@
+"""Tests for generational cache keys and the invalidate_caches script."""
+from unittest.mock import Mock
+
+import pytest
+from django.core.cache import caches
+from django.test import override_settings
+
+from django_setup_tools import cache as cache_module
+from django_setup_tools.cache import bump_generation, delete_prefix, generational_key
+from django_setup_tools.scripts import invalidate_caches
+
+LOCMEM = "django.core.cache.backends.locmem.LocMemCache"
+
+CACHES = {
+    "default": {"BACKEND": LOCMEM, "LOCATION": "default", "KEY_FUNCTION": "django_setup_tools.cache.generational_key"},
+    "fragments": {"BACKEND": LOCMEM, "LOCATION": "fragments"},
+    "sessions": {"BACKEND": LOCMEM, "LOCATION": "sessions"},
+}
+
+
+@pytest.fixture(autouse=True)
+def cache_settings():
+    with override_settings(CACHES=CACHES):
+        yield
+        for alias in CACHES:
+            caches[alias].clear()
+    cache_module._generations.clear()
+
+
+@pytest.fixture
+def handler():
+    handler = Mock()
+    handler.style.SUCCESS = lambda message: message
+    handler.style.ERROR = lambda message: message
+    return handler
+
+
+def output(handler):
+    return [call.args[0] for call in handler.stdout.write.call_args_list]
+
+
+def test_generational_key():
+    assert generational_key("user:1", "site", 1) == "site:1:g0:user:1"
+    assert generational_key(cache_module.GENERATION_KEY, "site", 1) == f"site:1:{cache_module.GENERATION_KEY}"
+
+
+def test_bump_generation_hides_old_entries():
+    cache = caches["default"]
+    cache.set("greeting", "hello")
+
+    assert bump_generation(cache) == 1
+    assert cache.get("greeting") is None
+    cache.set("greeting", "hi")
+    assert bump_generation(cache) == 2
+    assert cache.get("greeting") is None
+
+
+def test_delete_prefix():
+    cache = caches["fragments"]
+    cache.set_many({"views:home": 1, "views:about": 2, "menu": 3})
+
+    assert delete_prefix(cache, "views:") == 2
+    assert cache.get_many(["views:home", "views:about", "menu"]) == {"menu": 3}
+
+
+def test_delete_prefix_unsupported_backend():
+    cache = Mock(spec=["make_key"])
+    with pytest.raises(NotImplementedError):
+        delete_prefix(cache, "views:")
+
+
+def test_delete_prefix_without_redis_backend(mocker):
+    # Django < 4.0 has no django.core.cache.backends.redis
+    mocker.patch.dict("sys.modules", {"django.core.cache.backends.redis": None})
+
+    with pytest.raises(NotImplementedError):
+        delete_prefix(Mock(spec=["make_key"]), "views:")
+    assert delete_prefix(caches["fragments"], "views:") == 0
+
+
+@override_settings(
+    DJANGO_SETUP_TOOLS_CACHE_INVALIDATION={"fragments": {"prefix": ["views:"]}, "sessions": "keep"}
+)
+def test_invalidate_caches(handler):
+    caches["default"].set("page", "old")
+    caches["fragments"].set_many({"views:home": 1, "menu": 2})
+    caches["sessions"].set("session", "warm")
+
+    invalidate_caches(handler)
+
+    assert caches["default"].get("page") is None
+    assert caches["fragments"].get_many(["views:home", "menu"]) == {"menu": 2}
+    assert caches["sessions"].get("session") == "warm"
+    lines = output(handler)
+    assert any(line.startswith("✓ default: moved to generation 1 (") for line in lines)
+    assert any(line.startswith("✓ fragments: deleted 1 key(s) under views: (") for line in lines)
+    assert any(line.startswith("✓ sessions: kept (") for line in lines)
+
+
+def test_invalidate_caches_defaults_and_selected_aliases(handler):
+    caches["fragments"].set("menu", 1)
+    caches["sessions"].set("session", "warm")
+
+    invalidate_caches(handler, "fragments")
+
+    assert caches["fragments"].get("menu") is None
+    assert caches["sessions"].get("session") == "warm"
+    assert any(line.startswith("✓ fragments: cleared (") for line in output(handler))
+
+
+@override_settings(DJANGO_SETUP_TOOLS_CACHE_INVALIDATION={"sessions": "version", "fragments": "bogus"})
+def test_invalidate_caches_errors(handler):
+    invalidate_caches(handler, "sessions", "fragments", "nope")
+
+    lines = output(handler)
+    assert any(line.startswith("✗ sessions: version invalidation needs KEY_FUNCTION") for line in lines)
+    assert any(line.startswith("✗ fragments: unknown invalidation strategy 'bogus'") for line in lines)
+    assert any(line.startswith("✗ nope: Could not find config for 'nope'") for line in lines)
+
+
+def test_aliases_sharing_a_prefix_have_their_own_generation(handler):
+    generational = {"BACKEND": LOCMEM, "KEY_FUNCTION": "django_setup_tools.cache.generational_key"}
+    with override_settings(
+        CACHES={"default": {**generational, "LOCATION": "default"}, "sessions": {**generational, "LOCATION": "sessions"}}
+    ):
+        caches["default"].set("k", "page")
+        caches["sessions"].set("k", "session")
+
+        invalidate_caches(handler, "sessions")
+
+        assert any(line.startswith("✓ sessions: moved to generation 1 (") for line in output(handler))
+        assert caches["sessions"].get("k") is None
+        assert caches["default"].get("k") == "page"
+        for alias in ("default", "sessions"):
+            caches[alias].clear()
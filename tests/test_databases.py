@@ -0,0 +1,166 @@
+"""Tests for scripts targeting several database aliases."""
+import threading
+from io import StringIO
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+from django.core.management import call_command
+
+from django_setup_tools.ledger import Ledger
+from django_setup_tools.management.commands.setup import Command
+from django_setup_tools.migration_plan import plain_migrate_alias
+from django_setup_tools.models import ScriptRun
+from django_setup_tools.plan import accepts_database, compile_phase
+from django_setup_tools.scripts import check_database_connection
+from django_setup_tools.specs import parse_spec, resolve_dependencies
+
+CALLS = []
+
+
+def record(handler, name):
+    CALLS.append((name, handler.database))
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    CALLS.clear()
+
+
+@pytest.fixture
+def databases(settings):
+    """Declare an extra ``analytics`` alias for validation purposes."""
+    settings.DATABASES = {**settings.DATABASES, "analytics": settings.DATABASES["default"]}
+    # The alias is not a real connection, so there is nothing to wait for
+    settings.DJANGO_SETUP_TOOLS_DB_WAIT = 0
+
+
+@pytest.fixture
+def initialized(mocker):
+    """Report which aliases already have a migrations table."""
+    aliases = set()
+    mocker.patch.object(Command, "is_initialized", side_effect=lambda using="default": using in aliases)
+    return aliases
+
+
+def on(database, name, **extra):
+    return {"command": "tests.test_databases.record", "args": [name], "name": name, "database": database, **extra}
+
+
+class TestDatabaseLanes:
+    """Test dependency resolution between scripts on different databases."""
+
+    def test_aliases_are_independent(self):
+        specs = [
+            parse_spec("check"),
+            parse_spec(on("default", "a")),
+            parse_spec(on("analytics", "b")),
+            parse_spec(on("default", "c")),
+            parse_spec("collectstatic"),
+        ]
+        assert resolve_dependencies(specs) == [set(), {0}, {0}, {1}, {0, 2, 3}]
+
+    def test_leading_lanes(self):
+        specs = [parse_spec(on("default", "a")), parse_spec(on("analytics", "b")), parse_spec("check")]
+        assert resolve_dependencies(specs) == [set(), set(), {0, 1}]
+
+    def test_unknown_alias(self):
+        plan = compile_phase([on("nope", "a")])
+        assert plan.errors == ["Script 'a' targets unknown database 'nope'"]
+
+
+def test_plain_migrate_alias_default():
+    assert plain_migrate_alias(("--no-input",), default="analytics") == "analytics"
+    assert plain_migrate_alias(("--database", "other"), default="analytics") == "other"
+
+
+def test_accepts_database():
+    assert accepts_database("migrate")
+    assert not accepts_database("check")
+
+
+@patch("django_setup_tools.management.commands.setup.call_command")
+def test_database_is_passed_to_management_commands(mock_call_command):
+    command = Command(stdout=StringIO())
+    command.run_all([{"command": "migrate", "args": ["--no-input"], "database": "default"}, {"command": "check"}])
+
+    assert mock_call_command.call_args_list[0].args == ("migrate", "--no-input")
+    assert mock_call_command.call_args_list[0].kwargs == {"database": "default"}
+    assert mock_call_command.call_args_list[1].kwargs == {}
+
+
+def test_initialization_is_tracked_per_alias(ledger_table, databases, initialized, settings):
+    settings.DJANGO_SETUP_TOOLS = {
+        "": {"on_initial": [on(None, "shared"), on("default", "primary"), on("analytics", "warehouse")]}
+    }
+    initialized.add("default")
+
+    call_command("setup", stdout=StringIO())
+
+    # Only the scripts of the uninitialized alias run; the others are adopted
+    assert CALLS == [("warehouse", "analytics")]
+    adopted = ScriptRun.objects.filter(status=ScriptRun.Status.ADOPTED)
+    assert sorted(adopted.values_list("database", flat=True)) == ["", "default"]
+
+    ledger = Ledger()
+    assert ledger.has_history("on_initial", "analytics")
+    assert not ledger.has_history("on_initial", "other")
+
+
+def test_aliases_run_concurrently(databases, initialized, settings):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def meet(handler, name):
+        barrier.wait()
+        CALLS.append((name, handler.database))
+
+    settings.DJANGO_SETUP_TOOLS = {
+        "": {"always_run": [on("default", "a"), on("analytics", "b")]}
+    }
+    with (
+        patch("tests.test_databases.record", meet),
+        patch.object(Ledger, "is_available", return_value=False),
+    ):
+        call_command("setup", "--jobs", "2", stdout=StringIO())
+
+    assert sorted(CALLS) == [("a", "default"), ("b", "analytics")]
+
+
+def test_check_database_connection_many_aliases(settings):
+    settings.DATABASES = {
+        "default": {"ENGINE": "django.db.backends.sqlite3"},
+        "analytics": {"ENGINE": "django.db.backends.postgresql"},
+    }
+    threads = {}
+
+    def get_connection(alias):
+        db = MagicMock(vendor=alias)
+        db.cursor.return_value.__enter__.return_value.fetchone.side_effect = (
+            lambda: threads.setdefault(alias, threading.get_ident()) and (1,)
+        )
+        return db
+
+    handler = Mock(spec=["stdout", "style"])
+    handler.style.SUCCESS = lambda message: message
+    with patch("django_setup_tools.scripts.database.connections") as mock_connections:
+        mock_connections.__getitem__.side_effect = get_connection
+        check_database_connection(handler, "default", "analytics")
+
+    output = [call.args[0] for call in handler.stdout.write.call_args_list]
+    assert "✓ Database connection successful (default)" in output
+    assert "✓ Database connection successful (analytics)" in output
+    assert "Engine: django.db.backends.postgresql" in output
+    assert set(threads) == {"default", "analytics"}
+    assert threading.get_ident() not in threads.values()
+
+
+def test_check_database_connection_unknown_alias():
+    handler = Mock(spec=["stdout", "style"])
+    handler.style.ERROR = lambda message: message
+    handler.style.SUCCESS = lambda message: message
+
+    check_database_connection(handler, "default", "nope")
+    check_database_connection(handler, "nope")
+
+    output = [call.args[0] for call in handler.stdout.write.call_args_list]
+    assert "✓ Database connection successful (default)" in output
+    assert output.count("✗ Database connection error (nope): The connection 'nope' doesn't exist.") == 2
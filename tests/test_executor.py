@@ -0,0 +1,199 @@
+"""Tests for dependency-aware and concurrent script execution."""
+import threading
+from io import StringIO
+from unittest.mock import Mock, patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+
+from django_setup_tools.executor import execute
+from django_setup_tools.ledger import Ledger
+from django_setup_tools.management.commands.setup import Command
+from django_setup_tools.specs import ScriptSpec, critical_path, parse_spec, resolve_dependencies
+
+# Scripts used by the tests below; they are referenced by dotted path.
+EVENTS = []
+BARRIER = threading.Barrier(2, timeout=5)
+
+
+def record(handler, name):
+    handler.stdout.write(f"ran {name}")
+    EVENTS.append(name)
+
+
+def meet(handler, name):
+    """Only returns once two scripts are running at the same time."""
+    BARRIER.wait()
+    handler.stdout.write(f"met {name}")
+    EVENTS.append(name)
+
+
+def fail(handler, *args):
+    raise RuntimeError("boom")
+
+
+@pytest.fixture(autouse=True)
+def reset_events():
+    EVENTS.clear()
+    BARRIER.reset()
+
+
+class TestParseSpec:
+    """Test normalization of command specifications."""
+
+    def test_string(self):
+        assert parse_spec("migrate") == ScriptSpec(command="migrate", name="migrate", raw="migrate")
+
+    def test_tuple(self):
+        spec = parse_spec(("loaddata", "a.json", "b.json"))
+        assert spec.command == "loaddata"
+        assert spec.args == ("a.json", "b.json")
+        assert spec.after is None
+
+    def test_dict(self):
+        spec = parse_spec({"command": "collectstatic", "args": ["--no-input"], "name": "static", "after": "migrate"})
+        assert spec.command == "collectstatic"
+        assert spec.args == ("--no-input",)
+        assert spec.name == "static"
+        assert spec.after == ("migrate",)
+
+    @pytest.mark.parametrize("spec", [(), {"args": []}, {"command": "check", "bogus": 1}, 42])
+    def test_invalid(self, spec):
+        with pytest.raises(ImproperlyConfigured):
+            parse_spec(spec)
+
+
+class TestResolveDependencies:
+    """Test dependency resolution between scripts."""
+
+    def test_plain_list_is_sequential(self):
+        specs = [parse_spec(c) for c in ["a", "b", "c"]]
+        assert resolve_dependencies(specs) == [set(), {0}, {1}]
+
+    def test_explicit_after(self):
+        specs = [
+            parse_spec("migrate"),
+            parse_spec({"command": "collectstatic", "after": []}),
+            parse_spec({"command": "x.y", "after": ["migrate"]}),
+        ]
+        assert resolve_dependencies(specs) == [set(), set(), {0}]
+
+    def test_unknown_dependency(self):
+        with pytest.raises(ImproperlyConfigured, match="unknown script"):
+            resolve_dependencies([parse_spec({"command": "check", "after": ["nope"]})])
+
+    def test_cycle(self):
+        specs = [
+            parse_spec({"command": "a", "after": ["b"]}),
+            parse_spec({"command": "b", "after": ["a"]}),
+        ]
+        with pytest.raises(ImproperlyConfigured, match="Circular"):
+            resolve_dependencies(specs)
+
+    def test_critical_path(self):
+        # 0 -> 2 and 1 -> 2, with 1 being the slower branch
+        assert critical_path([set(), set(), {0, 1}], [1.0, 5.0, 2.0]) == 7.0
+        assert critical_path([set(), {0}], [1.0, 2.0]) == 3.0
+        assert critical_path([], []) == 0.0
+
+
+class TestExecute:
+    """Test the executor directly."""
+
+    def test_sequential_respects_dependencies(self):
+        order = []
+        execute([{1}, set()], order.append)
+        assert order == [1, 0]
+
+    def test_parallel_fail_fast(self):
+        started = []
+
+        def run(index):
+            if index == 0:
+                raise ValueError("first failed")
+
+        with pytest.raises(ValueError, match="first failed"):
+            execute([set(), {0}], run, jobs=4, on_start=started.append)
+        # The dependent script must never start
+        assert started == [0]
+
+
+class TestRunAllConcurrently:
+    """Test the setup command running scripts on a thread pool."""
+
+    def setup_method(self):
+        self.command = Command(stdout=StringIO())
+
+    def test_independent_scripts_overlap(self):
+        commands = [
+            {"command": "tests.test_executor.meet", "args": ["a"], "after": []},
+            {"command": "tests.test_executor.meet", "args": ["b"], "after": []},
+        ]
+        self.command.run_all(commands, jobs=2)
+
+        assert sorted(EVENTS) == ["a", "b"]
+        output = self.command.stdout._out.getvalue()
+        assert "[tests.test_executor.meet] met a" in output
+        assert "[tests.test_executor.meet] met b" in output
+
+    def test_dependencies_are_honoured(self):
+        commands = [
+            {"command": "tests.test_executor.record", "args": ["second"], "after": ["first"]},
+            {"command": "tests.test_executor.record", "args": ["first"], "name": "first", "after": []},
+        ]
+        self.command.run_all(commands, jobs=4)
+
+        assert EVENTS == ["first", "second"]
+
+    def test_failure_raises_command_error(self):
+        commands = [
+            {"command": "tests.test_executor.fail", "name": "bad", "after": []},
+            {"command": "tests.test_executor.record", "args": ["later"], "after": ["bad"]},
+        ]
+        with pytest.raises(CommandError, match="Failed to execute command"):
+            self.command.run_all(commands, jobs=2)
+
+        assert EVENTS == []
+
+    @patch("django_setup_tools.management.commands.setup.call_command")
+    def test_management_command_output_is_captured(self, mock_call_command):
+        self.command.run_all([{"command": "check", "after": []}], jobs=2)
+
+        _, kwargs = mock_call_command.call_args
+        assert isinstance(kwargs["stdout"], StringIO)
+
+    def test_invalid_configuration(self):
+        with pytest.raises(CommandError, match="unknown script"):
+            self.command.run_all([{"command": "check", "after": ["missing"]}])
+
+
+@override_settings(
+    DJANGO_SETUP_TOOLS={
+        "": {
+            "always_run": [
+                {"command": "tests.test_executor.meet", "args": ["a"], "after": []},
+                {"command": "tests.test_executor.meet", "args": ["b"], "after": []},
+            ]
+        }
+    }
+)
+def test_jobs_option():
+    """Test that --jobs runs independent scripts concurrently end to end."""
+    # Worker threads cannot write to the ledger while the test transaction
+    # holds the SQLite write lock
+    with patch.object(Ledger, "is_available", return_value=False):
+        call_command("setup", "--jobs", "2", stdout=StringIO())
+
+    assert sorted(EVENTS) == ["a", "b"]
+
+
+def test_run_script_passes_no_output_options_by_default():
+    """Sequential execution calls management commands exactly as configured."""
+    command = Command()
+    command.stdout = Mock()
+    with patch("django_setup_tools.management.commands.setup.call_command") as mock_call_command:
+        command.run_script("check", "--deploy")
+    mock_call_command.assert_called_once_with("check", "--deploy")
@@ -0,0 +1,141 @@
+"""Tests for input fingerprinting of always_run scripts."""
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import override_settings
+
+from django_setup_tools.fingerprint import compute_fingerprint, validate_inputs
+from django_setup_tools.migration_plan import MigrationPlanCache
+from django_setup_tools.specs import parse_spec
+
+CALLS = []
+
+
+def collect(handler, *args):
+    CALLS.append(args)
+
+
+@pytest.fixture(autouse=True)
+def reset_calls(ledger_table):
+    CALLS.clear()
+
+
+@pytest.fixture
+def source_tree(tmp_path, settings):
+    settings.BASE_DIR = tmp_path
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "app.css").write_text("body {}")
+    (tmp_path / "assets" / "app.js").write_text("// js")
+    return tmp_path
+
+
+class TestFingerprint:
+    """Test computing fingerprints."""
+
+    def test_validate_inputs(self):
+        assert validate_inputs({"files": "static/**"}) == {"files": ["static/**"]}
+        with pytest.raises(ImproperlyConfigured):
+            validate_inputs({"bogus": True})
+        with pytest.raises(ImproperlyConfigured):
+            validate_inputs(["static/**"])
+
+    def test_spec_inputs(self):
+        spec = parse_spec({"command": "collectstatic", "inputs": {"settings": "STATIC_ROOT"}})
+        assert spec.inputs == {"settings": ["STATIC_ROOT"]}
+
+    def test_files(self, source_tree):
+        inputs = {"files": ["assets/*.css"]}
+        first = compute_fingerprint(inputs)
+        assert compute_fingerprint(inputs) == first
+
+        (source_tree / "assets" / "app.css").write_text("body { color: red }")
+        assert compute_fingerprint(inputs) != first
+
+    def test_directories_are_walked(self, source_tree):
+        inputs = {"files": ["assets"]}
+        first = compute_fingerprint(inputs)
+
+        (source_tree / "assets" / "new.txt").write_text("new")
+        assert compute_fingerprint(inputs) != first
+
+    def test_settings(self, settings):
+        settings.STATIC_ROOT = "/srv/static"
+        first = compute_fingerprint({"settings": ["STATIC_ROOT"]})
+
+        settings.STATIC_ROOT = "/srv/other"
+        assert compute_fingerprint({"settings": ["STATIC_ROOT"]}) != first
+
+    def test_migrations(self):
+        with patch("django_setup_tools.fingerprint.MigrationLoader") as loader:
+            loader.return_value.graph.nodes = {("app", "0001_initial"): None}
+            loader.return_value.applied_migrations = {}
+            pending = compute_fingerprint({"migrations": True})
+
+            loader.return_value.applied_migrations = {("app", "0001_initial"): None}
+            assert compute_fingerprint({"migrations": True}) != pending
+
+    def test_migration_graph_is_loaded_once_per_alias(self):
+        plans = MigrationPlanCache()
+        with patch("django_setup_tools.migration_plan.MigrationExecutor") as executor:
+            executor.return_value.loader.graph.nodes = {("app", "0001_initial"): None}
+            executor.return_value.loader.applied_migrations = {}
+            first = compute_fingerprint({"migrations": True}, migration_plans=plans)
+            assert compute_fingerprint({"migrations": True}, migration_plans=plans) == first
+            assert executor.call_count == 1
+
+            # Applying migrations invalidates the cache
+            executor.return_value.loader.applied_migrations = {("app", "0001_initial"): None}
+            plans.invalidate()
+            assert compute_fingerprint({"migrations": True}, migration_plans=plans) != first
+            assert executor.call_count == 2
+
+
+@pytest.fixture
+def config(settings, source_tree):
+    settings.DJANGO_SETUP_TOOLS = {
+        "": {
+            "always_run": [
+                {"command": "tests.test_fingerprint.collect", "args": ["static"], "inputs": {"files": ["assets"]}},
+                ("tests.test_fingerprint.collect", "plain"),
+            ]
+        }
+    }
+    return settings
+
+
+def test_unchanged_inputs_are_skipped(config):
+    call_command("setup", stdout=StringIO())
+    output = StringIO()
+    call_command("setup", stdout=output)
+
+    assert CALLS == [("static",), ("plain",), ("plain",)]
+    assert "inputs unchanged" in output.getvalue()
+
+
+def test_changed_inputs_rerun(config, source_tree):
+    call_command("setup", stdout=StringIO())
+    (source_tree / "assets" / "app.js").write_text("// changed")
+    call_command("setup", stdout=StringIO())
+
+    assert CALLS.count(("static",)) == 2
+
+
+def test_force_ignores_fingerprints(config):
+    call_command("setup", stdout=StringIO())
+    call_command("setup", "--force", stdout=StringIO())
+
+    assert CALLS.count(("static",)) == 2
+
+
+@override_settings(
+    DJANGO_SETUP_TOOLS={"": {"always_run": [{"command": "tests.test_fingerprint.missing", "inputs": {"settings": ["DEBUG"]}}]}}
+)
+def test_failed_runs_do_not_count(ledger_table):
+    from django.core.management.base import CommandError
+
+    for _ in range(2):
+        with pytest.raises(CommandError):
+            call_command("setup", stdout=StringIO())
@@ -0,0 +1,111 @@
+"""Tests for per-script instrumentation and the JSON report."""
+import json
+import tracemalloc
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
+from django_setup_tools.instrumentation import RunReport, ScriptMetrics, format_metrics, measure
+
+
+def query(handler, count="2"):
+    with connection.cursor() as cursor:
+        for _ in range(int(count)):
+            cursor.execute("SELECT 1")
+
+
+def allocate(handler):
+    data = [bytearray(1024) for _ in range(1024)]
+    handler.stdout.write(f"allocated {len(data)} blocks")
+
+
+def explode(handler):
+    raise RuntimeError("kaboom")
+
+
+class TestMeasure:
+    """Test the measure context manager."""
+
+    def test_counts_queries_and_time(self):
+        metrics = ScriptMetrics(name="query", command="query")
+        with measure(metrics):
+            query(None, "3")
+
+        assert metrics.queries == 3
+        assert metrics.wall_time >= metrics.query_time >= 0
+        assert metrics.cpu_time >= 0
+        assert metrics.peak_memory is None
+
+    def test_peak_memory(self):
+        tracemalloc.start()
+        try:
+            metrics = ScriptMetrics(name="allocate", command="allocate")
+            with measure(metrics, trace_memory=True):
+                allocate(StubHandler())
+        finally:
+            tracemalloc.stop()
+
+        assert metrics.peak_memory >= 1024 * 1024
+
+    def test_failure(self):
+        metrics = ScriptMetrics(name="explode", command="explode")
+        with pytest.raises(RuntimeError), measure(metrics):
+            explode(None)
+
+        assert metrics.status == "failed"
+        assert metrics.error == "kaboom"
+
+    def test_format_metrics(self):
+        metrics = ScriptMetrics(name="x", command="x", wall_time=1.5, queries=4, peak_memory=2 * 1024 * 1024)
+        assert format_metrics(metrics) == "finished in 1.50s (cpu 0.00s, 4 queries in 0.00s, peak memory 2.0 MiB)"
+
+
+class StubHandler:
+    stdout = StringIO()
+
+
+def test_report_as_dict():
+    report = RunReport(environment="production")
+    report.add(ScriptMetrics(name="migrate", command="migrate", queries=10))
+
+    data = report.as_dict()
+    assert data["environment"] == "production"
+    assert data["scripts"][0]["queries"] == 10
+
+
+def test_report_option(settings, tmp_path, ledger_table):
+    settings.DJANGO_SETUP_TOOLS = {
+        "": {
+            "always_run": [
+                ("tests.test_instrumentation.query", "2"),
+                "tests.test_instrumentation.allocate",
+            ]
+        }
+    }
+    path = tmp_path / "report.json"
+    output = StringIO()
+    call_command("setup", "--report", str(path), stdout=output)
+
+    report = json.loads(path.read_text())
+    assert report["status"] == "succeeded"
+    query_metrics, allocate_metrics = report["scripts"]
+    assert query_metrics["name"] == "tests.test_instrumentation.query"
+    # Ledger bookkeeping happens outside the measured block
+    assert query_metrics["queries"] == 2
+    assert allocate_metrics["peak_memory"] >= 1024 * 1024
+    assert "finished in" in output.getvalue()
+    assert not tracemalloc.is_tracing()
+
+
+def test_report_written_on_failure(settings, tmp_path, ledger_table):
+    settings.DJANGO_SETUP_TOOLS = {"": {"always_run": ["tests.test_instrumentation.explode"]}}
+    path = tmp_path / "report.json"
+    with pytest.raises(CommandError):
+        call_command("setup", "--report", str(path), stdout=StringIO())
+
+    report = json.loads(path.read_text())
+    assert report["status"] == "failed"
+    assert "kaboom" in report["scripts"][0]["error"]
@@ -1,5 +1,5 @@
 """Integration tests for django_setup_tools package."""
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 
 import pytest
 from django.apps import apps
@@ -142,24 +142,16 @@ class TestCustomScriptExecution:
             }
         }
     )
-    @patch('django_setup_tools.scripts.Site.objects.update_or_create')
-    def test_sync_site_id_execution(self, mock_update_or_create, db):
+    def test_sync_site_id_execution(self, site_table, db):
         """Test that sync_site_id script executes correctly."""
-        mock_site = Mock()
-        mock_site.name = "Test Site"
-        mock_site.domain = "test.example.com"
-        mock_update_or_create.return_value = (mock_site, True)
+        from django.contrib.sites.models import Site
 
         with patch('sys.stdout'):
             call_command('setup')
 
-        mock_update_or_create.assert_called_once_with(
-            id=1,
-            defaults={
-                "domain": "test.example.com",
-                "name": "Test Site"
-            }
-        )
+        site = Site.objects.get(id=1)
+        assert site.domain == "test.example.com"
+        assert site.name == "Test Site"
 
 
 class TestConfigurationValidation:
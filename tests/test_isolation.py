@@ -0,0 +1,165 @@
+"""Tests for running setup scripts in a worker process."""
+import json
+import os
+import time
+from io import StringIO
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from django_setup_tools.isolation import run_isolated, validate_isolate
+from django_setup_tools.specs import parse_spec
+
+RAN_IN = []
+
+
+def record_pid(handler, *args):
+    RAN_IN.append(os.getpid())
+    handler.stdout.write(f"pid {os.getpid()} args {' '.join(args)}")
+
+
+def stream(handler):
+    handler.stdout.write("first")
+    time.sleep(0.5)
+    handler.stdout.write("second")
+
+
+def fail(handler):
+    handler.stdout.write("about to fail")
+    msg = "boom"
+    raise RuntimeError(msg)
+
+
+def allocate(handler, size):
+    handler.stdout.write(f"{len(bytearray(int(size)))} bytes allocated")
+
+
+def hang(handler):
+    time.sleep(60)
+
+
+@pytest.fixture(autouse=True)
+def reset(mocker):
+    RAN_IN.clear()
+    mocker.patch("django_setup_tools.ledger.Ledger.is_available", return_value=False)
+
+
+def test_validate_isolate():
+    assert validate_isolate(False) is None
+    assert validate_isolate(True) == {}
+    assert validate_isolate({"timeout": 5, "memory_limit": None}) == {"timeout": 5, "memory_limit": None}
+    for invalid in ["yes", {"cpus": 2}, {"timeout": 0}, {"memory_limit": "1G"}, {"timeout": True}]:
+        with pytest.raises(ImproperlyConfigured):
+            validate_isolate(invalid)
+
+
+def test_parse_spec():
+    assert parse_spec("check").isolate is None
+    assert parse_spec({"command": "check", "isolate": True}).isolate == {}
+    assert parse_spec({"command": "check", "isolate": {"timeout": 1}}).isolate == {"timeout": 1}
+    with pytest.raises(ImproperlyConfigured, match="Unknown isolate keys"):
+        parse_spec({"command": "check", "isolate": {"cpus": 2}})
+
+
+def test_streams_output_live():
+    received = []
+
+    result = run_isolated("tests.test_isolation.stream", (), lambda line: received.append((time.monotonic(), line)))
+
+    assert result.returncode == 0
+    assert result.peak_rss > 1024 * 1024
+    assert [line for _, line in received] == ["Executing function: tests.test_isolation.stream", "first", "second"]
+    # The first line arrived while the worker was still sleeping
+    assert received[2][0] - received[1][0] >= 0.4
+
+
+def test_failure():
+    lines = []
+
+    result = run_isolated("tests.test_isolation.fail", (), lines.append)
+
+    assert result.returncode == 1
+    assert "about to fail" in lines
+    assert result.error == "Error executing function 'tests.test_isolation.fail': boom"
+
+
+def test_timeout():
+    start = time.monotonic()
+
+    result = run_isolated("tests.test_isolation.hang", (), lambda line: None, timeout=0.5)
+
+    assert result.timed_out
+    assert result.returncode < 0
+    assert time.monotonic() - start < 30
+
+
+def test_memory_limit():
+    lines = []
+    limit = 1024**3
+
+    assert run_isolated("tests.test_isolation.allocate", ("1000000",), lines.append, memory_limit=limit).returncode == 0
+    result = run_isolated("tests.test_isolation.allocate", (str(2 * limit),), lines.append, memory_limit=limit)
+
+    assert result.returncode == 1
+    assert result.error == f"Out of memory (limit {limit} bytes)"
+
+
+def test_setup_command(settings, tmp_path):
+    settings.DJANGO_SETUP_TOOLS = {
+        "": {
+            "on_initial": [],
+            "always_run": [
+                {"command": "tests.test_isolation.record_pid", "args": ["a", "b"], "isolate": True},
+                "tests.test_isolation.record_pid",
+            ],
+        }
+    }
+    out = StringIO()
+    report = tmp_path / "report.json"
+
+    call_command("setup", "--report", str(report), stdout=out)
+
+    output = out.getvalue()
+    # Only the script run in-process touched this interpreter
+    assert RAN_IN == [os.getpid()]
+    assert "Executing in a worker process: tests.test_isolation.record_pid" in output
+    assert "args a b" in output
+    assert f"pid {os.getpid()} args a b" not in output
+    assert "peak RSS" in output
+    scripts = json.loads(report.read_text())["scripts"]
+    assert scripts[0]["peak_rss"] > 0
+    assert scripts[1]["peak_rss"] is None
+
+
+def test_setup_command_isolation_disabled_by_setting(settings):
+    # False keeps the default options, like an empty dictionary
+    settings.DJANGO_SETUP_TOOLS_ISOLATION = False
+    settings.DJANGO_SETUP_TOOLS = {
+        "": {"on_initial": [], "always_run": [{"command": "tests.test_isolation.record_pid", "isolate": True}]}
+    }
+    out = StringIO()
+
+    call_command("setup", stdout=out)
+
+    assert RAN_IN == []
+    assert "Executing in a worker process: tests.test_isolation.record_pid" in out.getvalue()
+
+
+def test_setup_command_errors(settings):
+    settings.DJANGO_SETUP_TOOLS_ISOLATION = {"timeout": 0.5}
+    settings.DJANGO_SETUP_TOOLS = {
+        "": {"on_initial": [], "always_run": [{"command": "tests.test_isolation.hang", "isolate": True}]}
+    }
+    with pytest.raises(CommandError, match=r"did not finish within 0.5s"):
+        call_command("setup", stdout=StringIO())
+
+    settings.DJANGO_SETUP_TOOLS_ISOLATION = {"timeout": -1}
+    with pytest.raises(CommandError, match="Invalid DJANGO_SETUP_TOOLS_ISOLATION"):
+        call_command("setup", stdout=StringIO())
+
+    settings.DJANGO_SETUP_TOOLS_ISOLATION = {}
+    settings.DJANGO_SETUP_TOOLS[""]["always_run"] = [{"command": "tests.test_isolation.fail", "isolate": True}]
+    with pytest.raises(CommandError, match="Isolated script 'tests.test_isolation.fail' failed: .*boom"):
+        call_command("setup", stdout=StringIO())
@@ -0,0 +1,195 @@
+"""Tests for the persistent script run ledger."""
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from django.utils import timezone
+
+from django_setup_tools.ledger import Ledger, args_hash
+from django_setup_tools.models import ScriptRun
+from django_setup_tools.specs import parse_spec
+
+CALLS = []
+
+
+def seed(handler, name):
+    CALLS.append(name)
+
+
+def crash(handler, *args):
+    raise RuntimeError("crashed")
+
+
+@pytest.fixture(autouse=True)
+def reset_calls(ledger_table):
+    CALLS.clear()
+
+
+@pytest.fixture
+def fresh_database(mocker):
+    """Pretend the migrations table does not exist yet."""
+    recorder = mocker.patch("django_setup_tools.management.commands.setup.MigrationRecorder")
+    recorder.return_value.has_table.return_value = False
+    return recorder
+
+
+class TestLedger:
+    """Test the Ledger helper."""
+
+    def test_args_hash_is_stable(self):
+        assert args_hash(("a", "b")) == args_hash(("a", "b"))
+        assert args_hash(("a", "b")) != args_hash(("b", "a"))
+
+    def test_start_and_finish(self):
+        ledger = Ledger(environment="production")
+        spec = parse_spec(("loaddata", "users.json"))
+
+        run = ledger.start("on_initial", spec)
+        assert ScriptRun.objects.get().status == ScriptRun.Status.RUNNING
+        ledger.finish(run)
+
+        run = ScriptRun.objects.get()
+        assert run.status == ScriptRun.Status.SUCCEEDED
+        assert run.arguments == ["users.json"]
+        assert run.environment == "production"
+        assert run.duration is not None
+        assert ledger.has_succeeded("on_initial", spec)
+        assert not ledger.has_succeeded("on_initial", parse_spec(("loaddata", "other.json")))
+
+    def test_failed_run_is_not_a_success(self):
+        ledger = Ledger()
+        spec = parse_spec("x.y")
+        ledger.finish(ledger.start("on_initial", spec), RuntimeError("nope"))
+
+        run = ScriptRun.objects.get()
+        assert run.status == ScriptRun.Status.FAILED
+        assert run.error == "nope"
+        assert not ledger.has_succeeded("on_initial", spec)
+
+    def test_records_are_buffered_until_table_exists(self):
+        ledger = Ledger()
+        with patch.object(Ledger, "is_available", return_value=False):
+            ledger.finish(ledger.start("on_initial", parse_spec("migrate")))
+            assert not ScriptRun.objects.exists()
+
+        ledger.flush()
+        assert ScriptRun.objects.get().command == "migrate"
+
+    def test_adopt(self):
+        ledger = Ledger()
+        ledger.adopt("on_initial", [parse_spec("migrate"), parse_spec("x.y")])
+        ledger.adopt("on_initial", [parse_spec("migrate")])
+
+        assert ScriptRun.objects.filter(status=ScriptRun.Status.ADOPTED).count() == 2
+
+    def test_estimated_duration(self):
+        ledger = Ledger()
+        spec = parse_spec("collectstatic")
+        assert ledger.estimated_duration("always_run", spec) is None
+
+        for duration, status in [(1.0, "succeeded"), (3.0, "succeeded"), (2.0, "succeeded"), (99.0, "failed")]:
+            ScriptRun.objects.create(
+                phase="always_run",
+                command="collectstatic",
+                arguments=[],
+                args_hash=args_hash(()),
+                status=status,
+                duration=duration,
+                started_at=timezone.now(),
+            )
+
+        assert ledger.estimated_duration("always_run", spec) == 2.0
+
+    def test_old_runs_are_pruned(self, settings):
+        settings.DJANGO_SETUP_TOOLS_LEDGER_RETENTION = 2
+        ledger = Ledger()
+        spec = parse_spec("x.y")
+        other = parse_spec(("x.y", "other"))
+        ledger.finish(ledger.start("on_initial", other))
+        ledger.finish(ledger.start("on_initial", spec), fingerprint="abc")
+        for _ in range(3):
+            ledger.finish(ledger.start("on_initial", spec), RuntimeError("nope"))
+        assert ledger._queryset("on_initial", spec).count() == 4
+
+        assert ledger.prune() == 1
+        runs = ledger._queryset("on_initial", spec)
+        # The last two runs, and the last success however old
+        assert list(runs.values_list("status", flat=True)) == ["failed", "failed", "succeeded"]
+        assert ledger.has_succeeded("on_initial", spec)
+        assert ledger.last_fingerprint("on_initial", spec) == "abc"
+        # Other scripts keep their own runs
+        assert ledger.has_succeeded("on_initial", other)
+
+        settings.DJANGO_SETUP_TOOLS_LEDGER_RETENTION = None
+        ledger = Ledger()
+        for _ in range(3):
+            ledger.finish(ledger.start("on_initial", spec), RuntimeError("nope"))
+        assert ledger.prune() == 0
+        assert ledger._queryset("on_initial", spec).count() == 6
+
+
+@override_settings(
+    DJANGO_SETUP_TOOLS={
+        "": {
+            "on_initial": [
+                ("tests.test_ledger.seed", "users"),
+                ("tests.test_ledger.seed", "groups"),
+            ],
+        }
+    }
+)
+def test_on_initial_scripts_run_once(fresh_database):
+    call_command("setup", stdout=StringIO())
+    call_command("setup", stdout=StringIO())
+
+    assert CALLS == ["users", "groups"]
+    assert ScriptRun.objects.filter(status=ScriptRun.Status.SUCCEEDED).count() == 2
+
+
+def test_partial_first_run_is_resumed(fresh_database, settings):
+    settings.DJANGO_SETUP_TOOLS = {
+        "": {
+            "on_initial": [
+                ("tests.test_ledger.seed", "users"),
+                "tests.test_ledger.crash",
+                ("tests.test_ledger.seed", "groups"),
+            ],
+        }
+    }
+    with pytest.raises(CommandError):
+        call_command("setup", stdout=StringIO())
+    assert CALLS == ["users"]
+
+    # Fix the broken script and run again: only the remaining scripts run
+    settings.DJANGO_SETUP_TOOLS[""]["on_initial"][1] = ("tests.test_ledger.seed", "fixed")
+    call_command("setup", stdout=StringIO())
+
+    assert CALLS == ["users", "fixed", "groups"]
+
+
+@override_settings(
+    DJANGO_SETUP_TOOLS={"": {"on_initial": [("tests.test_ledger.seed", "users")]}}
+)
+@patch("django_setup_tools.management.commands.setup.MigrationRecorder")
+def test_existing_database_adopts_on_initial(mock_migration_recorder):
+    """Databases initialized before the ledger existed never rerun on_initial."""
+    mock_migration_recorder.return_value.has_table.return_value = True
+
+    call_command("setup", stdout=StringIO())
+    mock_migration_recorder.return_value.has_table.return_value = False
+    call_command("setup", stdout=StringIO())
+
+    assert CALLS == []
+    assert ScriptRun.objects.get().status == ScriptRun.Status.ADOPTED
+
+
+@override_settings(DJANGO_SETUP_TOOLS={"": {"always_run": [("tests.test_ledger.seed", "cache")]}})
+def test_always_run_scripts_are_recorded():
+    call_command("setup", stdout=StringIO())
+    call_command("setup", stdout=StringIO())
+
+    assert CALLS == ["cache", "cache"]
+    assert ScriptRun.objects.filter(phase="always_run").count() == 2
@@ -0,0 +1,136 @@
+"""Tests for the cluster-wide setup lock."""
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import DatabaseError
+from django.utils import timezone
+
+from django_setup_tools.locking import DistributedLock
+from django_setup_tools.models import SetupLock
+
+CALLS = []
+
+
+def work(handler, name):
+    CALLS.append(name)
+
+
+@pytest.fixture(autouse=True)
+def reset_calls(lock_table, ledger_table):
+    CALLS.clear()
+
+
+@pytest.fixture
+def config(settings):
+    settings.DJANGO_SETUP_TOOLS = {
+        "": {
+            "always_run": [
+                ("tests.test_locking.work", "migrate"),
+                {"command": "tests.test_locking.work", "args": ["local"], "followers": True},
+            ]
+        }
+    }
+    return settings
+
+
+class TestRowLock:
+    """Test the lock-row fallback used on SQLite."""
+
+    def test_acquire_and_release(self):
+        leader = DistributedLock()
+        follower = DistributedLock()
+
+        assert leader.acquire()
+        assert not follower.acquire()
+        assert SetupLock.objects.get().owner == leader.owner
+
+        leader.release()
+        assert follower.acquire()
+
+    def test_expired_lock_is_taken_over(self):
+        now = timezone.now()
+        SetupLock.objects.create(
+            name="django_setup_tools", owner="dead", acquired_at=now, expires_at=now - timedelta(seconds=1)
+        )
+        assert DistributedLock().acquire()
+
+    def test_wait_until_released(self):
+        leader = DistributedLock()
+        leader.acquire()
+
+        assert not DistributedLock().wait_until_released(timeout=0.05, interval=0.01)
+        leader.release()
+        assert DistributedLock().wait_until_released(timeout=0.05, interval=0.01)
+        # Waiting must not leave the lock held
+        assert not SetupLock.objects.exists()
+
+
+class TestAdvisoryLock:
+    """Test the advisory lock queries issued on PostgreSQL and MySQL."""
+
+    def _connection(self, vendor, result):
+        connection = MagicMock(vendor=vendor)
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = (result,)
+        return connection, cursor
+
+    def test_postgresql(self):
+        connection, cursor = self._connection("postgresql", True)
+        with patch("django_setup_tools.locking.connections", {"default": connection}):
+            lock = DistributedLock()
+            assert lock.acquire()
+            lock.release()
+
+        cursor.execute.assert_any_call("SELECT pg_try_advisory_lock(%s)", [lock.key])
+        cursor.execute.assert_any_call("SELECT pg_advisory_unlock(%s)", [lock.key])
+
+    def test_mysql_lock_not_acquired(self):
+        connection, cursor = self._connection("mysql", 0)
+        with patch("django_setup_tools.locking.connections", {"default": connection}):
+            lock = DistributedLock()
+            assert not lock.acquire()
+            lock.release()
+
+        cursor.execute.assert_called_once_with("SELECT GET_LOCK(%s, 0)", ["django_setup_tools"])
+
+    def test_key_is_stable_signed_64_bit(self):
+        key = DistributedLock().key
+        assert key == DistributedLock().key
+        assert -(2**63) <= key < 2**63
+
+
+def test_leader_runs_everything(config):
+    call_command("setup", "--lock", stdout=StringIO())
+
+    assert CALLS == ["migrate", "local"]
+    assert not SetupLock.objects.exists()
+
+
+def test_follower_runs_only_follower_scripts(config):
+    with patch.object(DistributedLock, "acquire", return_value=False), patch.object(
+        DistributedLock, "wait_until_released", return_value=True
+    ):
+        call_command("setup", "--lock", stdout=StringIO())
+
+    assert CALLS == ["local"]
+
+
+def test_follower_times_out(config):
+    with patch.object(DistributedLock, "acquire", return_value=False):
+        with pytest.raises(CommandError, match="Timed out"):
+            call_command("setup", "--lock", "--lock-timeout", "0", stdout=StringIO())
+
+    assert CALLS == []
+
+
+def test_lock_unavailable_runs_without_it(config):
+    output = StringIO()
+    with patch.object(DistributedLock, "acquire", side_effect=DatabaseError("no such table")):
+        call_command("setup", "--lock", stdout=output)
+
+    assert CALLS == ["migrate", "local"]
+    assert "running without it" in output.getvalue()
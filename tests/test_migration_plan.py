@@ -0,0 +1,107 @@
+"""Tests for the migrate fast path and the shared migration plan."""
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+
+from django_setup_tools.management.commands.setup import Command
+from django_setup_tools.migration_plan import MigrationPlanCache, plain_migrate_alias
+
+
+@pytest.mark.parametrize(
+    "args, expected",
+    [
+        ((), "default"),
+        (("--no-input",), "default"),
+        (("--noinput", "-v0", "--skip-checks"), "default"),
+        (("--verbosity", "2", "--database=replica"), "replica"),
+        (("--database", "analytics", "--no-input"), "analytics"),
+        (("myapp",), None),
+        (("myapp", "0003"), None),
+        (("--fake",), None),
+        (("--run-syncdb",), None),
+        (("--database",), None),
+    ],
+)
+def test_plain_migrate_alias(args, expected):
+    assert plain_migrate_alias(args) == expected
+
+
+class TestMigrationPlanCache:
+    """Test the per-alias plan cache."""
+
+    @patch("django_setup_tools.migration_plan.MigrationExecutor")
+    def test_plan_is_computed_once(self, mock_executor):
+        mock_executor.return_value.migration_plan.return_value = []
+        mock_executor.return_value.loader.detect_conflicts.return_value = {}
+        cache = MigrationPlanCache()
+
+        assert cache.is_up_to_date()
+        assert cache.plan() == []
+        assert mock_executor.call_count == 1
+
+        cache.invalidate()
+        cache.plan()
+        assert mock_executor.call_count == 2
+
+    @patch("django_setup_tools.migration_plan.MigrationExecutor")
+    def test_conflicts_are_not_up_to_date(self, mock_executor):
+        mock_executor.return_value.migration_plan.return_value = []
+        mock_executor.return_value.loader.detect_conflicts.return_value = {"app": ["0002_a", "0002_b"]}
+
+        assert not MigrationPlanCache().is_up_to_date()
+
+    def test_pending_migrations(self):
+        # The test database is never migrated, so everything is pending
+        cache = MigrationPlanCache()
+        assert cache.plan()
+        assert not cache.is_up_to_date()
+
+
+@pytest.fixture
+def command():
+    return Command(stdout=StringIO())
+
+
+@patch("django_setup_tools.management.commands.setup.call_command")
+def test_migrate_is_skipped_when_up_to_date(mock_call_command, command):
+    with patch.object(MigrationPlanCache, "is_up_to_date", return_value=True):
+        command.run_all([("migrate", "--no-input"), ("migrate", "myapp", "zero")], phase="always_run")
+
+    # Only the invocation targeting a specific migration runs
+    mock_call_command.assert_called_once_with("migrate", "myapp", "zero")
+    assert "no unapplied migrations" in command.stdout._out.getvalue()
+
+
+@patch("django_setup_tools.management.commands.setup.call_command")
+def test_migrate_runs_when_plan_not_empty(mock_call_command, command):
+    with patch.object(MigrationPlanCache, "is_up_to_date", return_value=False):
+        command.run_all([("migrate", "--no-input")], phase="always_run")
+
+    mock_call_command.assert_called_once_with("migrate", "--no-input")
+
+
+@patch("django_setup_tools.management.commands.setup.call_command")
+def test_force_disables_fast_path(mock_call_command, command):
+    command.force = True
+    with patch.object(MigrationPlanCache, "is_up_to_date", return_value=True):
+        command.run_all(["migrate"], phase="always_run")
+
+    mock_call_command.assert_called_once_with("migrate")
+
+
+@patch("django_setup_tools.management.commands.setup.call_command")
+def test_plan_errors_fall_back_to_running_migrate(mock_call_command, command):
+    with patch.object(MigrationPlanCache, "plan", side_effect=Exception("database unavailable")):
+        command.run_all(["migrate"], phase="always_run")
+
+    mock_call_command.assert_called_once_with("migrate")
+
+
+@patch("django_setup_tools.management.commands.setup.call_command")
+def test_plan_is_shared_and_invalidated_by_migrate(mock_call_command, command):
+    with patch.object(MigrationPlanCache, "invalidate") as mock_invalidate:
+        assert command.migration_plan() is command.migration_plan()
+        command.run_all([("migrate", "app", "0001")], phase="always_run")
+
+    mock_invalidate.assert_called_once_with()
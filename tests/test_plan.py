@@ -0,0 +1,163 @@
+"""Tests for compiling and validating the setup plan."""
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from django.utils import timezone
+
+from django_setup_tools import plan as plan_module
+from django_setup_tools.plan import compile_phase, compile_plan, get_plan
+
+CALLS = []
+
+
+def step(handler, *args):
+    CALLS.append(args)
+
+
+async def async_step(handler, *args):
+    CALLS.append(args)
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    CALLS.clear()
+    plan_module._cache.clear()
+
+
+class TestCompilePhase:
+    """Test compilation of a single phase."""
+
+    def test_resolves_targets(self):
+        plan = compile_phase(["check", ("tests.test_plan.step", "a"), "tests.test_plan.async_step"])
+
+        assert plan.errors == []
+        assert plan.warnings == []
+        assert plan.targets == [None, step, async_step]
+        assert plan.dependencies == [set(), {0}, {1}]
+
+    def test_collects_every_problem(self):
+        plan = compile_phase(["nonexistent_command", "nonexistent.module.function", "tests.test_plan.missing"])
+
+        assert plan.warnings == ["Unknown management command 'nonexistent_command'"]
+        assert len(plan.errors) == 2
+        assert all(error.startswith("Could not import function") for error in plan.errors)
+
+    def test_invalid_specs(self):
+        plan = compile_phase([42, {"command": "check", "bogus": 1}])
+
+        assert len(plan.errors) == 2
+        assert plan.specs == []
+
+    def test_without_resolving(self):
+        plan = compile_phase(["nonexistent.module.function"], resolve=False)
+
+        assert plan.errors == []
+        assert plan.targets == []
+
+
+def test_compile_plan_combines_environments():
+    config = {
+        "": {"on_initial": ["migrate"], "always_run": ["check"]},
+        "production": {"always_run": ["tests.test_plan.step"]},
+    }
+    plan = compile_plan(config, "production")
+
+    assert [spec.command for spec in plan.phases["on_initial"].specs] == ["migrate"]
+    assert [spec.command for spec in plan.phases["always_run"].specs] == ["check", "tests.test_plan.step"]
+    assert len(plan) == 3
+
+
+def test_get_plan_is_cached_by_settings():
+    config = {"": {"always_run": ["check"]}}
+    with patch.object(plan_module, "compile_plan", wraps=compile_plan) as mock_compile:
+        first = get_plan(config, "")
+        assert get_plan(config, "") is first
+        assert get_plan({"": {"always_run": ["migrate"]}}, "") is not first
+        assert get_plan(config, "production") is not first
+
+    assert mock_compile.call_count == 3
+
+
+def test_get_plan_is_recompiled_when_databases_change(settings):
+    config = {"": {"always_run": [{"command": "check", "database": "analytics"}]}}
+    settings.DATABASES = {**settings.DATABASES, "analytics": {"ENGINE": "django.db.backends.sqlite3"}}
+    assert get_plan(config, "").errors == []
+
+    settings.DATABASES = {"default": settings.DATABASES["default"]}
+    assert get_plan(config, "").errors == ["always_run: Script 'check' targets unknown database 'analytics'"]
+
+
+@override_settings(DJANGO_SETUP_TOOLS={"": {"always_run": ["check", ("tests.test_plan.step", "a")]}})
+def test_check_valid_plan():
+    stdout = StringIO()
+    call_command("setup", "--check", stdout=stdout)
+
+    assert "✓ Setup plan is valid (0 on_initial, 2 always_run)" in stdout.getvalue()
+    assert CALLS == []
+
+
+@override_settings(DJANGO_SETUP_TOOLS={"": {"always_run": ["nonexistent_command", "tests.test_plan.missing"]}})
+def test_check_reports_every_problem():
+    stdout = StringIO()
+    with pytest.raises(CommandError, match="2 problem"):
+        call_command("setup", "--check", stdout=stdout)
+
+    output = stdout.getvalue()
+    assert "✗ always_run: Could not import function 'tests.test_plan.missing'" in output
+    assert "✗ always_run: Unknown management command 'nonexistent_command'" in output
+
+
+@override_settings(DJANGO_SETUP_TOOLS={"": {"always_run": [("tests.test_plan.step", "a"), "tests.test_plan.missing"]}})
+def test_bad_import_fails_before_anything_runs(ledger_table):
+    with pytest.raises(CommandError, match="Could not import function 'tests.test_plan.missing'"):
+        call_command("setup", stdout=StringIO())
+
+    assert CALLS == []
+
+
+@override_settings(
+    DJANGO_SETUP_TOOLS={
+        "": {
+            "on_initial": [("tests.test_plan.step", "seed")],
+            "always_run": [
+                {"command": "tests.test_plan.step", "args": ["slow"], "name": "slow", "after": []},
+                {"command": "tests.test_plan.step", "args": ["fast"], "name": "fast", "after": []},
+                {"command": "tests.test_plan.step", "args": ["new"], "name": "new", "after": ["slow", "fast"]},
+            ],
+        }
+    }
+)
+def test_dry_run_plan(ledger_table, mocker):
+    recorder = mocker.patch("django_setup_tools.management.commands.setup.MigrationRecorder")
+    recorder.return_value.has_table.return_value = True
+    from django_setup_tools.ledger import args_hash
+    from django_setup_tools.models import ScriptRun
+
+    for args, duration in [(("slow",), 4.0), (("fast",), 1.0)]:
+        ScriptRun.objects.create(
+            phase="always_run",
+            command="tests.test_plan.step",
+            arguments=list(args),
+            args_hash=args_hash(args),
+            status=ScriptRun.Status.SUCCEEDED,
+            duration=duration,
+            started_at=timezone.now(),
+        )
+
+    stdout = StringIO()
+    call_command("setup", "--plan", stdout=stdout)
+    output = stdout.getvalue()
+
+    assert CALLS == []
+    assert "on_initial (database already initialized):" in output
+    assert "skip  database already initialized" in output
+    assert "run   ~4.00s" in output
+    assert "run   ~1.00s" in output
+    assert "run   no history" in output
+    assert "Estimated duration: 5.00s sequential, 4.00s critical path (1 script(s) without history" in output
+    # Nothing was recorded or adopted
+    assert ScriptRun.objects.count() == 2
@@ -0,0 +1,63 @@
+"""Tests for the probe_databases script."""
+from unittest.mock import Mock, patch
+
+import pytest
+from django.core.management.base import CommandError
+from django.test import override_settings
+
+from django_setup_tools.scripts import probe_databases
+from django_setup_tools.scripts.database import DatabaseProbe
+from django_setup_tools.stats import percentile
+
+
+@pytest.fixture
+def handler():
+    handler = Mock()
+    handler.style.SUCCESS = lambda message: message
+    handler.style.ERROR = lambda message: message
+    return handler
+
+
+def output(handler):
+    return [call.args[0] for call in handler.stdout.write.call_args_list]
+
+
+def test_percentile():
+    values = [float(n) for n in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 99) == 3.0
+    with pytest.raises(ValueError):
+        percentile([], 50)
+
+
+@override_settings(DJANGO_SETUP_TOOLS_DB_PROBE={"round_trips": 5, "thresholds": {"p99": 10.0}})
+def test_probe_databases(handler):
+    probe_databases(handler)
+
+    line = output(handler)[-1]
+    assert line.startswith("✓ default: connect ")
+    assert "p50" in line and "p95" in line and "p99" in line
+    assert line.endswith("(5 round trips)")
+
+
+def test_probe_databases_thresholds(handler):
+    slow = DatabaseProbe("default", connect=0.2, round_trips=[0.01] * 19 + [0.3])
+    config = {"thresholds": {"p99": 0.1}, "aliases": {"default": {"connect": 0.1}}}
+
+    with (
+        override_settings(DJANGO_SETUP_TOOLS_DB_PROBE=config),
+        patch("django_setup_tools.scripts.database._probe_database", return_value=slow),
+        pytest.raises(CommandError, match="default: connect 200.0ms exceeds 100.0ms; p99 300.0ms exceeds 100.0ms"),
+    ):
+        probe_databases(handler)
+
+    assert output(handler)[-1].startswith("✗ default: connect 200.0ms, p50 10.0ms")
+
+
+def test_probe_databases_unknown_alias(handler):
+    with pytest.raises(CommandError, match="Database probe failed: missing:"):
+        probe_databases(handler, "missing")
+
+    assert output(handler)[-1].startswith("✗ missing:")
@@ -0,0 +1,118 @@
+"""Tests for waiting on databases before running the setup scripts."""
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError
+
+from django_setup_tools.readiness import wait_for_database
+
+
+class FakeClock:
+    """Monotonic clock advanced only by sleeping."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    clock = FakeClock()
+    with patch("django_setup_tools.readiness.time", clock):
+        yield clock
+
+
+def database(failures):
+    """Return a fake connection whose first ``failures`` queries fail."""
+    db = MagicMock()
+    db.cursor.side_effect = [OperationalError("connection refused")] * failures + [MagicMock()]
+    return db
+
+
+def test_ready_immediately(clock):
+    db = database(0)
+    with patch("django_setup_tools.readiness.connections", {"default": db}):
+        result = wait_for_database("default", timeout=5)
+
+    assert (result.ready, result.attempts, result.waited) == (True, 1, 0.0)
+    assert clock.sleeps == []
+    db.close.assert_not_called()
+
+
+def test_exponential_backoff(clock):
+    db = database(6)
+    with patch("django_setup_tools.readiness.connections", {"default": db}):
+        result = wait_for_database("default", timeout=5, initial=0.1, maximum=1.0)
+
+    assert result.ready
+    assert result.attempts == 7
+    assert clock.sleeps == [0.1, 0.2, 0.4, 0.8, 1.0, 1.0]
+    # Every failed attempt drops its connection so the next one reconnects
+    assert db.close.call_count == 6
+
+
+def test_timeout(clock):
+    db = database(100)
+    with patch("django_setup_tools.readiness.connections", {"default": db}):
+        result = wait_for_database("default", timeout=1, initial=0.4)
+
+    assert not result.ready
+    assert result.error == "connection refused"
+    # The last sleep is cut short so the wait never overruns the timeout
+    assert clock.sleeps == pytest.approx([0.4, 0.6])
+    assert result.waited == pytest.approx(1.0)
+
+
+def test_other_errors_are_not_retried(clock):
+    db = MagicMock()
+    db.cursor.side_effect = ImportError("no driver")
+    with patch("django_setup_tools.readiness.connections", {"default": db}), pytest.raises(ImportError):
+        wait_for_database("default", timeout=5)
+
+
+class TestSetupCommand:
+    """Test the readiness phase of the setup command."""
+
+    @pytest.fixture(autouse=True)
+    def config(self, settings):
+        settings.DJANGO_SETUP_TOOLS = {"": {"always_run": ["tests.test_readiness.database"]}}
+
+    def test_not_ready(self, clock):
+        with (
+            patch("django_setup_tools.readiness.connections", {"default": database(100)}),
+            patch("django_setup_tools.management.commands.setup.Command.run_plan") as run_plan,
+            pytest.raises(CommandError, match="Database 'default' was not ready after 2.0s"),
+        ):
+            call_command("setup", "--wait-for-db", "2", stdout=StringIO())
+        run_plan.assert_not_called()
+
+    def test_waits_before_running(self, clock):
+        stdout = StringIO()
+        with (
+            patch("django_setup_tools.readiness.connections", {"default": database(2)}),
+            patch("django_setup_tools.management.commands.setup.Command.run_plan") as run_plan,
+        ):
+            call_command("setup", stdout=stdout)
+
+        run_plan.assert_called_once()
+        assert "✓ Database 'default' ready after 0.2s (3 attempts)" in stdout.getvalue()
+
+    @pytest.mark.parametrize("value", [0, None])
+    def test_disabled(self, settings, value):
+        settings.DJANGO_SETUP_TOOLS_DB_WAIT = value
+        with (
+            patch("django_setup_tools.management.commands.setup.wait_for_database") as wait,
+            patch("django_setup_tools.management.commands.setup.Command.run_plan"),
+        ):
+            call_command("setup", stdout=StringIO())
+        wait.assert_not_called()
@@ -0,0 +1,211 @@
+"""Tests for the setup script registry."""
+import json
+import os
+from importlib.metadata import EntryPoint
+from io import StringIO
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+
+from django_setup_tools import registry
+from django_setup_tools.plan import compile_phase
+from django_setup_tools.registry import RegisteredScript, get_index, lookup, setup_script, tagged
+
+CALLS = []
+
+
+@setup_script
+def warm(handler, *args):
+    CALLS.append(("warm", *args))
+
+
+@setup_script(name="rebuild", tags=["search", "slow"], inputs={"settings": "SEARCH_URL"}, concurrent_safe=True)
+async def rebuild_search_index(handler, *args):
+    CALLS.append(("rebuild", *args))
+
+
+def plugin_script(handler, *args):
+    CALLS.append(("plugin", *args))
+
+
+@pytest.fixture(autouse=True)
+def index(settings, tmp_path, mocker):
+    settings.DJANGO_SETUP_TOOLS_SCRIPT_INDEX_DIR = str(tmp_path)
+    mocker.patch.object(registry, "_registered", dict(registry._registered))
+    mocker.patch.object(registry, "entry_points", return_value=[])
+    CALLS.clear()
+    get_index.cache_clear()
+    yield
+    get_index.cache_clear()
+
+
+def test_decorator_registers_scripts():
+    assert registry._registered["warm"] == RegisteredScript("warm", "tests.test_registry.warm")
+    assert registry._registered["rebuild"] == RegisteredScript(
+        "rebuild",
+        "tests.test_registry.rebuild_search_index",
+        tags=("search", "slow"),
+        inputs={"settings": ["SEARCH_URL"]},
+        concurrent=True,
+    )
+    # Registering the same function again is harmless
+    assert setup_script(warm) is warm
+
+
+def test_duplicate_name():
+    with pytest.raises(ImproperlyConfigured, match="'warm' is used by both"):
+        setup_script(name="warm")(plugin_script)
+
+
+def test_discovery_sources(mocker):
+    autodiscover = mocker.patch.object(
+        registry, "autodiscover_modules", side_effect=lambda module: setup_script(name="from_app")(plugin_script)
+    )
+    registry.entry_points.return_value = [
+        EntryPoint("plugin", "tests.test_registry:plugin_script", registry.ENTRY_POINT_GROUP),
+        EntryPoint("module", "tests.test_registry", registry.ENTRY_POINT_GROUP),
+    ]
+
+    scripts = registry.discover()
+
+    autodiscover.assert_called_once_with("setup_scripts")
+    registry.entry_points.assert_called_once_with(group="django_setup_tools.scripts")
+    assert scripts["sync_site_id"].path == "django_setup_tools.scripts.sync_site_id"
+    assert scripts["from_app"].path == "tests.test_registry.plugin_script"
+    # The entry point names a decorated script, which keeps its registered name
+    assert "plugin" not in scripts
+    assert scripts["warm"].path == "tests.test_registry.warm"
+
+
+def test_entry_point_script_without_decorator(mocker):
+    registry.entry_points.return_value = [
+        EntryPoint("plugin", "tests.test_registry:plugin_script", registry.ENTRY_POINT_GROUP),
+    ]
+
+    assert registry.discover()["plugin"] == RegisteredScript("plugin", "tests.test_registry.plugin_script")
+
+
+def test_index_is_cached_on_disk(tmp_path, mocker):
+    # The scripts of this module are trusted as those of a plugin
+    registry.entry_points.return_value = [EntryPoint("tests", "tests.test_registry", registry.ENTRY_POINT_GROUP)]
+    discover = mocker.spy(registry, "discover")
+
+    assert lookup("rebuild").tags == ("search", "slow")
+    (cached,) = tmp_path.iterdir()
+    assert json.loads(cached.read_text())["rebuild"]["inputs"] == {"settings": ["SEARCH_URL"]}
+
+    get_index.cache_clear()
+    assert get_index()["rebuild"] == registry._registered["rebuild"]
+    assert tagged("search") == [registry._registered["rebuild"]]
+    assert discover.call_count == 1
+
+    # Another key, such as after upgrading a package, discovers again
+    mocker.patch.object(registry, "index_key", return_value="0" * 64)
+    get_index.cache_clear()
+    get_index()
+    assert discover.call_count == 2
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_corrupt_or_disabled_cache(settings, tmp_path, mocker):
+    discover = mocker.spy(registry, "discover")
+    (tmp_path / os.path.basename(registry.index_path(registry.index_key()))).write_text("{not json")
+
+    assert lookup("warm") is not None
+    assert discover.call_count == 1
+
+    settings.DJANGO_SETUP_TOOLS_SCRIPT_INDEX_DIR = None
+    get_index.cache_clear()
+    assert lookup("missing") is None
+    assert discover.call_count == 2
+
+
+def test_default_index_dir(settings, tmp_path, monkeypatch):
+    del settings.DJANGO_SETUP_TOOLS_SCRIPT_INDEX_DIR
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+    assert lookup("warm") is not None
+    directory = tmp_path / "cache" / "django_setup_tools"
+    assert directory.stat().st_mode & 0o777 == 0o700
+    (cached,) = directory.iterdir()
+    assert cached.stat().st_mode & 0o777 == 0o600
+
+
+def test_untrusted_index_is_ignored(tmp_path, mocker):
+    path = registry.index_path(registry.index_key())
+    planted = {"warm": {"name": "warm", "path": "os.system", "tags": [], "inputs": None, "concurrent": False}}
+    with open(path, "w") as f:
+        json.dump(planted, f)
+    os.chmod(path, 0o600)
+    discover = mocker.spy(registry, "discover")
+
+    assert lookup("warm").path == "tests.test_registry.warm"
+    assert discover.call_count == 1
+
+    # Nor is an index other users can write to, even of trusted scripts
+    planted["warm"]["path"] = "django_setup_tools.scripts.sync_site_id"
+    with open(path, "w") as f:
+        json.dump(planted, f)
+    os.chmod(path, 0o666)
+    get_index.cache_clear()
+    assert lookup("warm").path == "tests.test_registry.warm"
+    assert discover.call_count == 2
+
+
+def test_index_key_tracks_app_modules(tmp_path, mocker):
+    key = registry.index_key()
+    assert registry.index_key() == key
+
+    module = tmp_path / "setup_scripts.py"
+    module.write_text("")
+    spec = mocker.Mock(origin=str(module))
+    mocker.patch.object(registry.importlib.util, "find_spec", return_value=spec)
+    with_module = registry.index_key()
+    assert with_module != key
+
+    os.utime(module, (0, 0))
+    assert registry.index_key() != with_module
+
+
+class TestShortNames:
+    """Test referring to registered scripts by name in the configuration."""
+
+    def test_compile(self):
+        plan = compile_phase(["warm", {"command": "rebuild", "after": ["warm"]}, "check"])
+
+        assert plan.errors == []
+        assert plan.warnings == []
+        assert [spec.command for spec in plan.specs] == [
+            "tests.test_registry.warm",
+            "tests.test_registry.rebuild_search_index",
+            "check",
+        ]
+        assert [spec.name for spec in plan.specs] == ["warm", "rebuild", "check"]
+        assert plan.targets == [warm, rebuild_search_index, None]
+        assert plan.dependencies == [set(), {0}, {1}]
+        assert plan.specs[1].inputs == {"settings": ["SEARCH_URL"]}
+        assert plan.specs[1].concurrent is True
+
+    def test_declared_options_take_precedence(self):
+        (spec,) = compile_phase([{"command": "rebuild", "inputs": {}, "concurrent": False}], resolve=False).specs
+
+        assert spec.command == "tests.test_registry.rebuild_search_index"
+        assert spec.inputs == {}
+        assert spec.concurrent is False
+
+    def test_management_commands_take_precedence(self):
+        setup_script(name="check")(plugin_script)
+
+        assert compile_phase(["check"]).specs[0].command == "check"
+
+    def test_unknown_name(self):
+        assert compile_phase(["nonexistent"]).warnings == ["Unknown management command 'nonexistent'"]
+
+    def test_run(self, settings, ledger_table, mocker):
+        mocker.patch("django_setup_tools.ledger.Ledger.is_available", return_value=False)
+        settings.DJANGO_SETUP_TOOLS = {"": {"on_initial": [], "always_run": [("warm", "a"), ("rebuild", "b")]}}
+
+        call_command("setup", stdout=StringIO())
+
+        assert CALLS == [("warm", "a"), ("rebuild", "b")]
@@ -1,82 +1,104 @@
 """Tests for django_setup_tools.scripts module."""
+import os
+import subprocess
+import sys
 from unittest.mock import Mock, patch
 
 import pytest
+from django.contrib.sites.models import SITE_CACHE, Site
 from django.core.management.base import BaseCommand
+from django.db import connection
 from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 
+from django_setup_tools import scripts
 from django_setup_tools.scripts import sync_site_id
 
 
+@pytest.mark.usefixtures("site_table")
 class TestSyncSiteId:
     """Test cases for sync_site_id function."""
 
+    def setup_method(self):
+        self.mock_handler = Mock(spec=BaseCommand)
+        self.mock_handler.stdout = Mock()
+        self.mock_handler.style = Mock()
+        self.mock_handler.style.HTTP_INFO.return_value = "info_style"
+
     @override_settings(
-        SITE_ID=1,
+        SITE_ID=7,
         SITE_DOMAIN="example.com",
         SITE_NAME="Example Site"
     )
-    @patch('django_setup_tools.scripts.Site.objects.update_or_create')
-    def test_sync_site_id_creates_new_site(self, mock_update_or_create):
+    def test_sync_site_id_creates_new_site(self):
         """Test that sync_site_id creates a new site when one doesn't exist."""
-        # Arrange
-        mock_site = Mock()
-        mock_site.name = "Example Site"
-        mock_site.domain = "example.com"
-        mock_update_or_create.return_value = (mock_site, True)  # created=True
-
-        mock_handler = Mock(spec=BaseCommand)
-        mock_handler.stdout = Mock()
-        mock_handler.style = Mock()
-        mock_handler.style.HTTP_INFO.return_value = "info_style"
-
-        # Act
-        sync_site_id(mock_handler)
-
-        # Assert
-        mock_update_or_create.assert_called_once_with(
-            id=1,
-            defaults={
-                "domain": "example.com",
-                "name": "Example Site"
-            }
-        )
-        mock_handler.stdout.write.assert_any_call("info_style")
-        mock_handler.stdout.write.assert_any_call("Created site: Example Site")
-        mock_handler.stdout.write.assert_any_call("Domain: example.com")
+        sync_site_id(self.mock_handler)
+
+        site = Site.objects.get(id=7)
+        assert (site.domain, site.name) == ("example.com", "Example Site")
+        self.mock_handler.stdout.write.assert_any_call("info_style")
+        self.mock_handler.stdout.write.assert_any_call("Created site: Example Site")
+        self.mock_handler.stdout.write.assert_any_call("Domain: example.com")
 
     @override_settings(
         SITE_ID=2,
         SITE_DOMAIN="updated.com",
         SITE_NAME="Updated Site"
     )
-    @patch('django_setup_tools.scripts.Site.objects.update_or_create')
-    def test_sync_site_id_updates_existing_site(self, mock_update_or_create):
+    def test_sync_site_id_updates_existing_site(self):
         """Test that sync_site_id updates an existing site."""
-        # Arrange
-        mock_site = Mock()
-        mock_site.name = "Updated Site"
-        mock_site.domain = "updated.com"
-        mock_update_or_create.return_value = (mock_site, False)  # created=False
-
-        mock_handler = Mock(spec=BaseCommand)
-        mock_handler.stdout = Mock()
-        mock_handler.style = Mock()
-        mock_handler.style.HTTP_INFO.return_value = "info_style"
-
-        # Act
-        sync_site_id(mock_handler)
-
-        # Assert
-        mock_update_or_create.assert_called_once_with(
-            id=2,
-            defaults={
-                "domain": "updated.com",
-                "name": "Updated Site"
-            }
-        )
-        mock_handler.stdout.write.assert_any_call("Updated site: Updated Site")
-        mock_handler.stdout.write.assert_any_call("Domain: updated.com")
+        Site.objects.create(id=2, domain="old.com", name="Old Site")
+        SITE_CACHE[2] = SITE_CACHE["old.com"] = Site(id=2, domain="old.com", name="Old Site")
+
+        sync_site_id(self.mock_handler)
+
+        site = Site.objects.get(id=2)
+        assert (site.domain, site.name) == ("updated.com", "Updated Site")
+        assert 2 not in SITE_CACHE
+        assert "old.com" not in SITE_CACHE
+        self.mock_handler.stdout.write.assert_any_call("Updated site: Updated Site")
+        self.mock_handler.stdout.write.assert_any_call("Domain: updated.com")
+
+    @override_settings(
+        SITE_ID=3,
+        SITE_DOMAIN="same.com",
+        SITE_NAME="Same Site"
+    )
+    def test_sync_site_id_unchanged_site_is_not_written(self):
+        """Test that an up to date site costs a single read and keeps its cache entry."""
+        Site.objects.create(id=3, domain="same.com", name="Same Site")
+        SITE_CACHE[3] = cached = Site.objects.get(id=3)
+
+        with CaptureQueriesContext(connection) as queries:
+            sync_site_id(self.mock_handler)
+
+        assert len(queries) == 1
+        assert queries[0]["sql"].startswith("SELECT")
+        assert SITE_CACHE.pop(3) is cached
+        self.mock_handler.stdout.write.assert_any_call("1 site(s) already up to date")
+
+    @override_settings(
+        DJANGO_SETUP_TOOLS_SITES={
+            11: {"domain": "a.example.com", "name": "A"},
+            12: {"domain": "b.example.com", "name": "B"},
+            "13": {"domain": "c.example.com", "name": "C"},
+        }
+    )
+    def test_sync_site_id_many_sites(self):
+        """Test that several sites are synchronized with one read and bulk writes."""
+        Site.objects.create(id=11, domain="a.example.com", name="A")
+        Site.objects.create(id=12, domain="old.example.com", name="B")
+
+        with CaptureQueriesContext(connection) as queries:
+            sync_site_id(self.mock_handler)
+
+        sites = {site.id: (site.domain, site.name) for site in Site.objects.filter(id__in=[11, 12, 13])}
+        assert sites == {11: ("a.example.com", "A"), 12: ("b.example.com", "B"), 13: ("c.example.com", "C")}
+        selects = [query for query in queries if query["sql"].startswith("SELECT")]
+        assert len(selects) == 1
+        self.mock_handler.stdout.write.assert_any_call("Created site: C")
+        self.mock_handler.stdout.write.assert_any_call("Updated site: B")
+        self.mock_handler.stdout.write.assert_any_call("1 site(s) already up to date")
 
     @override_settings(
         SITE_ID=1,
@@ -85,41 +107,78 @@ class TestSyncSiteId:
     )
     def test_sync_site_id_with_args(self):
         """Test that sync_site_id accepts additional arguments without error."""
-        mock_handler = Mock(spec=BaseCommand)
-        mock_handler.stdout = Mock()
-        mock_handler.style = Mock()
-        mock_handler.style.HTTP_INFO.return_value = "info_style"
+        # This should not raise an error
+        sync_site_id(self.mock_handler, "extra", "args")
 
-        with patch('django_setup_tools.scripts.Site.objects.update_or_create') as mock_update_or_create:
-            mock_site = Mock()
-            mock_site.name = "Test Site"
-            mock_site.domain = "test.com"
-            mock_update_or_create.return_value = (mock_site, True)
-
-            # This should not raise an error
-            sync_site_id(mock_handler, "extra", "args")
-
-            # Function should still work normally
-            assert mock_update_or_create.called
+        # Function should still work normally
+        assert Site.objects.get(id=1).domain == "test.com"
 
     @override_settings(
         SITE_ID=1,
         SITE_DOMAIN="test.com",
         SITE_NAME="Test Site"
     )
-    @patch('django_setup_tools.scripts.Site.objects.update_or_create')
-    def test_sync_site_id_database_error(self, mock_update_or_create):
+    @patch('django_setup_tools.scripts.sites.Site.objects.in_bulk')
+    def test_sync_site_id_database_error(self, mock_in_bulk):
         """Test that sync_site_id handles database errors gracefully."""
         # Arrange
-        mock_update_or_create.side_effect = Exception("Database error")
-        mock_handler = Mock(spec=BaseCommand)
-        mock_handler.stdout = Mock()
-        mock_handler.style = Mock()
-        mock_handler.style.HTTP_INFO.return_value = "info_style"
+        mock_in_bulk.side_effect = Exception("Database error")
 
         # Act & Assert
         with pytest.raises(Exception, match="Database error"):
-            sync_site_id(mock_handler)
+            sync_site_id(self.mock_handler)
 
         # Verify the info message was still displayed
-        mock_handler.stdout.write.assert_called_with("info_style")
+        self.mock_handler.stdout.write.assert_called_with("info_style")
+
+
+LAZY_IMPORT_CHECK = """
+import sys
+
+import django
+from django.conf import settings
+
+settings.configure(
+    INSTALLED_APPS=["django_setup_tools"],
+    DATABASES={"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}},
+)
+django.setup()
+
+from django.utils.module_loading import import_string
+
+import_string("django_setup_tools.scripts.check_database_connection")
+import_string("django_setup_tools.scripts.probe_databases")
+loaded = [
+    module
+    for module in [
+        "django.contrib.sites.models",
+        "django_setup_tools.cache",
+        "django_setup_tools.instrumentation",
+        "django_setup_tools.staticfiles",
+        "django_setup_tools.scripts.sites",
+    ]
+    if module in sys.modules
+]
+print(",".join(loaded))
+"""
+
+
+def test_scripts_are_imported_lazily():
+    """Test that resolving one script does not import what the other scripts need."""
+    result = subprocess.run(
+        [sys.executable, "-c", LAZY_IMPORT_CHECK],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(path for path in sys.path if path)},
+        check=True,
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_script_registry():
+    """Test that every built-in resolves through the package and unknown names fail."""
+    for name in scripts.BUILTINS:
+        assert callable(getattr(scripts, name))
+    assert set(scripts.BUILTINS) <= set(dir(scripts))
+    with pytest.raises(AttributeError, match="has no attribute 'missing'"):
+        scripts.missing  # noqa: B018
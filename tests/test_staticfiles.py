@@ -0,0 +1,291 @@
+"""Tests for the static files inventory and the --verify mode of check_static_files_config."""
+import gzip
+import json
+import os
+from unittest.mock import Mock
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+
+from django_setup_tools import staticfiles
+from django_setup_tools.scripts import check_static_files_config, collect_static_files, compress_static_files
+from django_setup_tools.staticfiles import build_inventory, compress_file, missing_manifest_entries, walk
+
+
+def make_files(root, paths):
+    for path, content in paths.items():
+        file = root / path
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.write_text(content)
+
+
+@pytest.fixture
+def static(settings, tmp_path):
+    project = tmp_path / "project"
+    vendor = tmp_path / "vendor"
+    make_files(project, {"css/base.css": "body{}", "js/app.js": "1;", ".hidden": "x", "js/app.js~": "old"})
+    make_files(vendor, {"lib.js": "22", "css/base.css": "nope"})
+    settings.STATICFILES_DIRS = [str(project), ("css", str(vendor / "css")), ("", str(vendor))]
+    settings.STATICFILES_FINDERS = ["django.contrib.staticfiles.finders.FileSystemFinder"]
+    settings.STATIC_URL = "/static/"
+    settings.STATIC_ROOT = str(tmp_path / "collected")
+    settings.DJANGO_SETUP_TOOLS_COLLECT_MANIFEST_DIR = str(tmp_path / "cache")
+    return tmp_path
+
+
+@pytest.fixture
+def handler():
+    handler = Mock()
+    handler.style.SUCCESS = lambda message: message
+    handler.style.WARNING = lambda message: message
+    handler.style.ERROR = lambda message: message
+    handler.style.HTTP_INFO = lambda message: message
+    return handler
+
+
+def output(handler):
+    return [call.args[0] for call in handler.stdout.write.call_args_list]
+
+
+def test_walk(tmp_path):
+    make_files(tmp_path, {"a.txt": "1", "b/c.txt": "22", "b/d/e.txt": "333", "b/.git/x": "4"})
+
+    files = walk(str(tmp_path), [".*"], workers=2)
+    assert {path: stat.st_size for path, stat in files.items()} == {"a.txt": 1, "b/c.txt": 2, "b/d/e.txt": 3}
+    assert files["b/c.txt"].st_mtime == (tmp_path / "b" / "c.txt").stat().st_mtime
+    assert walk(str(tmp_path / "missing")) == {}
+
+
+def test_build_inventory(static):
+    inventory = build_inventory()
+
+    assert sorted(inventory.files) == ["css/base.css", "js/app.js", "lib.js"]
+    assert inventory.size == 6 + 2 + 2
+    assert inventory.locations == 3
+    # Both vendor locations provide css/base.css, which the project one hides
+    assert [(winner.source, hidden.source) for winner, hidden in inventory.shadowed] == [
+        (str(static / "project"), str(static / "vendor" / "css")),
+        (str(static / "project"), str(static / "vendor")),
+    ]
+
+
+def test_missing_manifest_entries(static, settings):
+    assert missing_manifest_entries() is None
+
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"},
+    }
+    collected = static / "collected"
+    make_files(collected, {"css/base.1234.css": "body{}"})
+    manifest = {"paths": {"css/base.css": "css/base.1234.css", "js/app.js": "js/app.5678.js"}, "version": "1.1"}
+    (collected / "staticfiles.json").write_text(json.dumps(manifest))
+
+    assert missing_manifest_entries() == ["js/app.5678.js"]
+
+
+def test_check_static_files_config_corrupt_manifest(static, settings, handler):
+    settings.STORAGES = {
+        **settings.STORAGES,
+        "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"},
+    }
+    collected = static / "collected"
+    collected.mkdir(exist_ok=True)
+    (collected / "staticfiles.json").write_text("{not json")
+
+    check_static_files_config(handler, "--verify")
+
+    lines = output(handler)
+    assert "✗ Static files configuration issues:" in lines
+    assert any(line.startswith("  - Could not read the staticfiles manifest: ") for line in lines)
+
+
+def test_check_static_files_config_verify(static, handler):
+    check_static_files_config(handler, "--verify")
+
+    lines = output(handler)
+    assert any(line.startswith("✓ 3 static file(s), 0.0 MiB in 3 location(s)") for line in lines)
+    assert "⚠ 2 path(s) shadowed by an earlier location:" in lines
+    assert f"  - css/base.css: {static / 'project'} shadows {static / 'vendor'}" in lines
+
+
+def test_check_static_files_config_without_verify(static, handler, mocker):
+    inventory = mocker.patch("django_setup_tools.scripts.static.build_inventory")
+
+    check_static_files_config(handler)
+
+    inventory.assert_not_called()
+
+
+@pytest.fixture
+def fake_brotli(monkeypatch):
+    brotli = Mock()
+    brotli.compress = lambda data: b"br:" + data
+    monkeypatch.setattr(staticfiles, "brotli", brotli)
+    return brotli
+
+
+def test_compress_file(tmp_path, fake_brotli):
+    source = tmp_path / "app.css"
+    source.write_text("body { color: red; }" * 20)
+
+    assert compress_file(str(source), ["gz", "br"]) == ["gz", "br"]
+    assert gzip.decompress((tmp_path / "app.css.gz").read_bytes()) == source.read_bytes()
+    assert (tmp_path / "app.css.br").read_bytes() == b"br:" + source.read_bytes()
+
+    # Up to date siblings are left alone, stale ones are rewritten
+    assert compress_file(str(source), ["gz", "br"]) == []
+    stat = source.stat()
+    os.utime(tmp_path / "app.css.br", (stat.st_atime, stat.st_mtime - 10))
+    assert compress_file(str(source), ["gz", "br"]) == ["br"]
+
+
+class TestCompressStaticFiles:
+    """Test cases for the compress_static_files script."""
+
+    @pytest.fixture
+    def collected(self, settings, tmp_path):
+        settings.STATIC_ROOT = str(tmp_path)
+        make_files(
+            tmp_path,
+            {
+                "css/app.css": "a" * 500,
+                "js/app.js": "b" * 500,
+                "js/tiny.js": "c",
+                "img/logo.png": "d" * 500,
+            },
+        )
+        return tmp_path
+
+    def test_gzip_only_without_brotli(self, collected, handler, monkeypatch):
+        monkeypatch.setattr(staticfiles, "brotli", None)
+
+        compress_static_files(handler)
+
+        assert sorted(path.name for path in collected.rglob("*.gz")) == ["app.css.gz", "app.js.gz"]
+        assert not list(collected.rglob("*.br"))
+        lines = output(handler)
+        assert "⚠ brotli is not installed; writing gzip files only" in lines
+        assert lines[-1].startswith("✓ Compressed 2 file(s) to gz in ")
+
+        compress_static_files(handler)
+        assert output(handler)[-1].endswith("(2 already up to date)")
+
+    def test_filters_and_process_pool(self, collected, handler, settings, monkeypatch, fake_brotli):
+        settings.DJANGO_SETUP_TOOLS_COMPRESSION = {"extensions": [".CSS", ".png"], "min_size": 1, "workers": 2}
+        monkeypatch.setattr(staticfiles, "COMPRESSION_POOL_THRESHOLD", 0)
+
+        compress_static_files(handler, "gz")
+
+        assert sorted(path.name for path in collected.rglob("*.gz")) == ["app.css.gz", "logo.png.gz"]
+        assert output(handler)[-1].startswith("✓ Compressed 2 file(s) to gz in ")
+
+    def test_unavailable_format(self, collected, handler, monkeypatch):
+        monkeypatch.setattr(staticfiles, "brotli", None)
+
+        compress_static_files(handler, "br")
+
+        assert output(handler)[-1] == "✗ Unavailable compression format(s): br"
+        assert not list(collected.rglob("*.br"))
+
+    def test_static_root_not_configured(self, handler, settings):
+        settings.STATIC_ROOT = None
+
+        compress_static_files(handler)
+
+        assert output(handler)[-1] == "✗ STATIC_ROOT is not configured"
+
+
+class TestCollectStaticFiles:
+    """Test cases for the incremental collect_static_files script."""
+
+    def collected(self, static):
+        root = static / "collected"
+        return {
+            str(path.relative_to(root)): path.read_text()
+            for path in root.rglob("*")
+            if path.is_file()
+        }
+
+    def test_collects_incrementally(self, static, handler, mocker):
+        collect_static_files(handler)
+
+        assert self.collected(static) == {"css/base.css": "body{}", "js/app.js": "1;", "lib.js": "22"}
+        assert output(handler)[-1].startswith(f"✓ 3 static file(s) copied to '{static / 'collected'}', 0 unmodified")
+
+        # Unchanged files are not even read
+        hash_file = mocker.spy(staticfiles, "_hash")
+        collect_static_files(handler)
+        hash_file.assert_not_called()
+        assert "0 static file(s) copied" in output(handler)[-1]
+        assert "3 unmodified, 0 deleted" in output(handler)[-1]
+
+        # A new modification time alone costs a hash but no copy
+        os.utime(static / "project" / "js" / "app.js")
+        (static / "vendor" / "lib.js").write_text("33")
+        collect_static_files(handler)
+        assert hash_file.call_count == 2
+        assert self.collected(static)["lib.js"] == "33"
+        assert "1 static file(s) copied" in output(handler)[-1]
+
+    def test_deletes_orphans(self, static, handler):
+        collect_static_files(handler)
+        (static / "collected" / "lib.js.gz").write_text("compressed")
+        (static / "collected" / "unrelated.txt").write_text("kept")
+        (static / "vendor" / "lib.js").unlink()
+
+        collect_static_files(handler)
+
+        assert self.collected(static) == {"css/base.css": "body{}", "js/app.js": "1;", "unrelated.txt": "kept"}
+        assert "  Deleted lib.js" in output(handler)
+        assert "1 deleted" in output(handler)[-1]
+
+    def test_manifest_is_kept_outside_static_root(self, static, handler, settings):
+        (static / "collected").mkdir()
+        (static / "collected" / staticfiles.LEGACY_COLLECT_MANIFEST).write_text("{}")
+
+        collect_static_files(handler)
+
+        assert not (static / "collected" / staticfiles.LEGACY_COLLECT_MANIFEST).exists()
+        manifest = staticfiles.collect_manifest_path(settings.STATIC_ROOT)
+        assert os.path.dirname(manifest) == str(static / "cache")
+        with open(manifest) as f:
+            assert set(json.load(f)["files"]) == {"css/base.css", "js/app.js", "lib.js"}
+
+    def test_without_manifest_every_file_is_copied(self, static, handler, settings):
+        settings.DJANGO_SETUP_TOOLS_COLLECT_MANIFEST_DIR = None
+        collect_static_files(handler)
+        collect_static_files(handler)
+
+        assert output(handler)[-1].startswith("✓ 3 static file(s) copied")
+        assert not (static / "cache").exists()
+
+    def test_missing_destination_is_copied_again(self, static, handler):
+        collect_static_files(handler)
+        (static / "collected" / "js" / "app.js").unlink()
+
+        collect_static_files(handler)
+
+        assert self.collected(static)["js/app.js"] == "1;"
+
+    def test_falls_back_to_collectstatic(self, static, handler, settings, mocker):
+        settings.STORAGES = {
+            **settings.STORAGES,
+            "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.ManifestStaticFilesStorage"},
+        }
+        call_command = mocker.patch("django_setup_tools.scripts.static.call_command")
+
+        collect_static_files(handler, "--clear")
+
+        call_command.assert_called_once_with(
+            "collectstatic", "--no-input", "--clear", stdout=handler.stdout, stderr=handler.stderr
+        )
+        assert "⚠ Running collectstatic instead, because the staticfiles storage post-processes files" in output(
+            handler
+        )
+
+    def test_static_root_not_configured(self, handler, settings):
+        settings.STATIC_ROOT = None
+
+        with pytest.raises(ImproperlyConfigured, match="STATIC_ROOT"):
+            collect_static_files(handler)
@@ -0,0 +1,151 @@
+"""Tests for running the setup plan for many tenants."""
+import contextlib
+import json
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from django_setup_tools.ledger import Ledger
+from django_setup_tools.tenancy import fan_out, load_tenants
+
+CALLS = []
+CURRENT = threading.local()
+
+
+def tenants():
+    return ["acme", "globex", "initech"]
+
+
+def default_only():
+    return ["default"]
+
+
+def broken_tenants():
+    raise RuntimeError("directory unavailable")
+
+
+@contextlib.contextmanager
+def activate_tenant(tenant):
+    CURRENT.tenant = tenant
+    try:
+        yield
+    finally:
+        CURRENT.tenant = None
+
+
+def record(handler, name):
+    handler.stdout.write(f"recording {name}")
+    CALLS.append((getattr(CURRENT, "tenant", None), name, handler.database))
+
+
+def fail_for_globex(handler):
+    if getattr(CURRENT, "tenant", None) == "globex":
+        raise RuntimeError("globex is broken")
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    CALLS.clear()
+    # Worker threads cannot write to the ledger while the test transaction
+    # holds the SQLite write lock
+    with patch.object(Ledger, "is_available", return_value=False):
+        yield
+
+
+@pytest.fixture
+def tenant_settings(settings):
+    settings.DJANGO_SETUP_TOOLS_TENANTS = "tests.test_tenancy.tenants"
+    settings.DJANGO_SETUP_TOOLS_TENANT_CONTEXT = "tests.test_tenancy.activate_tenant"
+    settings.DJANGO_SETUP_TOOLS = {"": {"always_run": [("tests.test_tenancy.record", "migrated")]}}
+    return settings
+
+
+def test_fan_out_is_bounded():
+    lock = threading.Lock()
+    running = peak = 0
+
+    def run(item):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+        return item * 2
+
+    assert sorted(fan_out(range(8), run, workers=3)) == [0, 2, 4, 6, 8, 10, 12, 14]
+    assert peak <= 3
+
+
+def test_load_tenants():
+    assert load_tenants("tests.test_tenancy.tenants") == ["acme", "globex", "initech"]
+    with pytest.raises(ImproperlyConfigured, match="Could not import"):
+        load_tenants("tests.test_tenancy.missing")
+    with pytest.raises(ImproperlyConfigured, match="directory unavailable"):
+        load_tenants("tests.test_tenancy.broken_tenants")
+
+
+def test_runs_plan_for_every_tenant(tenant_settings):
+    stdout = StringIO()
+    call_command("setup", "--tenant-workers", "2", stdout=stdout)
+
+    assert sorted(CALLS) == [(tenant, "migrated", None) for tenant in ["acme", "globex", "initech"]]
+    output = stdout.getvalue()
+    assert "Running setup for 3 tenant(s), 2 at a time:" in output
+    assert "✓ acme finished in" in output
+    assert "3 tenant(s) succeeded, 0 failed." in output
+
+
+def test_tenant_is_active_in_script_workers(tenant_settings):
+    tenant_settings.DJANGO_SETUP_TOOLS = {
+        "": {"always_run": [("tests.test_tenancy.record", "a"), ("tests.test_tenancy.record", "b")]}
+    }
+
+    call_command("setup", "--tenants", "tests.test_tenancy.tenants", "--jobs", "2", stdout=StringIO())
+
+    assert sorted(CALLS) == [
+        (tenant, name, None) for tenant in ["acme", "globex", "initech"] for name in ["a", "b"]
+    ]
+
+
+def test_failures_are_aggregated(tenant_settings, tmp_path):
+    tenant_settings.DJANGO_SETUP_TOOLS = {
+        "": {"always_run": ["tests.test_tenancy.fail_for_globex", ("tests.test_tenancy.record", "after")]}
+    }
+    report = tmp_path / "report.json"
+    stdout = StringIO()
+    with pytest.raises(CommandError, match="Setup failed for 1 of 3 tenant\\(s\\): globex"):
+        call_command("setup", "--report", str(report), stdout=stdout)
+
+    # The other tenants still ran to completion
+    assert sorted(tenant for tenant, *_ in CALLS) == ["acme", "initech"]
+    assert "✗ globex failed:" in stdout.getvalue()
+    assert "[globex] Executing function: tests.test_tenancy.fail_for_globex" in stdout.getvalue()
+    assert "[globex] [" not in stdout.getvalue()
+
+    data = json.loads(report.read_text())
+    assert data["status"] == "failed"
+    statuses = {tenant["tenant"]: tenant["status"] for tenant in data["tenants"]}
+    assert statuses == {"acme": "succeeded", "globex": "failed", "initech": "succeeded"}
+    assert {script["tenant"] for script in data["scripts"]} == {"acme", "globex", "initech"}
+
+
+def test_database_alias_tenants(settings):
+    settings.DJANGO_SETUP_TOOLS_TENANTS = "tests.test_tenancy.tenants"
+    settings.DJANGO_SETUP_TOOLS = {"": {"always_run": [("tests.test_tenancy.record", "x")]}}
+
+    with pytest.raises(CommandError, match="not database aliases"):
+        call_command("setup", stdout=StringIO())
+
+    stdout = StringIO()
+    call_command("setup", "--tenants", "tests.test_tenancy.default_only", stdout=stdout)
+    assert CALLS == [(None, "x", "default")]
+    # Only the output of failed tenants is shown
+    assert "recording x" not in stdout.getvalue()
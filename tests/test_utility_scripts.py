@@ -27,7 +27,7 @@ class TestUtilityScripts(TestCase):
         self.mock_handler.style.ERROR.return_value = "ERROR"
         self.mock_handler.style.WARNING.return_value = "WARNING"
 
-    @patch('django_setup_tools.scripts.cache')
+    @patch('django_setup_tools.scripts.caches.cache')
     def test_clear_cache_success(self, mock_cache):
         """Test successful cache clearing."""
         mock_cache.clear.return_value = None
@@ -38,7 +38,7 @@ class TestUtilityScripts(TestCase):
         self.mock_handler.stdout.write.assert_any_call("HTTP_INFO")
         self.mock_handler.stdout.write.assert_any_call("SUCCESS")
 
-    @patch('django_setup_tools.scripts.cache')
+    @patch('django_setup_tools.scripts.caches.cache')
     def test_clear_cache_error(self, mock_cache):
         """Test cache clearing with error."""
         mock_cache.clear.side_effect = Exception("Cache error")
@@ -47,7 +47,7 @@ class TestUtilityScripts(TestCase):
 
         self.mock_handler.stdout.write.assert_any_call("ERROR")
 
-    @patch('django_setup_tools.scripts.connection')
+    @patch('django_setup_tools.scripts.database.connection')
     @override_settings(DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3'}})
     def test_check_database_connection_success(self, mock_connection):
         """Test successful database connection check."""
@@ -61,7 +61,7 @@ class TestUtilityScripts(TestCase):
         mock_cursor.execute.assert_called_with("SELECT 1")
         self.mock_handler.stdout.write.assert_any_call("SUCCESS")
 
-    @patch('django_setup_tools.scripts.connection')
+    @patch('django_setup_tools.scripts.database.connection')
     def test_check_database_connection_error(self, mock_connection):
         """Test database connection check with error."""
         mock_connection.cursor.side_effect = Exception("Database error")
@@ -70,7 +70,7 @@ class TestUtilityScripts(TestCase):
 
         self.mock_handler.stdout.write.assert_any_call("ERROR")
 
-    @patch('django_setup_tools.scripts.connection')
+    @patch('django_setup_tools.scripts.database.connection')
     @override_settings(DATABASES={'default': {'ENGINE': 'django.db.backends.sqlite3'}})
     def test_check_database_connection_failed_test(self, mock_connection):
         """Test database connection with failed result."""
@@ -96,7 +96,7 @@ class TestUtilityScripts(TestCase):
             }
         }
     )
-    @patch('django_setup_tools.scripts.Path')
+    @patch('django_setup_tools.scripts.logs.Path')
     def test_setup_log_directories_mkdir_error(self, mock_path_class):
         """Test log directory setup with mkdir error."""
         mock_path = Mock()
@@ -120,7 +120,7 @@ class TestUtilityScripts(TestCase):
             }
         }
     )
-    @patch('django_setup_tools.scripts.Path')
+    @patch('django_setup_tools.scripts.logs.Path')
     def test_setup_log_directories_success(self, mock_path_class):
         """Test successful log directory setup."""
         mock_path = Mock()
@@ -197,7 +197,7 @@ class TestUtilityScripts(TestCase):
         STATIC_ROOT='static_files',  # nosec - test path
         STATICFILES_DIRS=['app_static']  # nosec - test path
     )
-    @patch('django_setup_tools.scripts.Path')
+    @patch('django_setup_tools.scripts.static.Path')
     def test_check_static_files_config_missing_directories(self, mock_path_class):
         """Test static files configuration with missing directories."""
         mock_path = Mock()
@@ -213,7 +213,7 @@ class TestUtilityScripts(TestCase):
         STATIC_ROOT='static_files',
         STATICFILES_DIRS=[('namespace', 'path/to/static')]  # Tuple format
     )
-    @patch('django_setup_tools.scripts.Path')
+    @patch('django_setup_tools.scripts.static.Path')
     def test_check_static_files_config_tuple_format(self, mock_path_class):
         """Test static files configuration with tuple format STATICFILES_DIRS."""
         mock_path = Mock()
@@ -231,7 +231,7 @@ class TestUtilityScripts(TestCase):
         STATIC_ROOT='static_files',  # nosec - test path
         STATICFILES_DIRS=['app_static']  # nosec - test path
     )
-    @patch('django_setup_tools.scripts.Path')
+    @patch('django_setup_tools.scripts.static.Path')
     def test_check_static_files_config_success(self, mock_path_class):
         """Test static files configuration check with good config."""
         mock_path = Mock()
@@ -249,12 +249,12 @@ class TestUtilityScripts(TestCase):
 
         self.mock_handler.stdout.write.assert_any_call("ERROR")
 
-    @patch('django_setup_tools.scripts.Site.objects.update_or_create')
+    @patch('django_setup_tools.scripts.sites.Site.objects.in_bulk')
     @override_settings(SITE_ID=1, SITE_DOMAIN='example.com', SITE_NAME='Test Site')
-    def test_sync_site_id_database_error(self, mock_update_or_create):
+    def test_sync_site_id_database_error(self, mock_in_bulk):
         """Test sync_site_id with database error."""
         # Mock a database error
-        mock_update_or_create.side_effect = Exception("Database connection failed")
+        mock_in_bulk.side_effect = Exception("Database connection failed")
 
         # This should raise an exception since we're not catching it in sync_site_id
         with self.assertRaises(Exception) as context:
@@ -266,7 +266,7 @@ class TestUtilityScripts(TestCase):
     def test_verify_environment_config_getattr_exception(self):
         """Test verify_environment_config with exception when checking settings."""
         # Mock getattr to raise an exception for a specific setting
-        with patch('django_setup_tools.scripts.getattr') as mock_getattr:
+        with patch('django_setup_tools.scripts.environment.getattr') as mock_getattr:
             def side_effect(obj, name, default=None):
                 if name == 'SECRET_KEY':
                     raise AttributeError("Mock error accessing SECRET_KEY")
@@ -291,7 +291,7 @@ class TestUtilityScripts(TestCase):
         STATIC_ROOT='/nonexistent/path',  # This should trigger the path check issue
         STATICFILES_DIRS=[]
     )
-    @patch('django_setup_tools.scripts.Path')
+    @patch('django_setup_tools.scripts.static.Path')
     def test_check_static_files_config_path_evaluation_error(self, mock_path_class):
         """Test static files configuration with path evaluation error."""
         # Mock Path to raise an exception when trying to evaluate the path